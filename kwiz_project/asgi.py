@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+
+Run under gunicorn with uvicorn workers by starting with ``WEB_SERVER=asgi``
+(see start.sh). Static files are served by WhiteNoise, as under WSGI.
 """
 
 import os
@@ -12,5 +15,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kwiz_project.settings')
+# Route the hot read endpoints to their async views
+os.environ.setdefault('QUIZ_ASGI', 'True')
 
 application = get_asgi_application()
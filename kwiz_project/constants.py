@@ -46,6 +46,18 @@ DEVELOPMENT_DOMAINS = [
 # Quiz release time
 DEFAULT_QUIZ_RELEASE_TIME = '00:00'  # Midnight IST
 
+# Archive pagination
+ARCHIVE_PAGE_SIZE = 30
+MAX_ARCHIVE_PAGE_SIZE = 100
+
+# Question search
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+MAX_SEARCH_TERMS = 10
+
+# Maximum number of quizzes graded in one batch submission
+MAX_BATCH_SUBMISSIONS = 100
+
 # Quiz scoring emojis
 SCORE_EMOJI_EXCELLENT = '🏆'  # 90%+
 SCORE_EMOJI_GREAT = '🌟'      # 80-89%
@@ -59,6 +71,20 @@ SCORE_THRESHOLD_GREAT = 80
 SCORE_THRESHOLD_GOOD = 70
 SCORE_THRESHOLD_OKAY = 60
 
+# ============================================================================
+# CACHE KEYS
+# ============================================================================
+# Cache alias of the shared tier, for data every worker writes to
+SHARED_CACHE_ALIAS = 'shared'
+QUIZ_CACHE_GENERATION_KEY = 'quiz:generation'
+QUIZ_SCHEDULE_VERSION_KEY = 'quiz:schedule-version'
+QUIZ_ANSWER_KEY_VERSION_KEY = 'quiz:answer-key-version'
+QUIZ_PAYLOAD_CACHE_KEY = 'quiz:payload:{generation}:{date}'
+QUIZ_ARCHIVE_VERSION_KEY = 'quiz:archive-version'
+QUIZ_ARCHIVE_CACHE_KEY = 'quiz:archive:{generation}:{version}:{query}'
+QUIZ_SCORE_SIZE_KEY = 'quiz:scores:{quiz_id}'
+QUIZ_SCORE_BUCKET_KEY = 'quiz:scores:{quiz_id}:{score}'
+
 # ============================================================================
 # SHARE TEXT TEMPLATES
 # ============================================================================
@@ -75,6 +101,9 @@ SHARE_TEXT_SUFFIX = f"\n\nPlay daily Bollywood trivia at {DOMAIN} 🎬"
 # ============================================================================
 QUIZ_CONFIG_UPLOAD_PATH = 'quiz_configs/uploads/'
 
+# Directory under STATIC_ROOT for published quiz snapshots
+QUIZ_STATIC_SNAPSHOT_DIR = 'quiz'
+
 # ============================================================================
 # ADMIN CONFIGURATION
 # ============================================================================
@@ -106,11 +135,29 @@ ERROR_INVALID_QUESTIONS = 'Questions must be a list'
 ERROR_NO_QUESTIONS = 'Quiz must have at least one question'
 ERROR_INVALID_OPTIONS_COUNT = 'Question {number}: Must have exactly 4 options'
 ERROR_INVALID_CORRECT_ANSWER = 'Question {number}: correct_answer must be 0, 1, 2, or 3'
+ERROR_INVALID_CONFIG = 'Quiz config must be a JSON object'
+ERROR_INVALID_DATE = 'date must be a date in YYYY-MM-DD format'
+ERROR_INVALID_TEXT = '{field} must be a non-empty string'
+ERROR_TEXT_TOO_LONG = '{field} must be at most {max_length} characters'
+ERROR_INVALID_QUESTION = 'Question {number}: Must be an object'
+ERROR_QUESTION = 'Question {number}: {error}'
+ERROR_DUPLICATE_QUESTION = 'Question {number}: Same question as question {other}'
+ERROR_DUPLICATE_OPTION = 'Question {number}: Option "{option}" appears more than once'
+ERROR_INVALID_JSON = 'Invalid JSON: {error}'
+ERROR_DUPLICATE_QUIZ_DATE = 'Quiz for date {date} is also defined in {source}'
+ERROR_QUIZ_NOT_SYNCED = (
+    'Quiz for date {date} was not created from a quiz config file, use --adopt to overwrite it'
+)
+ERROR_NO_CONFIGS = 'No quiz configs found'
+WARNING_NEAR_DUPLICATE = 'Question {number} is {similarity}% similar to {other}: "{text}"'
 
 # ============================================================================
 # SUCCESS MESSAGES
 # ============================================================================
 SUCCESS_QUIZ_IMPORTED = 'Successfully imported quiz: {title} for {date}'
+SUCCESS_QUIZZES_IMPORTED = 'Successfully imported {count} quizzes from {first} to {last}'
+SUCCESS_CONFIGS_VALID = 'All {count} quiz configs are valid'
+SUMMARY_QUIZZES_UPDATED = 'Imported quizzes: {created} created, {updated} updated, {unchanged} unchanged'
 SUCCESS_CONFIG_UPLOADED = 'Quiz configuration uploaded successfully'
 
 # ============================================================================
@@ -119,6 +166,11 @@ SUCCESS_CONFIG_UPLOADED = 'Quiz configuration uploaded successfully'
 REQUIRED_QUIZ_FIELDS = ['date', 'category', 'title', 'questions']
 REQUIRED_QUESTION_FIELDS = ['question', 'options', 'correct_answer']
 REQUIRED_OPTIONS_COUNT = 4
+# Column sizes of the fields a config is imported into
+MAX_CATEGORY_NAME_LENGTH = 100
+MAX_QUIZ_TITLE_LENGTH = 200
+MAX_BACKGROUND_IMAGE_LENGTH = 500
+MAX_OPTION_LENGTH = 200
 VALID_ANSWER_INDICES = [0, 1, 2, 3]
 ANSWER_CHOICES = ['A', 'B', 'C', 'D']
 
@@ -11,10 +11,12 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 from .constants import (
     DOMAIN, DOMAIN_WITH_WWW, RAILWAY_DOMAIN_PATTERN,
-    PRODUCTION_DOMAINS, FRONTEND_PRODUCTION_DOMAINS, DEVELOPMENT_DOMAINS
+    PRODUCTION_DOMAINS, FRONTEND_PRODUCTION_DOMAINS, DEVELOPMENT_DOMAINS,
+    SHARED_CACHE_ALIAS
 )
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -52,7 +54,7 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.gzip.GZipMiddleware',  # Add GZip compression
+    'quiz.middleware.QuizGZipMiddleware',  # GZip, except the release event stream
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -60,6 +62,11 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Set by kwiz_project.asgi: the hot read endpoints are served by async views.
+# WhiteNoise keeps serving static files there too, with their precompressed
+# variants and far-future cache headers; Django adapts its sync middleware.
+QUIZ_ASGI = os.environ.get('QUIZ_ASGI', 'False') == 'True'
+
 ROOT_URLCONF = 'kwiz_project.urls'
 
 TEMPLATES = [
@@ -152,6 +159,9 @@ if DEBUG:
 else:
     CORS_ALLOWED_ORIGINS = FRONTEND_PRODUCTION_DOMAINS
 
+# Let the frontend read archive pagination links
+CORS_EXPOSE_HEADERS = ['Link']
+
 # CSRF settings for Railway deployment
 if DEBUG:
     CSRF_TRUSTED_ORIGINS = DEVELOPMENT_DOMAINS
@@ -179,17 +189,102 @@ REST_FRAMEWORK = {
     ]
 }
 
-# Cache settings for better performance
+# Cache settings: each worker keeps a few seconds' copy of what it reads in
+# memory (L1) in front of the shared cache (L2), so all workers see the same
+# entries and invalidations and they survive restarts. Set QUIZ_CACHE_URL to
+# a Redis-compatible server for L2; otherwise a file cache in QUIZ_CACHE_DIR
+# is shared by the workers on one machine. A file cache cannot increment
+# atomically, so score percentiles are then recounted from the database.
+QUIZ_CACHE_URL = os.environ.get('QUIZ_CACHE_URL', '')
+if QUIZ_CACHE_URL:
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': QUIZ_CACHE_URL,
+    }
+else:
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('QUIZ_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'kwiz-cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000
+        }
+    }
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'quiz.cache_backends.TieredCache',
         'LOCATION': 'kwiz-cache',
-        'TIMEOUT': 300,  # 5 minutes default
         'OPTIONS': {
-            'MAX_ENTRIES': 1000
+            'L2': SHARED_CACHE_ALIAS,
+            'L1_TIMEOUT': 5,
+            'L1_MAX_ENTRIES': 1000,
+            # Seconds before a worker sees invalidations made by another
+            'VERSION_CHECK_INTERVAL': 1,
         }
-    }
+    },
+    SHARED_CACHE_ALIAS: {
+        **SHARED_CACHE,
+        'TIMEOUT': 300,  # 5 minutes default
+    },
 }
 
-# Cache timeout for quiz status (5 minutes)
+# Tests run on a per-process shared cache, see kwiz_project.test_runner
+TEST_RUNNER = 'kwiz_project.test_runner.QuizTestRunner'
+
+# Seconds a worker keeps its release schedule index before reloading it,
+# even when no worker has invalidated it
 QUIZ_STATUS_CACHE_TIMEOUT = 300
+
+# Cache timeout for pre-rendered quiz payloads (released quizzes are immutable,
+# edits invalidate entries through model signals)
+QUIZ_PAYLOAD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Number of compiled answer keys each worker keeps for grading submissions
+QUIZ_ANSWER_KEY_CACHE_SIZE = 64
+
+# Graded submissions are queued in memory and bulk inserted by a background
+# thread, in batches of up to BATCH_SIZE or every FLUSH_INTERVAL seconds
+QUIZ_SUBMISSION_WRITE_BEHIND = True
+QUIZ_SUBMISSION_BATCH_SIZE = 200
+QUIZ_SUBMISSION_FLUSH_INTERVAL = 2
+QUIZ_SUBMISSION_MAX_PENDING = 10000
+QUIZ_SUBMISSION_ENQUEUE_TIMEOUT = 0.5
+
+# Seconds between merges of each worker's score histograms into the cache
+QUIZ_SCORE_MERGE_INTERVAL = 5
+# Seconds without a new score after which a worker forgets a quiz's histogram
+QUIZ_SCORE_IDLE_TIMEOUT = 60
+
+# Seconds between writes of each worker's buffered question difficulty counters
+QUIZ_QUESTION_STATS_FLUSH_INTERVAL = 10
+
+# Pre-warm each worker's cache with the next quiz shortly before it releases
+QUIZ_PREWARM_ENABLED = os.environ.get('QUIZ_PREWARM_ENABLED', 'True') == 'True'
+QUIZ_PREWARM_LEAD_SECONDS = 5
+QUIZ_PREWARM_RECHECK_SECONDS = 60 * 60
+
+# Release event stream: heartbeat comments keep idle proxies from closing it
+QUIZ_EVENTS_HEARTBEAT_SECONDS = 25
+QUIZ_EVENTS_RETRY_MS = 5000
+# Seconds between schedule re-reads while waiting for the next release, which
+# picks up edits made through other workers
+QUIZ_EVENTS_RECHECK_SECONDS = 60
+
+# Seconds after which an upload still marked processing is claimed again,
+# in case the import worker that claimed it died
+QUIZ_IMPORT_JOB_TIMEOUT = 10 * 60
+
+# Share of words and options an imported question must have in common with
+# another question to be flagged as a near-duplicate
+QUIZ_NEAR_DUPLICATE_THRESHOLD = 0.6
+
+# Directory of dated quiz config files imported by sync_quiz_configs
+QUIZ_CONFIG_DIR = BASE_DIR / 'quiz_configs'
+
+# Cache-Control for quiz API responses. Calendars of past months are
+# immutable, so edits to them reach clients only after this max-age or a CDN
+# purge. Quiz bodies carry the next_quiz countdown and are never immutable.
+QUIZ_HTTP_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 30
+QUIZ_HTTP_STALE_WHILE_REVALIDATE = 60
+# Responses with a countdown (time_until_release) are only reused this long
+QUIZ_HTTP_TIMER_MAX_AGE = 5
@@ -0,0 +1,30 @@
+"""
+Test runner that keeps test runs off the shared cache.
+
+The default shared cache is a file cache that a developer's server and other
+test runs also use, so tests run with a per-process LocMemCache under the
+tiered cache instead.
+"""
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from .constants import SHARED_CACHE_ALIAS
+
+
+class QuizTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache_settings = override_settings(CACHES={
+            **settings.CACHES,
+            SHARED_CACHE_ALIAS: {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'kwiz-test-cache',
+            },
+        })
+        self._cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._cache_settings.disable()
+        super().teardown_test_environment(**kwargs)
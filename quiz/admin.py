@@ -1,19 +1,11 @@
 from django.contrib import admin
 from django.contrib import messages
+from django.db.models import BooleanField, ExpressionWrapper
 from django.utils.html import format_html
-from .models import Category, DailyQuiz, Question, QuizConfigUpload
-import json
-from datetime import datetime
-from kwiz_project.constants import (
-    REQUIRED_QUIZ_FIELDS, REQUIRED_QUESTION_FIELDS,
-    REQUIRED_OPTIONS_COUNT, VALID_ANSWER_INDICES,
-    ANSWER_CHOICES, DATE_FORMAT,
-    ERROR_QUIZ_ALREADY_EXISTS, ERROR_MISSING_FIELD,
-    ERROR_INVALID_QUESTIONS, ERROR_NO_QUESTIONS,
-    ERROR_INVALID_OPTIONS_COUNT, ERROR_INVALID_CORRECT_ANSWER,
-    DEFAULT_CATEGORY_DESCRIPTION_TEMPLATE,
-    SUCCESS_QUIZ_IMPORTED
+from .models import (
+    Category, DailyQuiz, Question, QuizConfigFile, QuizConfigUpload, QuizSubmission
 )
+from .search import matching_ids
 
 
 class QuestionInline(admin.TabularInline):
@@ -32,36 +24,97 @@ class CategoryAdmin(admin.ModelAdmin):
 class DailyQuizAdmin(admin.ModelAdmin):
     list_display = ['date', 'title', 'category', 'is_released', 'is_available']
     list_filter = ['category', 'is_released', 'date']
+    list_select_related = ['category']
     search_fields = ['title', 'description']
     date_hierarchy = 'date'
     inlines = [QuestionInline]
 
+    def get_queryset(self, request):
+        # Availability of every row in SQL, against one IST "now"
+        return super().get_queryset(request).annotate(
+            available=ExpressionWrapper(DailyQuiz.released_filter(), output_field=BooleanField())
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        """Also find quizzes through the search index of their questions"""
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            questions = Question.objects.filter(id__in=matching_ids(search_term))
+            results |= queryset.filter(id__in=questions.values('quiz_id'))
+        return results, may_have_duplicates
+
     def is_available(self, obj):
-        return obj.is_available
+        return obj.available
     is_available.boolean = True
+    is_available.admin_order_field = 'available'
 
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-    list_display = ['quiz', 'order', 'text', 'correct_answer']
+    list_display = ['quiz', 'order', 'text', 'correct_answer', 'attempts', 'correct_rate']
     list_filter = ['quiz__category', 'correct_answer']
-    search_fields = ['text']
+    list_select_related = ['quiz__category', 'stats']
+    search_fields = ['text', 'option_a', 'option_b', 'option_c', 'option_d']
+    # Counting every question for "Show all" is a full table scan
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        """Search with the question search index instead of icontains scans"""
+        if not search_term:
+            return queryset, False
+        return queryset.filter(id__in=matching_ids(search_term)), False
+
+    def attempts(self, obj):
+        stats = getattr(obj, 'stats', None)
+        return stats.attempts if stats else 0
+    attempts.admin_order_field = 'stats__attempts'
+
+    def correct_rate(self, obj):
+        stats = getattr(obj, 'stats', None)
+        rate = stats.correct_rate if stats else None
+        return f'{rate}%' if rate is not None else '-'
+    correct_rate.short_description = 'Correct %'
+
+
+@admin.register(QuizSubmission)
+class QuizSubmissionAdmin(admin.ModelAdmin):
+    list_display = ['quiz', 'score', 'total', 'submitted_at']
+    list_filter = ['submitted_at']
+    list_select_related = ['quiz__category']
+    date_hierarchy = 'submitted_at'
+    show_full_result_count = False
+
+
+@admin.register(QuizConfigFile)
+class QuizConfigFileAdmin(admin.ModelAdmin):
+    list_display = ['path', 'sha256', 'synced_at']
+    search_fields = ['path']
+    readonly_fields = ['path', 'sha256', 'synced_at']
 
 
 @admin.register(QuizConfigUpload)
 class QuizConfigUploadAdmin(admin.ModelAdmin):
-    list_display = ['file_name', 'quiz_title', 'quiz_date', 'status', 'uploaded_at', 'uploaded_by']
+    list_display = [
+        'file_name', 'quiz_title', 'quiz_date', 'status', 'near_duplicates', 'uploaded_at', 'uploaded_by',
+        'duration'
+    ]
     list_filter = ['status', 'uploaded_at']
     search_fields = ['quiz_title', 'uploaded_by']
-    readonly_fields = ['uploaded_at', 'status', 'error_message', 'quiz_date', 'quiz_title', 'status_display']
+    readonly_fields = [
+        'uploaded_at', 'status', 'error_message', 'warnings', 'quiz_date', 'quiz_title', 'status_display',
+        'started_at', 'finished_at', 'duration'
+    ]
     actions = ['import_quiz_configs']
 
     fieldsets = (
         ('Upload', {
-            'fields': ('file', 'uploaded_by')
+            'fields': ('file', 'update_existing', 'uploaded_by')
         }),
         ('Status', {
-            'fields': ('status_display', 'uploaded_at', 'quiz_date', 'quiz_title', 'error_message')
+            'fields': (
+                'status_display', 'uploaded_at', 'started_at', 'finished_at', 'duration',
+                'quiz_date', 'quiz_title', 'error_message', 'warnings'
+            )
         }),
     )
 
@@ -72,6 +125,7 @@ class QuizConfigUploadAdmin(admin.ModelAdmin):
     def status_display(self, obj):
         colors = {
             'pending': 'orange',
+            'processing': 'blue',
             'imported': 'green',
             'failed': 'red',
         }
@@ -83,130 +137,35 @@ class QuizConfigUploadAdmin(admin.ModelAdmin):
     status_display.short_description = 'Status'
 
     def save_model(self, request, obj, form, change):
-        """Auto-import quiz when file is uploaded"""
+        """Queue the upload for the import worker"""
         if not change:  # Only on create
             obj.uploaded_by = request.user.username
         super().save_model(request, obj, form, change)
 
-        # Auto-import if status is pending
         if obj.status == 'pending':
-            self.import_single_config(request, obj)
-
-    def import_quiz_configs(self, request, queryset):
-        """Admin action to import selected quiz configs"""
-        success_count = 0
-        fail_count = 0
-
-        for upload in queryset.filter(status='pending'):
-            if self.import_single_config(request, upload):
-                success_count += 1
-            else:
-                fail_count += 1
-
-        if success_count:
-            self.message_user(
-                request,
-                f'Successfully imported {success_count} quiz config(s)',
-                messages.SUCCESS
-            )
-        if fail_count:
-            self.message_user(
-                request,
-                f'Failed to import {fail_count} quiz config(s)',
-                messages.ERROR
-            )
-
-    import_quiz_configs.short_description = 'Import selected quiz configs'
-
-    def import_single_config(self, request, upload):
-        """Import a single quiz config"""
-        try:
-            # Read and parse JSON file
-            upload.file.seek(0)
-            config = json.load(upload.file)
-
-            # Validate configuration
-            self.validate_config(config)
-
-            # Extract quiz info
-            quiz_date = datetime.strptime(config['date'], DATE_FORMAT).date()
-            upload.quiz_date = quiz_date
-            upload.quiz_title = config['title']
-
-            # Check if quiz already exists
-            if DailyQuiz.objects.filter(date=quiz_date).exists():
-                raise ValueError(ERROR_QUIZ_ALREADY_EXISTS.format(date=quiz_date))
-
-            # Get or create category
-            category, _ = Category.objects.get_or_create(
-                name=config['category'],
-                defaults={'description': DEFAULT_CATEGORY_DESCRIPTION_TEMPLATE.format(
-                    category=config["category"]
-                )}
-            )
-
-            # Create quiz
-            quiz = DailyQuiz.objects.create(
-                date=quiz_date,
-                category=category,
-                title=config['title'],
-                description=config.get('description', ''),
-                background_image=config.get('background_image', ''),
-                is_released=True
-            )
-
-            # Create questions
-            for i, q_data in enumerate(config['questions']):
-                Question.objects.create(
-                    quiz=quiz,
-                    order=i + 1,
-                    text=q_data['question'],
-                    option_a=q_data['options'][0],
-                    option_b=q_data['options'][1],
-                    option_c=q_data['options'][2],
-                    option_d=q_data['options'][3],
-                    correct_answer=ANSWER_CHOICES[q_data['correct_answer']]
-                )
-
-            # Update upload status
-            upload.status = 'imported'
-            upload.error_message = ''
-            upload.save()
-
-            return True
-
-        except Exception as e:
-            upload.status = 'failed'
-            upload.error_message = str(e)
-            upload.save()
-
             self.message_user(
                 request,
-                f'Failed to import {upload.file.name}: {str(e)}',
-                messages.ERROR
+                f'{self.file_name(obj)} is queued for import, refresh to see its status',
+                messages.INFO
             )
-            return False
-
-    def validate_config(self, config):
-        """Validate quiz configuration"""
-        for field in REQUIRED_QUIZ_FIELDS:
-            if field not in config:
-                raise ValueError(ERROR_MISSING_FIELD.format(field=field))
 
-        if not isinstance(config['questions'], list):
-            raise ValueError(ERROR_INVALID_QUESTIONS)
-
-        if len(config['questions']) == 0:
-            raise ValueError(ERROR_NO_QUESTIONS)
+    def import_quiz_configs(self, request, queryset):
+        """Admin action to queue selected failed uploads for import again"""
+        count = queryset.filter(status='failed').update(
+            status='pending', error_message='', started_at=None, finished_at=None
+        )
+        self.message_user(
+            request,
+            f'Queued {count} quiz config(s) for import',
+            messages.SUCCESS
+        )
 
-        for i, question in enumerate(config['questions']):
-            for field in REQUIRED_QUESTION_FIELDS:
-                if field not in question:
-                    raise ValueError(ERROR_MISSING_FIELD.format(field=field))
+    import_quiz_configs.short_description = 'Retry importing selected failed quiz configs'
 
-            if len(question['options']) != REQUIRED_OPTIONS_COUNT:
-                raise ValueError(ERROR_INVALID_OPTIONS_COUNT.format(number=i+1))
+    def near_duplicates(self, obj):
+        return len(obj.warnings.splitlines())
+    near_duplicates.short_description = 'Near-duplicates'
 
-            if (not isinstance(question['correct_answer'], int) or
-                    question['correct_answer'] not in VALID_ANSWER_INDICES):
-                raise ValueError(ERROR_INVALID_CORRECT_ANSWER.format(number=i+1))
+    def duration(self, obj):
+        return f'{obj.duration:.2f}s' if obj.duration is not None else '-'
+    duration.short_description = 'Import Time'
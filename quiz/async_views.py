@@ -0,0 +1,124 @@
+"""
+Async variants of the hot read endpoints for the ASGI deployment.
+
+Under ``kwiz_project.asgi`` these views replace get_daily_quiz,
+get_quiz_status and get_quiz_archive, so one worker process multiplexes
+many concurrent requests on its event loop instead of serving one request
+per thread. Hits in the worker's in-memory cache tier are answered without
+leaving the loop, apart from the shared cache version check TieredCache
+makes at most once a second, which runs in a thread. Misses use the async
+cache API and the async ORM, both of which run their I/O in threads, and
+concurrent misses for the same entry share one build.
+
+Responses are byte-for-byte the ones the DRF views send. These are plain
+Django views since DRF's api_view does not support coroutines.
+"""
+
+import time
+from datetime import datetime
+
+from django.http import HttpResponse, HttpResponseNotAllowed
+
+from .cache import (
+    aload_archive_payload, aload_quiz_payload, aset_archive_payload, make_archive_payload, render_json,
+    seconds_until_next_change
+)
+from .http import cache_timer, cache_until
+from .models import IST
+from .schedule import aget_schedule
+from .views import (
+    archive_quizzes, archive_response, get_today_ist, is_canonical_archive_page, not_available_data,
+    parse_archive_query, quiz_payload_response, quiz_status_response, render_archive_page
+)
+from kwiz_project.constants import ERROR_NO_QUIZ_TODAY
+
+
+def data_response(data, status=200):
+    """Encode data as the DRF views would"""
+    return HttpResponse(render_json(data), status=status, content_type='application/json')
+
+
+def error_response(message, status):
+    return data_response({'error': message}, status)
+
+
+async def get_daily_quiz(request, quiz_date):
+    """Get daily quiz for a specific date (today or past only)"""
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        requested_date = datetime.strptime(quiz_date, '%Y-%m-%d').date()
+    except ValueError:
+        return error_response('Invalid date format. Use YYYY-MM-DD', 400)
+
+    today_ist = get_today_ist()
+    if requested_date > today_ist:
+        return error_response('Kwiz not found', 404)
+
+    schedule = await aget_schedule()
+    payload, quiz = await aload_quiz_payload(requested_date)
+    if payload is not None:
+        response = quiz_payload_response(request, payload, schedule)
+        return cache_timer(response, seconds_until_next_change(schedule))
+
+    if quiz is None:
+        return error_response('Kwiz not found', 404)
+
+    data = not_available_data(quiz, schedule)
+    response = data_response(data, 403)
+    # Must not outlive the release, or clients would keep seeing the 403
+    return cache_timer(response, data['time_until_release'])
+
+
+async def get_quiz_status(request, quiz_date=None):
+    """Get quiz availability status and timer information"""
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET'])
+    schedule = await aget_schedule()
+    now = time.time()
+
+    if quiz_date:
+        try:
+            requested_date = datetime.strptime(quiz_date, '%Y-%m-%d').date()
+        except ValueError:
+            return error_response('Invalid date format. Use YYYY-MM-DD', 400)
+
+        entry = schedule.get(requested_date)
+        if entry is None:
+            return error_response('Kwiz not found', 404)
+    else:
+        entry = schedule.get(get_today_ist())
+        if not entry:
+            return data_response({
+                'error': ERROR_NO_QUIZ_TODAY,
+                'next_quiz': schedule.next_quiz_info(now)
+            }, 404)
+
+    return quiz_status_response(request, schedule, entry, now)
+
+
+async def get_quiz_archive(request):
+    """Get a page of available past quizzes, newest first"""
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        cursor, category, limit, query = parse_archive_query(request.GET)
+    except ValueError as e:
+        return error_response(str(e), 400)
+
+    schedule = await aget_schedule()
+
+    async def query_page():
+        now_ist = datetime.now(IST)
+        quizzes = [quiz async for quiz in archive_quizzes(now_ist, cursor, category, limit)]
+        return render_archive_page(request.path, quizzes, category, limit, now_ist)
+
+    async def build():
+        body, newest_date, headers = await query_page()
+        return await aset_archive_payload(body, newest_date, query, headers, schedule=schedule)
+
+    if is_canonical_archive_page(schedule, cursor, category, limit):
+        payload = await aload_archive_payload(build, query)
+    else:
+        payload = make_archive_payload(*await query_page())
+    return cache_until(archive_response(request, payload), seconds_until_next_change(schedule))
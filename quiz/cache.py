@@ -0,0 +1,314 @@
+"""
+Pre-rendered payload cache for the quiz API.
+
+Released quizzes are served to every player as identical bytes, so the
+serialized JSON body is built once and stored per quiz date. Entries are
+invalidated by the model signals in ``quiz.signals``.
+
+Functions prefixed with ``a`` are the async counterparts used by the async
+views, built on the async cache API and the async ORM.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from .http import content_etag
+from .models import IST, DailyQuiz
+from .schedule import get_release_datetime, get_schedule
+from .serializers import QuizSerializer
+
+from kwiz_project.constants import (
+    QUIZ_CACHE_GENERATION_KEY, QUIZ_PAYLOAD_CACHE_KEY, QUIZ_ARCHIVE_CACHE_KEY,
+    QUIZ_ARCHIVE_VERSION_KEY
+)
+
+_renderer = JSONRenderer()
+
+# An encoded response body with its validators. last_modified is the time the
+# body was rendered, which is never earlier than the last change to its data.
+# available_at is the release timestamp for payloads warmed before release.
+# headers holds extra (name, value) response headers, such as pagination links.
+CachedPayload = namedtuple(
+    'CachedPayload', ['body', 'etag', 'last_modified', 'available_at', 'headers'],
+    defaults=(0, ())
+)
+
+# Builds currently running in this worker, keyed by cache key
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def single_flight(key, build):
+    """Run build once for concurrent callers asking for the same key
+
+    The first caller runs the build while the others in this worker wait for
+    its result, so a cache miss under load costs one set of queries.
+    """
+    with _in_flight_lock:
+        flight = _in_flight.get(key)
+        is_leader = flight is None
+        if is_leader:
+            flight = _in_flight[key] = _Flight()
+
+    if not is_leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = build()
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+        flight.done.set()
+    return flight.result
+
+
+# Async builds currently running, keyed by event loop and cache key
+_async_in_flight = {}
+
+
+async def async_single_flight(key, build):
+    """single_flight() for coroutines: concurrent awaiters share one build"""
+    key = (asyncio.get_running_loop(), key)
+    task = _async_in_flight.get(key)
+    if task is None:
+        task = _async_in_flight[key] = asyncio.ensure_future(build())
+        task.add_done_callback(lambda _: _async_in_flight.pop(key, None))
+    # A cancelled caller must not cancel the build the others are waiting on
+    return await asyncio.shield(task)
+
+
+def render_json(data):
+    """Encode data exactly as DRF's JSONRenderer would"""
+    if data is None:
+        # JSONRenderer renders None as an empty body rather than null
+        return b'null'
+    return _renderer.render(data)
+
+
+def get_version(key):
+    """Get a version counter, seeded from the clock so an evicted counter
+    never restarts at a value that older cache keys were built with"""
+    return cache.get_or_set(key, time.time_ns() // 1000, None)
+
+
+async def aget_version(key):
+    return await cache.aget_or_set(key, time.time_ns() // 1000, None)
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        get_version(key)
+
+
+def get_generation():
+    """Get the global cache generation, bumped on category changes"""
+    return get_version(QUIZ_CACHE_GENERATION_KEY)
+
+
+def bump_generation():
+    """Invalidate every quiz cache entry at once"""
+    bump_version(QUIZ_CACHE_GENERATION_KEY)
+
+
+def payload_key(quiz_date, generation=None):
+    if generation is None:
+        generation = get_generation()
+    return QUIZ_PAYLOAD_CACHE_KEY.format(generation=generation, date=quiz_date)
+
+
+async def apayload_key(quiz_date):
+    return payload_key(quiz_date, await aget_version(QUIZ_CACHE_GENERATION_KEY))
+
+
+def archive_key(query='', generation=None, version=None):
+    if generation is None:
+        generation = get_generation()
+        version = get_version(QUIZ_ARCHIVE_VERSION_KEY)
+    # Hashed so arbitrary filter values make safe cache keys
+    query_hash = hashlib.md5(query.encode()).hexdigest()
+    return QUIZ_ARCHIVE_CACHE_KEY.format(generation=generation, version=version, query=query_hash)
+
+
+async def aarchive_key(query=''):
+    return archive_key(
+        query, await aget_version(QUIZ_CACHE_GENERATION_KEY), await aget_version(QUIZ_ARCHIVE_VERSION_KEY)
+    )
+
+
+def make_payload(body, available_at=0, headers=()):
+    """Wrap an encoded body with a content-hash ETag"""
+    return CachedPayload(
+        body, content_etag(body, *(value for _, value in headers)), int(time.time()),
+        available_at, tuple(headers)
+    )
+
+
+def released_payload(payload):
+    if payload is not None and payload.available_at > time.time():
+        return None
+    return payload
+
+
+def get_quiz_payload(quiz_date):
+    """Get the cached payload for a date if it has been released"""
+    return released_payload(cache.get(payload_key(quiz_date)))
+
+
+def set_quiz_payload(quiz_date, body, available_at=0):
+    """Store the encoded quiz body for a released or soon released quiz"""
+    payload = make_payload(body, available_at)
+    cache.set(payload_key(quiz_date), payload, settings.QUIZ_PAYLOAD_CACHE_TIMEOUT)
+    return payload
+
+
+def load_quiz_payload(quiz_date):
+    """Get the payload for a released quiz, building it at most once per worker
+
+    Returns a (payload, quiz) pair. On a cache hit quiz is None; when the quiz
+    is missing or not yet available payload is None.
+    """
+    payload = get_quiz_payload(quiz_date)
+    if payload is not None:
+        return payload, None
+    return single_flight(payload_key(quiz_date), lambda: _build_quiz_payload(quiz_date))
+
+
+def _quiz_query(quiz_date):
+    return DailyQuiz.objects.select_related('category').prefetch_related(
+        'questions'
+    ).filter(date=quiz_date)
+
+
+def _build_quiz_payload(quiz_date):
+    quiz = _quiz_query(quiz_date).first()
+
+    if quiz is None or not quiz.is_available:
+        return None, quiz
+    return set_quiz_payload(quiz_date, build_quiz_payload(quiz)), quiz
+
+
+async def aload_quiz_payload(quiz_date):
+    """load_quiz_payload() for async views"""
+    key = await apayload_key(quiz_date)
+    payload = released_payload(await cache.aget(key))
+    if payload is not None:
+        return payload, None
+    return await async_single_flight(key, lambda: _abuild_quiz_payload(quiz_date, key))
+
+
+async def _abuild_quiz_payload(quiz_date, key):
+    quiz = await _quiz_query(quiz_date).afirst()
+
+    if quiz is None or not quiz.is_available:
+        return None, quiz
+    payload = make_payload(build_quiz_payload(quiz))
+    await cache.aset(key, payload, settings.QUIZ_PAYLOAD_CACHE_TIMEOUT)
+    return payload, quiz
+
+
+def warm_quiz_payload(quiz_date):
+    """Render and cache a quiz ahead of its release, returning the payload"""
+    quiz = DailyQuiz.objects.select_related('category').prefetch_related(
+        'questions'
+    ).filter(date=quiz_date, is_released=True).first()
+
+    if quiz is None:
+        return None
+    release_at = get_release_datetime(quiz.date, quiz.release_time)
+    return set_quiz_payload(quiz_date, build_quiz_payload(quiz), release_at.timestamp())
+
+
+def get_archive_payload(query=''):
+    """Get a cached archive page, or None on a cache miss"""
+    return cache.get(archive_key(query))
+
+
+def load_archive_payload(build, query=''):
+    """Get an archive page, running build at most once per worker on a miss"""
+    payload = get_archive_payload(query)
+    if payload is not None:
+        return payload
+    return single_flight(archive_key(query), build)
+
+
+async def aload_archive_payload(build, query=''):
+    """load_archive_payload() for async views, where build is a coroutine function"""
+    key = await aarchive_key(query)
+    payload = await cache.aget(key)
+    if payload is not None:
+        return payload
+    return await async_single_flight(key, build)
+
+
+def make_archive_payload(body, newest_date, headers=()):
+    payload = make_payload(body, headers=headers)
+    # Version the ETag by the newest quiz so a new release is always a miss
+    return payload._replace(etag=content_etag(str(newest_date), payload.etag))
+
+
+def set_archive_payload(body, newest_date, query='', headers=(), timeout=None):
+    """Store an archive page, by default until the visible quizzes can change"""
+    payload = make_archive_payload(body, newest_date, headers)
+    if timeout is None:
+        timeout = seconds_until_next_change()
+    cache.set(archive_key(query), payload, timeout)
+    return payload
+
+
+async def aset_archive_payload(body, newest_date, query='', headers=(), timeout=None, schedule=None):
+    """set_archive_payload() for async views"""
+    payload = make_archive_payload(body, newest_date, headers)
+    if timeout is None:
+        timeout = seconds_until_next_change(schedule)
+    await cache.aset(await aarchive_key(query), payload, timeout)
+    return payload
+
+
+def build_quiz_payload(quiz):
+    """Serialize a quiz with its questions into encoded JSON"""
+    return render_json(QuizSerializer(quiz).data)
+
+
+def invalidate_quiz(quiz_date):
+    """Drop cached data affected by a change to the quiz on this date"""
+    cache.delete(payload_key(quiz_date))
+    # Any quiz can appear on any archive page, so every page is invalidated
+    bump_version(QUIZ_ARCHIVE_VERSION_KEY)
+
+
+def seconds_until_next_change(schedule=None):
+    """Seconds until the next IST midnight or quiz release, whichever is first
+
+    Async views pass the schedule they loaded, so no query runs here.
+    """
+    now_ist = datetime.now(IST)
+    tomorrow = now_ist.date() + timedelta(days=1)
+    change_at = IST.localize(datetime.combine(tomorrow, datetime.min.time()))
+
+    next_quiz = (schedule or get_schedule()).next_quiz_info(now_ist.timestamp())
+    if next_quiz is not None:
+        change_at = min(change_at, now_ist + timedelta(seconds=next_quiz['time_until_release']))
+    return max(1, int((change_at - now_ist).total_seconds()))
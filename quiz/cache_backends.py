@@ -0,0 +1,198 @@
+"""
+Two-tier cache backend: a per-process L1 in front of a shared L2.
+
+Each worker keeps the entries it reads in a small in-memory LocMemCache for
+a few seconds and reads through to the shared cache named by the L2 option
+(a file, database or Redis cache) on a miss, so hot keys cost no round trip
+while every worker, and every restart, sees the same data. Writes go to both
+tiers.
+
+delete(), incr() and clear() bump a version counter kept in L2. Workers read
+it at most once per VERSION_CHECK_INTERVAL seconds and ignore L1 entries
+stored under an older version, so an invalidation made by any worker is
+seen by all of them within that interval.
+
+aget(), aset() and aadd(), and so aget_or_set(), answer L1 hits on the
+event loop. Misses and version checks await the L2 backend's async methods,
+which in Django's built-in backends run the sync call in a thread. The other
+async methods are BaseCache's thread wrappers around the sync ones. Overwriting a key with set() does
+not bump it: other workers may serve the old value until their L1 copy
+expires after L1_TIMEOUT seconds. The quiz caches invalidate by deleting
+keys and bumping version keys, never by overwriting.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'quiz.cache_backends.TieredCache',
+            'LOCATION': 'kwiz-cache',
+            'OPTIONS': {'L2': 'shared', 'L1_TIMEOUT': 5},
+        },
+        'shared': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', ...},
+    }
+"""
+
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+
+TIER_VERSION_KEY = 'tiered-cache:version'
+
+_MISSING = object()
+
+
+class _TierVersion:
+    """The L2 version counter as last read by this process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.value = None
+        self.checked_at = float('-inf')
+
+
+# Shared by the per-thread instances of each backend, keyed by LOCATION
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+class TieredCache(BaseCache):
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = options['L2']
+        self._l1_timeout = options.get('L1_TIMEOUT', 5)
+        self._check_interval = options.get('VERSION_CHECK_INTERVAL', 1)
+        # LocMemCache keeps its entries per name, shared by every thread
+        self._l1 = LocMemCache(f'tiered:{name}', {
+            'OPTIONS': {'MAX_ENTRIES': options.get('L1_MAX_ENTRIES', 1000)}
+        })
+        with _versions_lock:
+            self._version = _versions.setdefault(name, _TierVersion())
+
+    @property
+    def _l2(self):
+        return caches[self._l2_alias]
+
+    def _current_version(self):
+        version = self._version
+        now = time.monotonic()
+        if now - version.checked_at >= self._check_interval:
+            # Seeded from the clock like the quiz version keys, so a counter
+            # lost with L2 never comes back at a value seen before
+            value = self._l2.get_or_set(TIER_VERSION_KEY, time.time_ns() // 1000, None)
+            with version.lock:
+                version.value, version.checked_at = value, now
+        return version.value
+
+    async def _acurrent_version(self):
+        version = self._version
+        now = time.monotonic()
+        if now - version.checked_at >= self._check_interval:
+            value = await self._l2.aget_or_set(TIER_VERSION_KEY, time.time_ns() // 1000, None)
+            with version.lock:
+                version.value, version.checked_at = value, now
+        return version.value
+
+    def _bump_version(self):
+        """Invalidate every worker's L1"""
+        try:
+            value = self._l2.incr(TIER_VERSION_KEY)
+        except ValueError:
+            value = time.time_ns() // 1000
+            self._l2.set(TIER_VERSION_KEY, value, None)
+        with self._version.lock:
+            self._version.value, self._version.checked_at = value, time.monotonic()
+
+    def _remember(self, key, value, timeout, version, tier_version):
+        l1_timeout = self._l1_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            # Never outlive the L2 entry on the worker that wrote it
+            l1_timeout = min(l1_timeout, timeout)
+        self._l1.set(key, (tier_version, value), l1_timeout, version=version)
+
+    def get(self, key, default=None, version=None):
+        tier_version = self._current_version()
+        entry = self._l1.get(key, version=version)
+        if entry is not None and entry[0] == tier_version:
+            return entry[1]
+
+        value = self._l2.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        self._remember(key, value, DEFAULT_TIMEOUT, version, tier_version)
+        return value
+
+    async def aget(self, key, default=None, version=None):
+        # L1 is in this process, so hits never leave the event loop
+        tier_version = await self._acurrent_version()
+        entry = self._l1.get(key, version=version)
+        if entry is not None and entry[0] == tier_version:
+            return entry[1]
+
+        value = await self._l2.aget(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        self._remember(key, value, DEFAULT_TIMEOUT, version, tier_version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        tier_version = self._current_version()
+        self._l2.set(key, value, timeout, version=version)
+        self._remember(key, value, timeout, version, tier_version)
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        tier_version = await self._acurrent_version()
+        await self._l2.aset(key, value, timeout, version=version)
+        self._remember(key, value, timeout, version, tier_version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        tier_version = self._current_version()
+        failed = self._l2.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            if key not in failed:
+                self._remember(key, value, timeout, version, tier_version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        tier_version = self._current_version()
+        if not self._l2.add(key, value, timeout, version=version):
+            return False
+        self._remember(key, value, timeout, version, tier_version)
+        return True
+
+    async def aadd(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        tier_version = await self._acurrent_version()
+        if not await self._l2.aadd(key, value, timeout, version=version):
+            return False
+        self._remember(key, value, timeout, version, tier_version)
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._l2.touch(key, timeout, version=version)
+
+    def has_key(self, key, version=None):
+        return self._l2.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self._l2.incr(key, delta, version=version)
+        self._l1.delete(key, version=version)
+        self._bump_version()
+        return value
+
+    def delete(self, key, version=None):
+        deleted = self._l2.delete(key, version=version)
+        self._l1.delete(key, version=version)
+        self._bump_version()
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self._l2.delete_many(keys, version=version)
+        self._l1.delete_many(keys, version=version)
+        self._bump_version()
+
+    def clear(self):
+        self._l2.clear()
+        self._l1.clear()
+        self._bump_version()
@@ -0,0 +1,204 @@
+"""
+Parsing and validation of quiz configuration files.
+
+A config is a JSON object describing one quiz and its questions. A file may
+hold one config, a JSON array of configs, or be a ZIP of config files. This
+module does not touch the database, so files can be parsed and validated in
+worker processes.
+"""
+
+import io
+import json
+import zipfile
+from datetime import datetime
+
+from kwiz_project.constants import (
+    REQUIRED_QUIZ_FIELDS, REQUIRED_QUESTION_FIELDS,
+    REQUIRED_OPTIONS_COUNT, VALID_ANSWER_INDICES,
+    MAX_CATEGORY_NAME_LENGTH, MAX_QUIZ_TITLE_LENGTH,
+    MAX_BACKGROUND_IMAGE_LENGTH, MAX_OPTION_LENGTH,
+    DATE_FORMAT, ERROR_MISSING_FIELD,
+    ERROR_INVALID_CONFIG, ERROR_INVALID_JSON, ERROR_INVALID_DATE,
+    ERROR_INVALID_TEXT, ERROR_TEXT_TOO_LONG,
+    ERROR_INVALID_QUESTIONS, ERROR_NO_QUESTIONS,
+    ERROR_INVALID_QUESTION, ERROR_QUESTION,
+    ERROR_DUPLICATE_QUESTION, ERROR_DUPLICATE_OPTION,
+    ERROR_INVALID_OPTIONS_COUNT, ERROR_INVALID_CORRECT_ANSWER
+)
+
+
+def read_configs(file, name=''):
+    """Read the configs in a JSON or ZIP file as (source, config) pairs"""
+    data = file.read()
+    if not zipfile.is_zipfile(io.BytesIO(data)):
+        return parse_configs(data, name)
+
+    configs = []
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for member in sorted(archive.namelist()):
+            if member.endswith('.json') and not member.startswith('__MACOSX/'):
+                configs.extend(parse_configs(archive.read(member), member))
+    return configs
+
+
+def parse_configs(data, source):
+    """Parse a JSON object or array of configs as (source, config) pairs"""
+    try:
+        config = json.loads(data)
+    except ValueError as e:
+        raise ValueError(f'{source}: {ERROR_INVALID_JSON.format(error=e)}')
+
+    if isinstance(config, list):
+        return [(f'{source}[{index}]', item) for index, item in enumerate(config)]
+    return [(source, config)]
+
+
+class ConfigValidationError(ValueError):
+    """A config failed validation, with every error that was found"""
+
+    def __init__(self, errors):
+        super().__init__('\n'.join(errors))
+        self.errors = errors
+
+
+class ConfigValidator:
+    """Quiz config validator compiled once from the validation constants
+
+    A config is checked in a single pass that collects every error rather
+    than stopping at the first, so a file can be fixed in one go.
+    """
+
+    def __init__(self):
+        self.quiz_fields = tuple(REQUIRED_QUIZ_FIELDS)
+        self.question_fields = tuple(REQUIRED_QUESTION_FIELDS)
+        self.options_count = REQUIRED_OPTIONS_COUNT
+        self.answer_indices = frozenset(VALID_ANSWER_INDICES)
+        # (field, maximum length, required) of the quiz's text fields
+        self.text_fields = (
+            ('category', MAX_CATEGORY_NAME_LENGTH, True),
+            ('title', MAX_QUIZ_TITLE_LENGTH, True),
+            ('description', None, False),
+            ('background_image', MAX_BACKGROUND_IMAGE_LENGTH, False),
+        )
+
+    def parse_date(self, value):
+        """Parse a config date, or return None if it is not valid"""
+        try:
+            return datetime.strptime(value, DATE_FORMAT).date()
+        except (TypeError, ValueError):
+            return None
+
+    def validate(self, config):
+        """Return every error in a config, or an empty list if it is valid"""
+        if not isinstance(config, dict):
+            return [ERROR_INVALID_CONFIG]
+
+        errors = [
+            ERROR_MISSING_FIELD.format(field=field)
+            for field in self.quiz_fields if field not in config
+        ]
+        if 'date' in config and self.parse_date(config['date']) is None:
+            errors.append(ERROR_INVALID_DATE)
+
+        for field, max_length, required in self.text_fields:
+            if field in config:
+                error = self.check_text(field, config[field], max_length, required)
+                if error:
+                    errors.append(error)
+
+        if 'questions' in config:
+            self.check_questions(config['questions'], errors)
+        return errors
+
+    @staticmethod
+    def check_text(field, value, max_length, required):
+        if value is None and not required:
+            return None
+        if not isinstance(value, str) or (required and not value.strip()):
+            return ERROR_INVALID_TEXT.format(field=field)
+        if max_length is not None and len(value) > max_length:
+            return ERROR_TEXT_TOO_LONG.format(field=field, max_length=max_length)
+        return None
+
+    def check_questions(self, questions, errors):
+        if not isinstance(questions, list):
+            errors.append(ERROR_INVALID_QUESTIONS)
+            return
+        if not questions:
+            errors.append(ERROR_NO_QUESTIONS)
+            return
+
+        # Normalized question text to the number it first appeared as
+        seen = {}
+        for number, question in enumerate(questions, 1):
+            if not isinstance(question, dict):
+                errors.append(ERROR_INVALID_QUESTION.format(number=number))
+                continue
+
+            for field in self.question_fields:
+                if field not in question:
+                    errors.append(ERROR_QUESTION.format(
+                        number=number, error=ERROR_MISSING_FIELD.format(field=field)
+                    ))
+
+            if 'question' in question:
+                text = question['question']
+                error = self.check_text('question', text, None, True)
+                if error:
+                    errors.append(ERROR_QUESTION.format(number=number, error=error))
+                else:
+                    key = text.strip().casefold()
+                    if key in seen:
+                        errors.append(ERROR_DUPLICATE_QUESTION.format(number=number, other=seen[key]))
+                    else:
+                        seen[key] = number
+
+            if 'options' in question:
+                self.check_options(number, question['options'], errors)
+
+            if 'correct_answer' in question:
+                answer = question['correct_answer']
+                # bool is an int subclass, but true is not an answer index
+                if type(answer) is not int or answer not in self.answer_indices:
+                    errors.append(ERROR_INVALID_CORRECT_ANSWER.format(number=number))
+
+    def check_options(self, number, options, errors):
+        if not isinstance(options, list) or len(options) != self.options_count:
+            errors.append(ERROR_INVALID_OPTIONS_COUNT.format(number=number))
+            return
+
+        seen = set()
+        for index, option in enumerate(options, 1):
+            error = self.check_text(f'option {index}', option, MAX_OPTION_LENGTH, True)
+            if error:
+                errors.append(ERROR_QUESTION.format(number=number, error=error))
+                continue
+            key = option.strip().casefold()
+            if key in seen:
+                errors.append(ERROR_DUPLICATE_OPTION.format(number=number, option=option))
+            seen.add(key)
+
+
+validator = ConfigValidator()
+
+
+def validate_config(config):
+    """Validate quiz configuration, raising ConfigValidationError with every error"""
+    errors = validator.validate(config)
+    if errors:
+        raise ConfigValidationError(errors)
+
+
+def check_config(source, config):
+    """Validate a config and return its quiz date, prefixing errors with its source"""
+    errors = validator.validate(config)
+    if errors:
+        raise ConfigValidationError([f'{source}: {error}' for error in errors])
+    return validator.parse_date(config['date'])
+
+
+def load_config_file(path, source):
+    """Read and validate a config file as (source, config, quiz date) triples"""
+    with open(path, 'rb') as file:
+        configs = read_configs(file, source)
+    return [(source, config, check_config(source, config)) for source, config in configs]
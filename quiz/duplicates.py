@@ -0,0 +1,187 @@
+"""
+Near-duplicate question detection with MinHash and locality-sensitive hashing.
+
+A question is reduced to a set of features: the words of its text, without
+common question words, plus each option as a whole. The share of features
+two questions have in common (their Jaccard similarity) is estimated by a
+MinHash signature of SIGNATURE_SIZE values, which is cut into LSH_BANDS
+bands. Each band is hashed into a bucket and stored as a QuestionBand row.
+
+Questions sharing any bucket with a new question are its candidates, which
+are then compared exactly. Finding the near-duplicates of a whole import is
+two indexed queries instead of a comparison against every question. With 32
+bands of 4 values, pairs at the default 0.6 threshold become candidates
+99% of the time and unrelated questions rarely do.
+
+The importer and Question saves keep the index current;
+rebuild_duplicate_index rebuilds it from scratch. Stored buckets are only
+found while the features and hashing below stay the same, so a change to
+them must be deployed with a rebuild. Migration 0011 has its own frozen copy
+of this computation for the initial fill.
+"""
+
+import hashlib
+import re
+import struct
+from functools import lru_cache
+
+from django.conf import settings
+
+from .models import Question, QuestionBand
+from kwiz_project.constants import WARNING_NEAR_DUPLICATE
+
+INDEXED_FIELDS = ['text', 'option_a', 'option_b', 'option_c', 'option_d']
+
+LSH_BANDS = 32
+BAND_SIZE = 4
+SIGNATURE_SIZE = LSH_BANDS * BAND_SIZE
+
+# Independent hash functions: each 64 byte keyed BLAKE2b digest of a feature
+# holds 16 of its 32-bit signature values. Fixed keys so every process agrees.
+HASH_KEYS = [f'kwiz-minhash-{index}'.encode() for index in range(SIGNATURE_SIZE // 16)]
+SIGNATURE_FORMAT = f'<{SIGNATURE_SIZE}I'
+BAND_FORMAT = f'<{BAND_SIZE + 1}I'
+
+STOP_WORDS = frozenset(
+    'a an and are as at by did does do for from has had have he her his how in '
+    'is it its of on or she the their they this to was were what when where '
+    'which who whom whose why with'.split()
+)
+
+# Buckets per query, below the bound parameter limit of every backend
+BUCKET_QUERY_SIZE = 900
+# Questions read and band rows written per batch when rebuilding
+REBUILD_BATCH_SIZE = 2000
+
+
+def words(text):
+    """Casefolded words, joining possessives like Khanna's into one word"""
+    return re.findall(r'\w+', re.sub(r"['’]", '', text.casefold()))
+
+
+def question_features(text, options):
+    features = {word for word in words(text) if word not in STOP_WORDS}
+    features.update('option:' + ' '.join(words(option)) for option in options)
+    return features
+
+
+@lru_cache(maxsize=65536)
+def feature_hashes(feature):
+    """Every hash function's value for one feature"""
+    data = feature.encode()
+    return struct.unpack(SIGNATURE_FORMAT, b''.join(hashlib.blake2b(data, key=key).digest() for key in HASH_KEYS))
+
+
+def signature(features):
+    """MinHash signature of a feature set: the minimum of each hash function"""
+    return list(map(min, zip(*map(feature_hashes, features))))
+
+
+def buckets(features):
+    """LSH bucket of each band of the signature, as signed 64-bit integers"""
+    if not features:
+        return []
+    values = signature(features)
+    return [
+        int.from_bytes(hashlib.blake2b(
+            struct.pack(BAND_FORMAT, band, *values[band * BAND_SIZE:(band + 1) * BAND_SIZE]), digest_size=8
+        ).digest(), 'big', signed=True)
+        for band in range(LSH_BANDS)
+    ]
+
+
+def similarity(features, other):
+    return len(features & other) / len(features | other) if features and other else 0
+
+
+def stored_features(question):
+    return question_features(
+        question.text, [question.option_a, question.option_b, question.option_c, question.option_d]
+    )
+
+
+def band_rows(question):
+    """Unsaved QuestionBand rows of a saved question"""
+    return [
+        QuestionBand(question_id=question.id, bucket=bucket)
+        for bucket in buckets(stored_features(question))
+    ]
+
+
+def index_questions(questions):
+    """Replace the index entries of saved questions"""
+    QuestionBand.objects.filter(question_id__in=[question.id for question in questions]).delete()
+    QuestionBand.objects.bulk_create([row for question in questions for row in band_rows(question)])
+
+
+def rebuild_index():
+    """Index every question in one streaming pass, returning the count"""
+    QuestionBand.objects.all().delete()
+    count = 0
+    rows = []
+    questions = Question.objects.only('id', *INDEXED_FIELDS).iterator(chunk_size=REBUILD_BATCH_SIZE)
+    for count, question in enumerate(questions, 1):
+        rows.extend(band_rows(question))
+        if len(rows) >= REBUILD_BATCH_SIZE:
+            QuestionBand.objects.bulk_create(rows)
+            rows = []
+    QuestionBand.objects.bulk_create(rows)
+    return count
+
+
+def find_near_duplicates(configs, quiz_dates=()):
+    """Warnings for config questions that nearly repeat another question
+
+    Questions are compared with the question bank, except the quizzes of
+    quiz_dates, which the import replaces, and with each other.
+    """
+    threshold = settings.QUIZ_NEAR_DUPLICATE_THRESHOLD
+    incoming = []
+    for source, config in configs:
+        for number, question in enumerate(config['questions'], 1):
+            features = question_features(question['question'], question['options'])
+            incoming.append((source, number, question['question'], features, buckets(features)))
+
+    # Candidates from the question bank, through the bucket index
+    all_buckets = sorted({bucket for *_, question_buckets in incoming for bucket in question_buckets})
+    candidates = {}
+    for start in range(0, len(all_buckets), BUCKET_QUERY_SIZE):
+        rows = QuestionBand.objects.filter(
+            bucket__in=all_buckets[start:start + BUCKET_QUERY_SIZE]
+        ).exclude(question__quiz__date__in=quiz_dates).values_list('bucket', 'question_id')
+        for bucket, question_id in rows:
+            candidates.setdefault(bucket, []).append(question_id)
+
+    bank = {}
+    questions = Question.objects.filter(
+        id__in={question_id for ids in candidates.values() for question_id in ids}
+    ).select_related('quiz')
+    for question in questions:
+        bank[question.id] = (
+            f'question {question.order} of {question.quiz.date}', question.text, stored_features(question)
+        )
+
+    warnings = []
+    earlier = {}
+    for index, (source, number, _, features, question_buckets) in enumerate(incoming):
+        matches = {}
+        for bucket in question_buckets:
+            for question_id in candidates.get(bucket, ()):
+                other, text, other_features = bank[question_id]
+                matches[other] = (text, other_features)
+            # Earlier questions of the same import
+            for other_index in earlier.get(bucket, ()):
+                other_source, other_number, text, other_features, _ = incoming[other_index]
+                matches[f'question {other_number} of {other_source}'] = (text, other_features)
+            earlier.setdefault(bucket, []).append(index)
+
+        scored = sorted(
+            (similarity(features, other_features), other, text)
+            for other, (text, other_features) in matches.items()
+        )
+        for score, other, text in reversed(scored):
+            if score >= threshold:
+                warnings.append(f'{source}: ' + WARNING_NEAR_DUPLICATE.format(
+                    number=number, similarity=round(score * 100), other=other, text=text
+                ))
+    return warnings
@@ -0,0 +1,154 @@
+"""
+Server-Sent Events release notifications.
+
+Instead of polling the status endpoint around release time, clients hold an
+EventSource connection and receive a single ``quiz_released`` event when the
+next quiz is released. One asyncio task per worker sleeps until the release
+instant and wakes every subscriber at once, so idle connections cost no
+database access. Quizzes that are held back (not is_released) are skipped,
+and the task re-reads the schedule before publishing and whenever it is
+invalidated, so schedule edits made while it sleeps are honoured.
+
+The stream needs the ASGI entry point (``kwiz_project.asgi``); under WSGI a
+connection would hold a whole worker.
+"""
+
+import asyncio
+import json
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+
+from .cache import load_quiz_payload
+from .schedule import get_schedule, on_schedule_invalidated
+from .views import quiz_payload_etag
+
+logger = logging.getLogger(__name__)
+
+
+class ReleaseNotifier:
+    """Wakes every waiting subscriber when the next quiz is released"""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.release = self.loop.create_future()
+        self.changed = asyncio.Event()
+        # Release instant of the last quiz announced, or of the notifier start
+        self.announced_at = time.time()
+        on_schedule_invalidated(self.wake)
+        self.task = self.loop.create_task(self.run())
+
+    def next_release(self):
+        """Future resolved with the event data of the next release"""
+        return self.release
+
+    def wake(self):
+        """Re-read the schedule now, called from any thread"""
+        try:
+            self.loop.call_soon_threadsafe(self.changed.set)
+        except RuntimeError:
+            # The event loop has been closed
+            pass
+
+    async def run(self):
+        while True:
+            self.changed.clear()
+            # Re-check periodically so changes made by other workers are picked up
+            delay = settings.QUIZ_EVENTS_RECHECK_SECONDS
+            try:
+                # Re-read on every pass, so a quiz held back or moved while
+                # sleeping is never announced
+                schedule = await _run_in_thread(get_schedule)
+                entry = schedule.next_release(self.announced_at)
+                if entry is not None:
+                    now = time.time()
+                    if entry.release_at <= now:
+                        loaded = await _run_in_thread(load_quiz_payload, entry.date)
+                        self.publish(entry, loaded, schedule.next_quiz_info(now))
+                        self.announced_at = entry.release_at
+                        continue
+                    delay = min(delay, entry.release_at - now)
+            except Exception:
+                logger.exception('Failed to publish the quiz release event')
+
+            try:
+                await asyncio.wait_for(self.changed.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def publish(self, entry, loaded, next_quiz_info):
+        payload, _ = loaded
+        release, self.release = self.release, self.loop.create_future()
+        release.set_result({
+            'date': entry.date.strftime('%Y-%m-%d'),
+            'title': entry.title,
+            'category': entry.category,
+            # The ETag the daily quiz endpoint sends for the released quiz
+            'version': quiz_payload_etag(payload, next_quiz_info) if payload else None,
+        })
+
+
+async def _run_in_thread(func, *args):
+    """Run a database call off the event loop
+
+    The notifier outlives the request that started it, so it cannot use the
+    request's thread-sensitive executor.
+    """
+    def call():
+        try:
+            return func(*args)
+        finally:
+            connection.close()
+    return await sync_to_async(call, thread_sensitive=False)()
+
+
+_notifiers = {}
+
+
+def get_notifier():
+    """Get the notifier for the running event loop, starting it if needed"""
+    loop = asyncio.get_running_loop()
+    notifier = _notifiers.get(loop)
+    if notifier is None:
+        notifier = _notifiers[loop] = ReleaseNotifier()
+    return notifier
+
+
+async def release_event_stream(notifier):
+    yield f'retry: {settings.QUIZ_EVENTS_RETRY_MS}\n\n'
+    while True:
+        try:
+            event = await asyncio.wait_for(
+                asyncio.shield(notifier.next_release()),
+                timeout=settings.QUIZ_EVENTS_HEARTBEAT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            # Comment lines keep proxies from closing idle connections
+            yield ': keep-alive\n\n'
+            continue
+
+        yield f'event: quiz_released\ndata: {json.dumps(event)}\n\n'
+        return
+
+
+async def quiz_release_events(request):
+    """Stream a quiz_released event when the next quiz is released"""
+    # require_GET does not wrap async views before Django 5.0
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({
+            'error': 'Release events require the ASGI server, poll /api/quiz/status/ instead'
+        }, status=501)
+
+    response = StreamingHttpResponse(
+        release_event_stream(get_notifier()), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,162 @@
+"""
+Compiled answer keys for grading quiz submissions.
+
+Each quiz date is compiled once into the correct option text per question,
+plus the quiz title and category, and kept in a per-worker LRU. Grading a
+submission is then a loop over in-memory data with no ORM access. Changes
+bump a version key in the shared cache, which drops the compiled keys of
+every worker.
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+
+from .cache import bump_version, get_version, single_flight
+from .models import DailyQuiz
+from kwiz_project.constants import QUIZ_ANSWER_KEY_VERSION_KEY
+
+# answers is a tuple of (question_id, correct option text) in question order
+AnswerKey = namedtuple('AnswerKey', ['quiz_id', 'date', 'title', 'category', 'answers'])
+
+_answer_keys = OrderedDict()
+# Shared answer key version the compiled keys were loaded at
+_version = None
+_lock = threading.Lock()
+
+
+def compile_answer_key(quiz):
+    """Compile the answer key for a quiz and its questions"""
+    answers = tuple(
+        (question.id, question.get_correct_answer_text())
+        for question in quiz.questions.all()
+    )
+    return AnswerKey(quiz.id, quiz.date, quiz.title, quiz.category.name, answers)
+
+
+def _check_version():
+    """Drop the compiled keys if they were invalidated, returning the version"""
+    global _version
+    version = get_version(QUIZ_ANSWER_KEY_VERSION_KEY)
+    with _lock:
+        if version != _version:
+            _answer_keys.clear()
+            _version = version
+    return version
+
+
+def get_answer_key(quiz_date):
+    """Get the compiled answer key for a date, or None if there is no quiz"""
+    version = _check_version()
+    with _lock:
+        answer_key = _answer_keys.get(quiz_date)
+        if answer_key is not None:
+            _answer_keys.move_to_end(quiz_date)
+            return answer_key
+
+    return single_flight(f'answer-key:{version}:{quiz_date}', lambda: _load_answer_key(quiz_date, version))
+
+
+def _load_answer_key(quiz_date, version):
+    quiz = DailyQuiz.objects.select_related('category').prefetch_related(
+        'questions'
+    ).filter(date=quiz_date).first()
+    if quiz is None:
+        return None
+
+    answer_key = compile_answer_key(quiz)
+    _remember(answer_key, version)
+    return answer_key
+
+
+def get_answer_keys(quiz_dates):
+    """Get compiled answer keys for many dates, loading all misses at once
+
+    Dates without a quiz are left out of the returned dict.
+    """
+    version = _check_version()
+    answer_keys = {}
+    with _lock:
+        for quiz_date in quiz_dates:
+            answer_key = _answer_keys.get(quiz_date)
+            if answer_key is not None:
+                _answer_keys.move_to_end(quiz_date)
+                answer_keys[quiz_date] = answer_key
+
+    missing = set(quiz_dates) - set(answer_keys)
+    if not missing:
+        return answer_keys
+
+    # Quizzes rather than questions, so a quiz without questions is still
+    # found, as it is by get_answer_key()
+    quizzes = DailyQuiz.objects.select_related('category').prefetch_related(
+        'questions'
+    ).filter(date__in=missing)
+
+    for quiz in quizzes:
+        answer_key = compile_answer_key(quiz)
+        _remember(answer_key, version)
+        answer_keys[quiz.date] = answer_key
+    return answer_keys
+
+
+def _remember(answer_key, version):
+    with _lock:
+        if version != _version:
+            # Invalidated while loading, the key may be out of date
+            return
+        _answer_keys[answer_key.date] = answer_key
+        _answer_keys.move_to_end(answer_key.date)
+        while len(_answer_keys) > settings.QUIZ_ANSWER_KEY_CACHE_SIZE:
+            _answer_keys.popitem(last=False)
+
+
+def invalidate_answer_key(quiz_date=None):
+    """Drop the answer key for a date, or every answer key
+
+    Other workers drop all of their compiled keys on their next lookup.
+    """
+    with _lock:
+        if quiz_date is None:
+            _answer_keys.clear()
+        else:
+            _answer_keys.pop(quiz_date, None)
+    bump_version(QUIZ_ANSWER_KEY_VERSION_KEY)
+
+
+def grade_answers(answer_key, answers):
+    """Grade submitted answers against a compiled answer key"""
+    answer_map = {}
+    for answer in answers:
+        answer_map[int(answer['question_id'])] = answer['selected_option']
+
+    score = 0
+    results = []
+    for question_id, correct_answer_text in answer_key.answers:
+        user_answer = answer_map.get(question_id, '')
+        is_correct = user_answer == correct_answer_text
+
+        if is_correct:
+            score += 1
+
+        results.append({
+            'question_id': question_id,
+            'correct': is_correct,
+            'correct_answer': correct_answer_text,
+            'user_answer': user_answer
+        })
+
+    total_questions = len(answer_key.answers)
+    percentage = round((score / total_questions) * 100) if total_questions > 0 else 0
+
+    # Return data for frontend to format share text
+    return {
+        'score': score,
+        'total': total_questions,
+        'percentage': percentage,
+        'results': results,
+        'quiz_date': answer_key.date.strftime('%Y-%m-%d'),
+        'quiz_title': answer_key.title,
+        'category': answer_key.category
+    }
@@ -0,0 +1,91 @@
+"""
+HTTP helpers for conditional GET handling and caching of quiz API responses.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+
+
+def content_etag(*parts):
+    """Build a strong ETag from a hash of the given bytes or strings"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode()
+        digest.update(part)
+        digest.update(b'\0')
+    return quote_etag(digest.hexdigest()[:32])
+
+
+def weak_etag(*parts):
+    """Build a weak ETag, for bodies that only match semantically"""
+    return 'W/' + content_etag(*parts)
+
+
+def set_validators(response, etag, last_modified=None):
+    """Attach ETag and Last-Modified headers to a response"""
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def not_modified_response(request, etag, last_modified=None):
+    """Return a 304 response if the client's copy is current, otherwise None"""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def json_response(body, etag, last_modified=None):
+    """Build a response from an already encoded JSON body"""
+    response = HttpResponse(body, content_type='application/json')
+    return set_validators(response, etag, last_modified)
+
+
+def conditional_json_response(request, body, etag, last_modified=None):
+    """Return a 304 if the client's copy is current, otherwise the body"""
+    response = not_modified_response(request, etag, last_modified)
+    if response is None:
+        response = json_response(body, etag, last_modified)
+    return response
+
+
+def cache_immutable(response):
+    """Let browsers and the CDN keep a response that no longer changes"""
+    max_age = settings.QUIZ_HTTP_IMMUTABLE_MAX_AGE
+    patch_cache_control(response, public=True, max_age=max_age, s_maxage=max_age, immutable=True)
+    return response
+
+
+def cache_until(response, seconds):
+    """Let browsers and the CDN reuse a response for the next seconds only
+
+    Part of the window is a stale-while-revalidate allowance, so a refresh
+    starts shortly before the deadline and nothing is served after it.
+    """
+    stale = min(settings.QUIZ_HTTP_STALE_WHILE_REVALIDATE, seconds)
+    patch_cache_control(
+        response, public=True, max_age=seconds - stale, s_maxage=seconds - stale,
+        stale_while_revalidate=stale
+    )
+    return response
+
+
+def cache_strictly_until(response, seconds):
+    """Let browsers and the CDN reuse a response, never past the next seconds"""
+    patch_cache_control(
+        response, public=True, max_age=seconds, s_maxage=seconds, must_revalidate=True
+    )
+    return response
+
+
+def cache_timer(response, seconds):
+    """Let browsers and the CDN reuse a response carrying a live countdown
+    for a few seconds at most, since a cached countdown is off by its age"""
+    return cache_strictly_until(response, min(seconds, settings.QUIZ_HTTP_TIMER_MAX_AGE))
@@ -0,0 +1,207 @@
+"""
+Bulk import of quiz configs.
+
+An upload may hold many configs, so a month of quizzes can be imported in
+one pass. Every config is validated before anything is written; the
+quizzes and then all of their questions are inserted with one bulk_create
+each inside a single transaction, so an import either fully succeeds or
+leaves the database untouched.
+
+Re-importing an existing quiz updates it in place, matching questions by
+order, because clients submit answers by question id.
+
+Questions that nearly repeat one already in the bank, or another question
+of the same import, are reported as warnings but still imported.
+"""
+
+from collections import namedtuple
+
+from django.db import transaction
+
+from .configs import ConfigValidationError, check_config
+from .duplicates import find_near_duplicates, index_questions
+from .models import Category, DailyQuiz, Question
+from .schedule import invalidate_schedule
+from .signals import invalidate_quiz_date
+from kwiz_project.constants import (
+    ANSWER_CHOICES, ERROR_QUIZ_ALREADY_EXISTS, ERROR_DUPLICATE_QUIZ_DATE,
+    ERROR_NO_CONFIGS, DEFAULT_CATEGORY_DESCRIPTION_TEMPLATE
+)
+
+# Fields set from a config, compared when updating an existing quiz
+QUIZ_IMPORT_FIELDS = ['category_id', 'title', 'description', 'background_image']
+QUESTION_IMPORT_FIELDS = ['text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_answer']
+
+# quizzes are every imported quiz by date; created and changed are dates;
+# warnings name near-duplicate questions
+ImportResult = namedtuple('ImportResult', ['quizzes', 'created', 'changed', 'warnings'])
+
+
+def check_configs(configs, update=False):
+    """Validate every config before import, returning their quiz dates
+
+    Errors from all configs are collected into one ConfigValidationError,
+    each prefixed with the source of its config. Dates that already have a
+    quiz are an error unless updating.
+    """
+    if not configs:
+        raise ConfigValidationError([ERROR_NO_CONFIGS])
+
+    errors = []
+    sources = {}
+    for source, config in configs:
+        try:
+            quiz_date = check_config(source, config)
+        except ConfigValidationError as e:
+            errors.extend(e.errors)
+            continue
+
+        if quiz_date in sources:
+            errors.append(f'{source}: ' + ERROR_DUPLICATE_QUIZ_DATE.format(
+                date=quiz_date, source=sources[quiz_date]
+            ))
+        else:
+            sources[quiz_date] = source
+
+    if not update:
+        existing = DailyQuiz.objects.filter(date__in=sources).order_by('date').values_list('date', flat=True)
+        for quiz_date in existing:
+            errors.append(f'{sources[quiz_date]}: ' + ERROR_QUIZ_ALREADY_EXISTS.format(date=quiz_date))
+
+    if errors:
+        raise ConfigValidationError(errors)
+    return list(sources)
+
+
+def get_categories(names):
+    """Get categories by name, creating missing ones in one insert"""
+    categories = {}
+    for category in Category.objects.filter(name__in=names).order_by('id'):
+        categories.setdefault(category.name, category)
+
+    missing = [
+        Category(name=name, description=DEFAULT_CATEGORY_DESCRIPTION_TEMPLATE.format(category=name))
+        for name in sorted(set(names) - set(categories))
+    ]
+    for category in Category.objects.bulk_create(missing):
+        categories[category.name] = category
+    return categories
+
+
+def build_questions(quiz, config):
+    """Build unsaved questions for a quiz from its config"""
+    return [
+        Question(
+            quiz=quiz,
+            order=order,
+            text=q_data['question'],
+            option_a=q_data['options'][0],
+            option_b=q_data['options'][1],
+            option_c=q_data['options'][2],
+            option_d=q_data['options'][3],
+            correct_answer=ANSWER_CHOICES[q_data['correct_answer']]
+        )
+        for order, q_data in enumerate(config['questions'], 1)
+    ]
+
+
+def build_quiz(quiz_date, category, config):
+    """Build an unsaved quiz from its config"""
+    return DailyQuiz(
+        date=quiz_date,
+        category=category,
+        title=config['title'],
+        description=config.get('description', ''),
+        background_image=config.get('background_image', ''),
+        is_released=True
+    )
+
+
+def diff_fields(current, incoming, fields):
+    """Copy changed field values onto current, returning whether any changed"""
+    changed = False
+    for field in fields:
+        value = getattr(incoming, field)
+        # Blank optional fields may be stored as NULL or as ''
+        if (getattr(current, field) or '') != (value or ''):
+            setattr(current, field, value)
+            changed = True
+    return changed
+
+
+def import_configs(configs, update=False):
+    """Validate and import (source, config) pairs in one transaction
+
+    With update, quizzes that already exist are diffed against their config
+    by question order: only changed rows are written, so unchanged questions
+    keep their ids and only the changed dates are invalidated.
+    """
+    quiz_dates = check_configs(configs, update)
+    # Quizzes being updated are not compared with their own stored questions
+    warnings = find_near_duplicates(configs, quiz_dates if update else ())
+
+    with transaction.atomic():
+        categories = get_categories({config['category'] for _, config in configs})
+        existing = {}
+        if update:
+            existing = {
+                quiz.date: quiz for quiz in
+                DailyQuiz.objects.filter(date__in=quiz_dates).prefetch_related('questions')
+            }
+
+        new_quizzes = []
+        new_questions = []
+        updated_quizzes = []
+        updated_questions = []
+        deleted_questions = []
+        changed = set()
+
+        for quiz_date, (_, config) in zip(quiz_dates, configs):
+            incoming = build_quiz(quiz_date, categories[config['category']], config)
+            quiz = existing.get(quiz_date)
+            if quiz is None:
+                new_quizzes.append((incoming, config))
+                continue
+
+            if diff_fields(quiz, incoming, QUIZ_IMPORT_FIELDS):
+                updated_quizzes.append(quiz)
+                changed.add(quiz_date)
+
+            stored = {question.order: question for question in quiz.questions.all()}
+            for question in build_questions(quiz, config):
+                current = stored.pop(question.order, None)
+                if current is None:
+                    new_questions.append(question)
+                    changed.add(quiz_date)
+                elif diff_fields(current, question, QUESTION_IMPORT_FIELDS):
+                    updated_questions.append(current)
+                    changed.add(quiz_date)
+            if stored:
+                deleted_questions.extend(question.id for question in stored.values())
+                changed.add(quiz_date)
+
+        created = DailyQuiz.objects.bulk_create([quiz for quiz, _ in new_quizzes])
+        for quiz, config in new_quizzes:
+            new_questions.extend(build_questions(quiz, config))
+
+        DailyQuiz.objects.bulk_update(updated_quizzes, QUIZ_IMPORT_FIELDS)
+        Question.objects.filter(id__in=deleted_questions).delete()
+        Question.objects.bulk_update(updated_questions, QUESTION_IMPORT_FIELDS)
+        Question.objects.bulk_create(new_questions)
+        index_questions(updated_questions + new_questions)
+
+        created_dates = [quiz.date for quiz in created]
+        # Bulk writes send no post_save signals
+        transaction.on_commit(lambda: invalidate_imported(
+            created_dates + sorted(changed), schedule_changed=bool(created or updated_quizzes)
+        ))
+
+    quizzes = sorted(created + list(existing.values()), key=lambda quiz: quiz.date)
+    return ImportResult(quizzes, created_dates, sorted(changed), warnings)
+
+
+def invalidate_imported(quiz_dates, schedule_changed=True):
+    if schedule_changed:
+        invalidate_schedule()
+    for quiz_date in quiz_dates:
+        invalidate_quiz_date(quiz_date)
@@ -0,0 +1,80 @@
+"""
+Import job queue backed by QuizConfigUpload rows.
+
+The admin only saves an upload as pending, with its bytes in the database so
+a worker in any container can read it. A run_import_worker process, run and
+restarted by the platform as its own process, claims pending uploads one at
+a time with SELECT ... FOR UPDATE SKIP LOCKED, so several workers never
+import the same file, and imports run outside the web workers. Uploads left processing by a worker that died are claimed
+again once their claim is older than QUIZ_IMPORT_JOB_TIMEOUT.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .configs import read_configs
+from .importer import import_configs
+from .models import QuizConfigUpload
+
+logger = logging.getLogger(__name__)
+
+
+def claim_job():
+    """Mark the oldest claimable upload as processing and return it, or None"""
+    stale_before = timezone.now() - timedelta(seconds=settings.QUIZ_IMPORT_JOB_TIMEOUT)
+    claimable = Q(status='pending') | Q(status='processing', started_at__lt=stale_before)
+
+    with transaction.atomic():
+        upload = QuizConfigUpload.objects.select_for_update(skip_locked=True).filter(
+            claimable
+        ).order_by('uploaded_at').first()
+        if upload is None:
+            return None
+
+        # Also guards backends without row locks, where two workers may
+        # select the same upload
+        upload.started_at = timezone.now()
+        claimed = QuizConfigUpload.objects.filter(claimable, pk=upload.pk).update(
+            status='processing', started_at=upload.started_at, finished_at=None
+        )
+        if not claimed:
+            return None
+
+    upload.status = 'processing'
+    upload.finished_at = None
+    return upload
+
+
+def run_job(upload):
+    """Import a claimed upload and record the outcome, returning whether it succeeded"""
+    try:
+        with upload.open_content() as file:
+            configs = read_configs(file, upload.file.name.split('/')[-1])
+        result = import_configs(configs, update=upload.update_existing)
+        quizzes = result.quizzes
+
+        # Record the quiz, or the date range of a multi-quiz upload
+        upload.quiz_date = quizzes[0].date
+        if len(quizzes) == 1:
+            upload.quiz_title = quizzes[0].title
+        else:
+            upload.quiz_title = f'{len(quizzes)} quizzes ({quizzes[0].date} to {quizzes[-1].date})'
+        upload.status = 'imported'
+        upload.error_message = ''
+        upload.warnings = '\n'.join(result.warnings)
+    except Exception as e:
+        logger.warning('Failed to import %s: %s', upload.file.name, e)
+        upload.status = 'failed'
+        upload.error_message = str(e)
+
+    upload.finished_at = timezone.now()
+    upload.save(update_fields=[
+        'status', 'error_message', 'warnings', 'quiz_date', 'quiz_title', 'finished_at'
+    ])
+    return upload.status == 'imported'
+
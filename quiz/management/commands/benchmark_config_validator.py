@@ -0,0 +1,45 @@
+import glob
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.configs import load_config_file, validator
+
+
+class Command(BaseCommand):
+    help = 'Measure how many quiz configs per second the config validator checks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=20000,
+            help='Number of configs to validate, cycling through the sample files',
+        )
+        parser.add_argument(
+            '--dir',
+            default=settings.QUIZ_CONFIG_DIR,
+            help='Directory of sample quiz config .json files',
+        )
+
+    def handle(self, *args, **options):
+        samples = []
+        for path in sorted(glob.glob(os.path.join(options['dir'], '*.json'))):
+            samples.extend(config for _, config, _ in load_config_file(path, path))
+        if not samples:
+            raise CommandError(f'No valid quiz configs found in {options["dir"]}')
+
+        configs = [samples[i % len(samples)] for i in range(options['count'])]
+        questions = sum(len(config['questions']) for config in configs)
+
+        validate = validator.validate
+        start = time.perf_counter()
+        invalid = sum(1 for config in configs if validate(config))
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Validated {len(configs)} configs ({questions} questions) in {elapsed:.3f}s: '
+            f'{len(configs) / elapsed:,.0f} configs/s, {invalid} invalid'
+        ))
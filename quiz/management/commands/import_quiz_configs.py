@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.configs import read_configs
+from quiz.duplicates import find_near_duplicates
+from quiz.importer import check_configs, import_configs
+from kwiz_project.constants import (
+    SUCCESS_CONFIGS_VALID, SUCCESS_QUIZ_IMPORTED, SUCCESS_QUIZZES_IMPORTED,
+    SUMMARY_QUIZZES_UPDATED
+)
+
+
+class Command(BaseCommand):
+    help = 'Import quiz config files (JSON objects, JSON arrays or ZIPs of them) in one transaction'
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+', help='Quiz config .json or .zip files')
+        parser.add_argument(
+            '--update',
+            action='store_true',
+            help='Update quizzes that already exist, keeping the ids of unchanged questions',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only validate the configs, reporting every error and near-duplicate question found',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            configs = []
+            for path in options['files']:
+                with open(path, 'rb') as file:
+                    configs.extend(read_configs(file, path))
+            if options['dry_run']:
+                quiz_dates = check_configs(configs, update=options['update'])
+                warnings = find_near_duplicates(configs, quiz_dates if options['update'] else ())
+            else:
+                result = import_configs(configs, update=options['update'])
+                warnings = result.warnings
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for warning in warnings:
+            self.stdout.write(self.style.WARNING(warning))
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(SUCCESS_CONFIGS_VALID.format(count=len(quiz_dates))))
+            return
+
+        quizzes = result.quizzes
+        if options['update']:
+            self.stdout.write(self.style.SUCCESS(SUMMARY_QUIZZES_UPDATED.format(
+                created=len(result.created), updated=len(result.changed),
+                unchanged=len(quizzes) - len(result.created) - len(result.changed)
+            )))
+            return
+
+        if len(quizzes) == 1:
+            message = SUCCESS_QUIZ_IMPORTED.format(title=quizzes[0].title, date=quizzes[0].date)
+        else:
+            message = SUCCESS_QUIZZES_IMPORTED.format(
+                count=len(quizzes), first=quizzes[0].date, last=quizzes[-1].date
+            )
+        self.stdout.write(self.style.SUCCESS(message))
@@ -1,33 +1,11 @@
 from django.core.management.base import BaseCommand
-from quiz.models import Category, DailyQuiz, Question
-from datetime import date
+from quiz.importer import import_configs
 
 
 class Command(BaseCommand):
     help = 'Import Rajesh Khanna Birthday Quiz for Dec 29, 2024'
 
     def handle(self, *args, **options):
-        # Check if quiz already exists
-        quiz_date = date(2024, 12, 29)
-        if DailyQuiz.objects.filter(date=quiz_date).exists():
-            self.stdout.write(self.style.WARNING(f"Quiz for {quiz_date} already exists. Deleting and recreating..."))
-            DailyQuiz.objects.filter(date=quiz_date).delete()
-
-        # Get or create category
-        category, _ = Category.objects.get_or_create(
-            name='Actors',
-            defaults={'description': 'Questions about Bollywood actors'}
-        )
-
-        # Create quiz
-        quiz = DailyQuiz.objects.create(
-            date=quiz_date,
-            category=category,
-            title='Rajesh Khanna Birthday Special',
-            description="Celebrating India's first superstar on his birthday - test your knowledge about the legendary Rajesh Khanna",
-            is_released=True
-        )
-
         # Quiz questions
         questions_data = [
             {
@@ -107,24 +85,26 @@ class Command(BaseCommand):
             }
         ]
 
-        # Create questions
-        answer_map = ['A', 'B', 'C', 'D']
-        for i, q_data in enumerate(questions_data):
-            Question.objects.create(
-                quiz=quiz,
-                order=i + 1,
-                text=q_data['text'],
-                option_a=q_data['options'][0],
-                option_b=q_data['options'][1],
-                option_c=q_data['options'][2],
-                option_d=q_data['options'][3],
-                correct_answer=answer_map[q_data['correct']]
-            )
+        # Re-running updates the quiz in place, so question ids stay stable
+        config = {
+            'date': '2024-12-29',
+            'category': 'Actors',
+            'title': 'Rajesh Khanna Birthday Special',
+            'description': "Celebrating India's first superstar on his birthday - test your knowledge about the legendary Rajesh Khanna",
+            'questions': [
+                {'question': q_data['text'], 'options': q_data['options'], 'correct_answer': q_data['correct']}
+                for q_data in questions_data
+            ]
+        }
+        result = import_configs([('rajesh_khanna', config)], update=True)
+        quiz = result.quizzes[0]
+        for warning in result.warnings:
+            self.stdout.write(self.style.WARNING(warning))
 
-        self.stdout.write(self.style.SUCCESS(f"✓ Successfully created quiz: {quiz.title}"))
+        action = 'created' if result.created else 'updated' if result.changed else 'unchanged'
+        self.stdout.write(self.style.SUCCESS(f"✓ Quiz {action}: {quiz.title}"))
         self.stdout.write(f"  Date: {quiz.date}")
         self.stdout.write(f"  Category: {quiz.category.name}")
         self.stdout.write(f"  Questions: {quiz.questions.count()}")
         self.stdout.write(f"  Is Released: {quiz.is_released}")
         self.stdout.write(f"  Is Available: {quiz.is_available}")
-
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from quiz.cache import load_quiz_payload
+from quiz.prewarm import prewarm_next_quiz
+from quiz.views import get_today_ist
+
+
+class Command(BaseCommand):
+    help = "Render today's and the next quiz into the payload cache"
+
+    def handle(self, *args, **options):
+        today = get_today_ist()
+        payload, _ = load_quiz_payload(today)
+        if payload is not None:
+            self.stdout.write(f'  ✓ Warmed {today}')
+        else:
+            self.stdout.write(f'  ⚠ No released quiz for {today}')
+
+        next_quiz = prewarm_next_quiz()
+        if next_quiz is not None:
+            self.stdout.write(
+                f"  ✓ Warmed {next_quiz['date']}: {next_quiz['title']} "
+                f"(releases in {next_quiz['time_until_release']}s)"
+            )
+        else:
+            self.stdout.write('  ⚠ No upcoming quiz scheduled')
+
+        self.stdout.write(self.style.SUCCESS('Quiz cache warmed'))
@@ -0,0 +1,110 @@
+import gzip
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from quiz.cache import build_quiz_payload, render_json
+from quiz.models import DailyQuiz
+from quiz.serializers import ArchiveQuizSerializer
+from quiz.views import get_today_ist
+from kwiz_project.constants import QUIZ_STATIC_SNAPSHOT_DIR
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_NAME = 'manifest.json'
+
+
+class Command(BaseCommand):
+    help = (
+        'Write pre-compressed JSON snapshots of past quizzes into STATIC_ROOT. Run at deploy: '
+        'WhiteNoise only serves files present at startup, so quizzes released later are '
+        'served by the API until the next deploy'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rewrite every snapshot even if its content is unchanged',
+        )
+
+    def handle(self, *args, **options):
+        self.output_dir = os.path.join(settings.STATIC_ROOT, QUIZ_STATIC_SNAPSHOT_DIR)
+        os.makedirs(os.path.join(self.output_dir, 'daily'), exist_ok=True)
+
+        manifest_path = os.path.join(self.output_dir, MANIFEST_NAME)
+        previous = {} if options['force'] else self.load_manifest(manifest_path)
+        manifest = {}
+
+        if brotli is None:
+            self.stdout.write(self.style.WARNING('Brotli is not installed, skipping .br files'))
+
+        # Today's quiz may not be out yet and its response carries a next_quiz
+        # timer, so only quizzes from before today are snapshotted
+        released = list(DailyQuiz.objects.filter(
+            date__lt=get_today_ist(),
+            is_released=True
+        ).select_related('category').prefetch_related('questions').order_by('-date'))
+        written = 0
+
+        for quiz in released:
+            # Past quizzes are sent without a next_quiz timer
+            body = build_quiz_payload(quiz)[:-1] + b',"time_until_release":0}'
+            written += self.publish(f'daily/{quiz.date}.json', body, previous, manifest)
+
+        archive = render_json(ArchiveQuizSerializer(released, many=True).data)
+        written += self.publish('archive.json', archive, previous, manifest)
+
+        # Remove snapshots of quizzes that were deleted or unreleased
+        removed = 0
+        for path in set(previous) - set(manifest):
+            for suffix in ('', '.gz', '.br'):
+                full_path = os.path.join(self.output_dir, path + suffix)
+                if os.path.exists(full_path):
+                    os.remove(full_path)
+            removed += 1
+
+        self.write_file(manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode())
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Published {len(released)} quiz snapshots '
+            f'({written} written, {removed} removed, '
+            f'{len(manifest) - written} unchanged)'
+        ))
+
+    def publish(self, path, body, previous, manifest):
+        """Write a snapshot and its compressed siblings if its content changed"""
+        content_hash = hashlib.sha256(body).hexdigest()
+        manifest[path] = content_hash
+
+        full_path = os.path.join(self.output_dir, path)
+        if previous.get(path) == content_hash and os.path.exists(full_path):
+            return 0
+
+        self.write_file(full_path, body)
+        self.write_file(full_path + '.gz', gzip.compress(body, mtime=0))
+        if brotli is not None:
+            self.write_file(full_path + '.br', brotli.compress(body))
+        return 1
+
+    @staticmethod
+    def write_file(path, content):
+        # Replace atomically so a running server never sees a partial file
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load_manifest(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from quiz.search import install_statements
+
+
+class Command(BaseCommand):
+    help = 'Recreate the question search index and refill it from every question'
+
+    def handle(self, *args, **options):
+        statements = install_statements(connection.vendor)
+        if not statements:
+            self.stdout.write(self.style.WARNING(
+                f'{connection.vendor} has no search index, searches use substring matches'
+            ))
+            return
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+        self.stdout.write(self.style.SUCCESS('Rebuilt the question search index'))
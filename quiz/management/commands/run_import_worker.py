@@ -0,0 +1,66 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from quiz.jobs import claim_job, run_job
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Import pending quiz config uploads queued from the admin'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Import every pending upload, then exit instead of polling',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Seconds to wait before checking again when the queue is empty',
+        )
+        parser.add_argument(
+            '--local-cache',
+            action='store_true',
+            help='Run without QUIZ_CACHE_URL, only when on the same machine as the web server',
+        )
+
+    def handle(self, *args, **options):
+        # Imports invalidate cached quizzes and answer keys through the shared
+        # cache; a file cache in another container would hide them from the web
+        # workers, which would keep grading against the old answers
+        if not settings.QUIZ_CACHE_URL and not options['local_cache']:
+            raise CommandError(
+                'QUIZ_CACHE_URL must point at the cache the web service uses, '
+                'or pass --local-cache to share its file cache on this machine'
+            )
+
+        while True:
+            close_old_connections()
+            try:
+                upload = claim_job()
+            except Exception:
+                # A lost database connection must not stop the queue for good
+                logger.exception('Failed to claim a quiz config upload')
+                time.sleep(options['poll_interval'])
+                continue
+            if upload is None:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+                continue
+
+            if run_job(upload):
+                self.stdout.write(self.style.SUCCESS(
+                    f'Imported {upload.file.name}: {upload.quiz_title} ({upload.duration:.2f}s)'
+                ))
+            else:
+                self.stderr.write(self.style.ERROR(
+                    f'Failed to import {upload.file.name}: {upload.error_message} ({upload.duration:.2f}s)'
+                ))
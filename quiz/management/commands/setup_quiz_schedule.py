@@ -1,66 +1,157 @@
-from django.core.management.base import BaseCommand
-from django.utils import timezone
-from datetime import date, timedelta, time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
 from quiz.models import DailyQuiz
+from quiz.schedule import invalidate_schedule
+from quiz.signals import invalidate_quiz_date
+from quiz.views import get_today_ist
+from kwiz_project.constants import DATE_FORMAT, DEFAULT_QUIZ_RELEASE_TIME, TIME_FORMAT
+
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
 
 
 class Command(BaseCommand):
-    help = 'Set up quiz release schedule for upcoming days'
+    help = 'Set quiz release times over a date range and report dates without a quiz'
 
     def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            type=str,
+            help='First date in YYYY-MM-DD format (default: today in IST)',
+        )
+        parser.add_argument(
+            '--end',
+            type=str,
+            help='Last date in YYYY-MM-DD format (default: --days days from the start)',
+        )
         parser.add_argument(
             '--days',
             type=int,
             default=7,
-            help='Number of days to set up (default: 7)',
+            help='Number of days to set up when --end is not given (default: 7)',
         )
         parser.add_argument(
             '--release-time',
             type=str,
-            default='00:00',
-            help='Release time in HH:MM format (default: 00:00)',
+            default=DEFAULT_QUIZ_RELEASE_TIME,
+            help=f'Release time in HH:MM format (default: {DEFAULT_QUIZ_RELEASE_TIME})',
+        )
+        parser.add_argument(
+            '--weekday-time',
+            action='append',
+            default=[],
+            metavar='DAY=HH:MM',
+            help='Release time for one weekday, e.g. sat=20:00 (repeatable)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Print the plan without changing anything',
         )
 
     def handle(self, *args, **options):
-        days = options['days']
-        release_time_str = options['release_time']
-        
+        start, end = self.parse_range(options)
+        release_times = self.parse_release_times(options)
+
+        # One query covers both the planned changes and the gap report
+        quizzes = list(
+            DailyQuiz.objects.filter(date__range=(start, end)).order_by('date').only(
+                'id', 'date', 'title', 'release_time'
+            )
+        )
+        changes = []
+        for quiz in quizzes:
+            release_time = release_times[quiz.date.weekday()]
+            if quiz.release_time != release_time:
+                changes.append((quiz, quiz.release_time))
+                quiz.release_time = release_time
+
+        scheduled = {quiz.date for quiz in quizzes}
+        gaps = [
+            start + timedelta(days=offset) for offset in range((end - start).days + 1)
+            if start + timedelta(days=offset) not in scheduled
+        ]
+
+        self.print_plan(start, end, release_times, quizzes, changes, gaps)
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run, nothing was changed'))
+            return
+
+        changed = [quiz for quiz, _ in changes]
+        with transaction.atomic():
+            DailyQuiz.objects.bulk_update(changed, ['release_time'], batch_size=500)
+            # bulk_update sends no post_save signals
+            transaction.on_commit(lambda: self.invalidate([quiz.date for quiz in changed]))
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully updated {len(changed)} quizzes'))
+        if gaps:
+            self.stdout.write(self.style.WARNING('Remember to create quiz configs for missing dates!'))
+
+    def parse_range(self, options):
         try:
-            # Parse release time
-            hour, minute = map(int, release_time_str.split(':'))
-            release_time = time(hour, minute)
+            start = datetime.strptime(options['start'], DATE_FORMAT).date() if options['start'] else get_today_ist()
+            if options['end']:
+                end = datetime.strptime(options['end'], DATE_FORMAT).date()
+            else:
+                end = start + timedelta(days=options['days'] - 1)
         except ValueError:
+            raise CommandError('Invalid date format. Use YYYY-MM-DD (e.g., 2026-01-31)')
+
+        if end < start:
+            raise CommandError('The end date must not be before the start date')
+        return start, end
+
+    def parse_release_times(self, options):
+        """Release time for each weekday, Monday first"""
+        try:
+            default = datetime.strptime(options['release_time'], TIME_FORMAT).time()
+            release_times = [default] * len(WEEKDAYS)
+            for value in options['weekday_time']:
+                day, _, day_time = value.partition('=')
+                release_times[WEEKDAYS.index(day.strip().lower()[:3])] = (
+                    datetime.strptime(day_time, TIME_FORMAT).time()
+                )
+        except ValueError:
+            raise CommandError('Invalid time format. Use HH:MM (e.g., 00:00) and DAY=HH:MM (e.g., sat=20:00)')
+        return release_times
+
+    def print_plan(self, start, end, release_times, quizzes, changes, gaps):
+        self.stdout.write(f'Quiz schedule from {start} to {end} ({(end - start).days + 1} days)')
+        self.stdout.write('Release times (IST): ' + ', '.join(
+            f'{day.capitalize()} {release_time.strftime(TIME_FORMAT)}'
+            for day, release_time in zip(WEEKDAYS, release_times)
+        ))
+
+        for quiz, previous in changes:
             self.stdout.write(
-                self.style.ERROR('Invalid time format. Use HH:MM (e.g., 00:00)')
+                f'  ✓ {quiz.date} {WEEKDAYS[quiz.date.weekday()].capitalize()}: '
+                f'{previous.strftime(TIME_FORMAT)} → {quiz.release_time.strftime(TIME_FORMAT)} {quiz.title}'
             )
-            return
-        
-        today = date.today()
-        updated_count = 0
-        
-        self.stdout.write(f'Setting up quiz schedule for next {days} days...')
-        self.stdout.write(f'Release time: {release_time_str} IST')
-        
-        for i in range(days):
-            quiz_date = today + timedelta(days=i)
-            
-            # Update existing quizzes or create placeholders
-            quizzes = DailyQuiz.objects.filter(date=quiz_date)
-            
-            if quizzes.exists():
-                # Update existing quizzes
-                for quiz in quizzes:
-                    quiz.release_time = release_time
-                    quiz.save()
-                    updated_count += 1
-                    self.stdout.write(f'  ✓ Updated {quiz_date}: {quiz.title}')
-            else:
-                # Create placeholder for future quiz
-                self.stdout.write(f'  ⚠ No quiz found for {quiz_date} - create one using quiz configs')
-        
-        self.stdout.write(
-            self.style.SUCCESS(f'Successfully updated {updated_count} quizzes')
-        )
+        for first, last in self.ranges(gaps):
+            days = (last - first).days + 1
+            span = f'{first}' if days == 1 else f'{first} to {last} ({days} days)'
+            self.stdout.write(f'  ⚠ No quiz for {span} - create one using quiz configs')
+
         self.stdout.write(
-            self.style.WARNING('Remember to create quiz configs for missing dates!')
+            f'{len(changes)} to update, {len(quizzes) - len(changes)} already scheduled, '
+            f'{len(gaps)} dates without a quiz'
         )
+
+    @staticmethod
+    def ranges(dates):
+        """Group sorted dates into (first, last) runs of consecutive days"""
+        runs = []
+        for day in dates:
+            if runs and day - runs[-1][1] == timedelta(days=1):
+                runs[-1][1] = day
+            else:
+                runs.append([day, day])
+        return [tuple(run) for run in runs]
+
+    @staticmethod
+    def invalidate(quiz_dates):
+        invalidate_schedule()
+        for quiz_date in quiz_dates:
+            invalidate_quiz_date(quiz_date)
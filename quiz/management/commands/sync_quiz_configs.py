@@ -0,0 +1,196 @@
+import hashlib
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from quiz.configs import load_config_file
+from quiz.importer import import_configs
+from quiz.models import DailyQuiz, QuizConfigFile
+from kwiz_project.constants import (
+    ERROR_DUPLICATE_QUIZ_DATE, ERROR_QUIZ_NOT_SYNCED, SUMMARY_QUIZZES_UPDATED
+)
+
+# Below this many changed files, parsing inline is faster than starting workers
+MIN_FILES_FOR_POOL = 16
+
+
+def run_inline(func, *args):
+    """Call a function in this process, wrapping its outcome in a Future"""
+    future = Future()
+    try:
+        future.set_result(func(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+class Command(BaseCommand):
+    help = (
+        'Create or update quizzes from new and changed files in the quiz_configs directory. '
+        'A file may only update quizzes it created, never those of another file or ones '
+        'created in the admin'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir',
+            default=settings.QUIZ_CONFIG_DIR,
+            help='Directory of quiz config .json or .zip files',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Processes used to parse and validate changed files',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Process every file even if its content is unchanged',
+        )
+        parser.add_argument(
+            '--adopt',
+            action='store_true',
+            help='Overwrite quizzes that were not created from a config file, such as admin edits',
+        )
+
+    def handle(self, *args, **options):
+        hashes = self.hash_files(options['dir'])
+        synced = {} if options['force'] else dict(
+            QuizConfigFile.objects.filter(path__in=hashes).values_list('path', 'sha256')
+        )
+        changed = sorted(path for path, sha256 in hashes.items() if synced.get(path) != sha256)
+        if not changed:
+            self.stdout.write(self.style.SUCCESS(f'All {len(hashes)} quiz config files are up to date'))
+            return
+
+        loaded, errors = self.load_files(options['dir'], changed, options['workers'])
+        applied, result = self.apply(loaded, hashes, errors, options['adopt'])
+
+        for error in errors:
+            self.stderr.write(self.style.ERROR(error))
+        self.stdout.write(self.style.SUCCESS(
+            f'Synced {len(hashes)} quiz config files '
+            f'({len(applied)} applied, {len(errors)} failed, {len(hashes) - len(changed)} unchanged)'
+        ))
+        if result is not None:
+            for warning in result.warnings:
+                self.stdout.write(self.style.WARNING(warning))
+            self.stdout.write(self.style.SUCCESS(SUMMARY_QUIZZES_UPDATED.format(
+                created=len(result.created), updated=len(result.changed),
+                unchanged=len(result.quizzes) - len(result.created) - len(result.changed)
+            )))
+        if errors:
+            # Fails the deploy, so rejected edits are not silently dropped
+            raise CommandError(f'{len(errors)} quiz config files could not be applied')
+
+    @staticmethod
+    def hash_files(config_dir):
+        """Hash every config file in the directory by name"""
+        hashes = {}
+        for name in sorted(os.listdir(config_dir)):
+            path = os.path.join(config_dir, name)
+            if name.endswith(('.json', '.zip')) and os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    hashes[name] = hashlib.sha256(f.read()).hexdigest()
+        return hashes
+
+    @staticmethod
+    def load_files(config_dir, names, workers):
+        """Parse and validate files, in worker processes when there are many"""
+        paths = [os.path.join(config_dir, name) for name in names]
+        if len(names) < MIN_FILES_FOR_POOL or workers <= 1:
+            futures = [run_inline(load_config_file, path, name) for name, path in zip(names, paths)]
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            futures = [executor.submit(load_config_file, path, name) for name, path in zip(names, paths)]
+
+        loaded = {}
+        errors = []
+        try:
+            for name, future in zip(names, futures):
+                try:
+                    loaded[name] = future.result()
+                except ValueError as e:
+                    # Already prefixed with the file or archive member name
+                    errors.append(str(e))
+                except OSError as e:
+                    errors.append(f'{name}: {e}')
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return loaded, errors
+
+    @staticmethod
+    def owners(loaded, hashes):
+        """Get the config file owning each existing quiz on the loaded dates
+
+        Quizzes of files that were deleted from the directory are free to
+        take over; quizzes not created from any file are owned by None.
+        """
+        quiz_dates = {quiz_date for configs in loaded.values() for _, _, quiz_date in configs}
+        return {
+            quiz_date: path for quiz_date, path in
+            DailyQuiz.objects.filter(date__in=quiz_dates).values_list('date', 'config_file__path')
+            if path is None or path in hashes
+        }
+
+    @classmethod
+    def apply(cls, loaded, hashes, errors, adopt=False):
+        """Create or update the quizzes of every valid file in one transaction"""
+        sources = {}
+        for name, configs in loaded.items():
+            for source, _, quiz_date in configs:
+                sources.setdefault(quiz_date, source)
+        owners = cls.owners(loaded, hashes)
+
+        applied = []
+        configs = []
+        for name, file_configs in loaded.items():
+            error = None
+            for source, _, quiz_date in file_configs:
+                owner = owners.get(quiz_date, name)
+                if sources[quiz_date] != source:
+                    error = f'{source}: ' + ERROR_DUPLICATE_QUIZ_DATE.format(
+                        date=quiz_date, source=sources[quiz_date]
+                    )
+                elif owner is None and not adopt:
+                    error = f'{source}: ' + ERROR_QUIZ_NOT_SYNCED.format(date=quiz_date)
+                elif owner is not None and owner != name and owner not in loaded:
+                    # A changed owner that still defines the date is caught above
+                    error = f'{source}: ' + ERROR_DUPLICATE_QUIZ_DATE.format(date=quiz_date, source=owner)
+                if error:
+                    break
+            if error:
+                errors.append(error)
+                continue
+
+            applied.append(name)
+            configs.extend((source, config) for source, config, _ in file_configs)
+
+        with transaction.atomic():
+            result = import_configs(configs, update=True) if configs else None
+            QuizConfigFile.objects.bulk_create(
+                [QuizConfigFile(path=name, sha256=hashes[name], synced_at=timezone.now()) for name in applied],
+                update_conflicts=True,
+                unique_fields=['path'],
+                update_fields=['sha256', 'synced_at'],
+            )
+            if result is not None:
+                cls.link_quizzes(loaded, applied, result.quizzes)
+        return applied, result
+
+    @staticmethod
+    def link_quizzes(loaded, applied, quizzes):
+        """Record which file each applied quiz came from"""
+        file_ids = dict(QuizConfigFile.objects.filter(path__in=applied).values_list('path', 'id'))
+        quizzes = {quiz.date: quiz for quiz in quizzes}
+        for name in applied:
+            for _, _, quiz_date in loaded[name]:
+                quizzes[quiz_date].config_file_id = file_ids[name]
+        DailyQuiz.objects.bulk_update(quizzes.values(), ['config_file'])
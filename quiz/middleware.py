@@ -0,0 +1,18 @@
+"""
+Middleware for the quiz API.
+"""
+
+from django.middleware.gzip import GZipMiddleware
+
+
+class QuizGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves the release event stream uncompressed
+
+    Compressing the stream would buffer events into gzip members, delaying
+    them until enough bytes pile up.
+    """
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith('text/event-stream'):
+            return response
+        return super().process_response(request, response)
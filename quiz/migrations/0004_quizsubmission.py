@@ -0,0 +1,28 @@
+# Generated by Django 4.2.22 on 2026-10-18 09:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_dailyquiz_background_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField()),
+                ('total', models.PositiveSmallIntegerField()),
+                ('submitted_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='quiz.dailyquiz')),
+            ],
+            options={
+                'ordering': ['-submitted_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.22 on 2026-10-18 09:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0005_questionstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailyquiz',
+            index=models.Index(fields=['is_released', 'date'], name='quiz_daily_released_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyquiz',
+            index=models.Index(fields=['category', 'date'], name='quiz_daily_category_date_idx'),
+        ),
+    ]
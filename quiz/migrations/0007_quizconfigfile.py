@@ -0,0 +1,26 @@
+# Generated by Django 4.2.22 on 2026-10-18 09:44
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0006_dailyquiz_archive_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizConfigFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=255, unique=True)),
+                ('sha256', models.CharField(max_length=64)),
+                ('synced_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['path'],
+            },
+        ),
+    ]
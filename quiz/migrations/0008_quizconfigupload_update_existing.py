@@ -0,0 +1,18 @@
+# Generated by Django 4.2.22 on 2026-10-18 09:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0007_quizconfigfile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizconfigupload',
+            name='update_existing',
+            field=models.BooleanField(default=False, help_text='Update quizzes that already exist instead of failing. Unchanged questions keep their ids.'),
+        ),
+    ]
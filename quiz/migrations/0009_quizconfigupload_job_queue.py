@@ -0,0 +1,32 @@
+# Generated by Django 4.2.22 on 2026-10-18 09:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0008_quizconfigupload_update_existing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizconfigupload',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='quizconfigupload',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='quizconfigupload',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('imported', 'Imported'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='quizconfigupload',
+            index=models.Index(fields=['status', 'uploaded_at'], name='quiz_upload_status_idx'),
+        ),
+    ]
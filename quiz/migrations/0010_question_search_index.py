@@ -0,0 +1,81 @@
+from django.db import migrations
+
+# Frozen copy of the SQL in quiz.search at the time of this migration, so
+# later changes to that module cannot change what this migration does.
+# Backends other than PostgreSQL and SQLite get no index.
+INSTALL_SQL = {
+    'postgresql': [
+        """
+        ALTER TABLE quiz_question ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', "text"), 'A') ||
+            setweight(to_tsvector('english', option_a || ' ' || option_b || ' ' || option_c || ' ' || option_d), 'B')
+        ) STORED
+        """,
+        'CREATE INDEX IF NOT EXISTS quiz_question_search_idx ON quiz_question USING GIN (search_vector)',
+    ],
+    'sqlite': [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS quiz_question_fts USING fts5(
+            text, option_a, option_b, option_c, option_d, content='quiz_question', content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS quiz_question_fts_insert AFTER INSERT ON quiz_question BEGIN
+            INSERT INTO quiz_question_fts (rowid, text, option_a, option_b, option_c, option_d)
+            VALUES (new.id, new.text, new.option_a, new.option_b, new.option_c, new.option_d);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS quiz_question_fts_delete AFTER DELETE ON quiz_question BEGIN
+            INSERT INTO quiz_question_fts (quiz_question_fts, rowid, text, option_a, option_b, option_c, option_d)
+            VALUES ('delete', old.id, old.text, old.option_a, old.option_b, old.option_c, old.option_d);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS quiz_question_fts_update AFTER UPDATE ON quiz_question BEGIN
+            INSERT INTO quiz_question_fts (quiz_question_fts, rowid, text, option_a, option_b, option_c, option_d)
+            VALUES ('delete', old.id, old.text, old.option_a, old.option_b, old.option_c, old.option_d);
+            INSERT INTO quiz_question_fts (rowid, text, option_a, option_b, option_c, option_d)
+            VALUES (new.id, new.text, new.option_a, new.option_b, new.option_c, new.option_d);
+        END
+        """,
+        # Index the questions that already exist
+        "INSERT INTO quiz_question_fts (quiz_question_fts) VALUES ('rebuild')",
+    ],
+}
+
+UNINSTALL_SQL = {
+    'postgresql': [
+        'DROP INDEX IF EXISTS quiz_question_search_idx',
+        'ALTER TABLE quiz_question DROP COLUMN IF EXISTS search_vector',
+    ],
+    'sqlite': [
+        'DROP TRIGGER IF EXISTS quiz_question_fts_insert',
+        'DROP TRIGGER IF EXISTS quiz_question_fts_delete',
+        'DROP TRIGGER IF EXISTS quiz_question_fts_update',
+        'DROP TABLE IF EXISTS quiz_question_fts',
+    ],
+}
+
+
+def install_search_index(apps, schema_editor):
+    for statement in INSTALL_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def uninstall_search_index(apps, schema_editor):
+    for statement in UNINSTALL_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0009_quizconfigupload_job_queue'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 4.2.22 on 2026-10-18 09:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+import hashlib
+import re
+import struct
+
+# Frozen copy of the band computation in quiz.duplicates at the time of this
+# migration, so the migration keeps working whatever that module becomes.
+# Bands written here only match lookups while the live computation is the
+# same; a change to it must ship with a rebuild_duplicate_index run.
+LSH_BANDS = 32
+BAND_SIZE = 4
+SIGNATURE_SIZE = LSH_BANDS * BAND_SIZE
+HASH_KEYS = [f'kwiz-minhash-{index}'.encode() for index in range(SIGNATURE_SIZE // 16)]
+STOP_WORDS = frozenset(
+    'a an and are as at by did does do for from has had have he her his how in '
+    'is it its of on or she the their they this to was were what when where '
+    'which who whom whose why with'.split()
+)
+BATCH_SIZE = 2000
+
+
+def words(text):
+    return re.findall(r'\w+', re.sub(r"['’]", '', text.casefold()))
+
+
+def features(question):
+    options = [question.option_a, question.option_b, question.option_c, question.option_d]
+    result = {word for word in words(question.text) if word not in STOP_WORDS}
+    result.update('option:' + ' '.join(words(option)) for option in options)
+    return result
+
+
+def feature_hashes(feature):
+    data = feature.encode()
+    return struct.unpack(
+        f'<{SIGNATURE_SIZE}I', b''.join(hashlib.blake2b(data, key=key).digest() for key in HASH_KEYS)
+    )
+
+
+def buckets(question):
+    question_features = features(question)
+    if not question_features:
+        return []
+    values = list(map(min, zip(*map(feature_hashes, question_features))))
+    return [
+        int.from_bytes(hashlib.blake2b(
+            struct.pack(f'<{BAND_SIZE + 1}I', band, *values[band * BAND_SIZE:(band + 1) * BAND_SIZE]),
+            digest_size=8
+        ).digest(), 'big', signed=True)
+        for band in range(LSH_BANDS)
+    ]
+
+
+def index_existing_questions(apps, schema_editor):
+    Question = apps.get_model('quiz', 'Question')
+    QuestionBand = apps.get_model('quiz', 'QuestionBand')
+    rows = []
+    for question in Question.objects.iterator(chunk_size=BATCH_SIZE):
+        rows.extend(QuestionBand(question_id=question.id, bucket=bucket) for bucket in buckets(question))
+        if len(rows) >= BATCH_SIZE:
+            QuestionBand.objects.bulk_create(rows)
+            rows = []
+    QuestionBand.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0010_question_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizconfigupload',
+            name='warnings',
+            field=models.TextField(blank=True, help_text='Near-duplicate questions found by the import'),
+        ),
+        migrations.CreateModel(
+            name='QuestionBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(db_index=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='quiz.question')),
+            ],
+        ),
+        migrations.RunPython(index_existing_questions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.22 on 2026-10-18 10:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0011_questionband_quizconfigupload_warnings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizconfigupload',
+            name='content',
+            field=models.BinaryField(default=b''),
+        ),
+    ]
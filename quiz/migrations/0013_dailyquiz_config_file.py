@@ -0,0 +1,19 @@
+# Generated by Django 4.2.22 on 2026-10-18 10:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0012_quizconfigupload_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyquiz',
+            name='config_file',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='quizzes', to='quiz.quizconfigfile'),
+        ),
+    ]
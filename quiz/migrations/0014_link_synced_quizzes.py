@@ -0,0 +1,78 @@
+import io
+import json
+import os
+import zipfile
+
+from django.conf import settings
+from django.db import migrations
+
+
+def config_dates(data):
+    """The quiz dates defined by a config file's JSON or ZIP bytes
+
+    A frozen copy of how sync_quiz_configs read files at the time of this
+    migration. Unreadable files and configs without a date are skipped.
+    """
+    if zipfile.is_zipfile(io.BytesIO(data)):
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            members = [
+                archive.read(member) for member in sorted(archive.namelist())
+                if member.endswith('.json') and not member.startswith('__MACOSX/')
+            ]
+    else:
+        members = [data]
+
+    dates = []
+    for member in members:
+        try:
+            configs = json.loads(member)
+        except ValueError:
+            continue
+        for config in configs if isinstance(configs, list) else [configs]:
+            if isinstance(config, dict) and isinstance(config.get('date'), str):
+                dates.append(config['date'])
+    return dates
+
+
+def link_synced_quizzes(apps, schema_editor):
+    """Link quizzes created before 0013 to the tracked file defining their date
+
+    Without this, sync_quiz_configs would treat every earlier quiz as created
+    in the admin and refuse to update it. Dates defined by more than one file
+    are left unlinked.
+    """
+    DailyQuiz = apps.get_model('quiz', 'DailyQuiz')
+    QuizConfigFile = apps.get_model('quiz', 'QuizConfigFile')
+
+    owners = {}
+    for config_file in QuizConfigFile.objects.all():
+        try:
+            with open(os.path.join(settings.QUIZ_CONFIG_DIR, config_file.path), 'rb') as f:
+                data = f.read()
+        except OSError:
+            continue
+        try:
+            dates = config_dates(data)
+        except zipfile.BadZipFile:
+            continue
+        for quiz_date in dates:
+            owners.setdefault(quiz_date, set()).add(config_file.id)
+
+    quizzes = []
+    for quiz in DailyQuiz.objects.filter(config_file__isnull=True):
+        file_ids = owners.get(quiz.date.isoformat(), set())
+        if len(file_ids) == 1:
+            quiz.config_file_id = file_ids.pop()
+            quizzes.append(quiz)
+    DailyQuiz.objects.bulk_update(quizzes, ['config_file'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0013_dailyquiz_config_file'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_synced_quizzes, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,18 @@
+import io
 from django.db import models
 from django.utils import timezone
 from datetime import date, datetime, time
 import pytz
+from kwiz_project.constants import (
+    MAX_BACKGROUND_IMAGE_LENGTH, MAX_CATEGORY_NAME_LENGTH, MAX_OPTION_LENGTH,
+    MAX_QUIZ_TITLE_LENGTH
+)
+
+IST = pytz.timezone('Asia/Kolkata')
 
 
 class Category(models.Model):
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=MAX_CATEGORY_NAME_LENGTH)
     description = models.TextField(blank=True)
 
     def __str__(self):
@@ -18,11 +25,15 @@ class Category(models.Model):
 class DailyQuiz(models.Model):
     date = models.DateField(unique=True)
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
-    title = models.CharField(max_length=200)
+    title = models.CharField(max_length=MAX_QUIZ_TITLE_LENGTH)
     description = models.TextField(blank=True)
-    background_image = models.URLField(max_length=500, blank=True, null=True)
+    background_image = models.URLField(max_length=MAX_BACKGROUND_IMAGE_LENGTH, blank=True, null=True)
     release_time = models.TimeField(default="00:00")
     is_released = models.BooleanField(default=False)
+    # The config file sync_quiz_configs created or last updated this quiz from
+    config_file = models.ForeignKey(
+        'QuizConfigFile', on_delete=models.SET_NULL, null=True, blank=True, related_name='quizzes'
+    )
 
     def __str__(self):
         return f"Kwiz {self.date} - {self.category.name}"
@@ -32,10 +43,10 @@ class DailyQuiz(models.Model):
         """Check if quiz is available to play"""
         return self.is_quiz_released()
 
-    def is_quiz_released(self):
+    def is_quiz_released(self, now_ist=None):
         """Check if quiz should be released based on IST timezone"""
-        ist = pytz.timezone('Asia/Kolkata')
-        now_ist = datetime.now(ist)
+        if now_ist is None:
+            now_ist = datetime.now(IST)
         today_ist = now_ist.date()
 
         # Quiz is available if:
@@ -54,59 +65,56 @@ class DailyQuiz(models.Model):
 
         # If quiz date is today, check if release time has passed
         quiz_release_datetime = datetime.combine(self.date, self.release_time)
-        quiz_release_datetime_ist = ist.localize(quiz_release_datetime)
+        quiz_release_datetime_ist = IST.localize(quiz_release_datetime)
 
         return now_ist >= quiz_release_datetime_ist
 
+    @staticmethod
+    def released_filter(now_ist=None):
+        """Q matching the quizzes is_quiz_released() would accept, for SQL"""
+        if now_ist is None:
+            now_ist = datetime.now(IST)
+        today_ist = now_ist.date()
+        return models.Q(is_released=True) & (
+            models.Q(date__lt=today_ist) |
+            models.Q(date=today_ist, release_time__lte=now_ist.time())
+        )
+
     def get_time_until_release(self):
         """Get time remaining until quiz release (in seconds)"""
         if self.is_quiz_released():
             return 0
 
-        ist = pytz.timezone('Asia/Kolkata')
-        now_ist = datetime.now(ist)
+        now_ist = datetime.now(IST)
 
         quiz_release_datetime = datetime.combine(self.date, self.release_time)
-        quiz_release_datetime_ist = ist.localize(quiz_release_datetime)
+        quiz_release_datetime_ist = IST.localize(quiz_release_datetime)
 
         time_diff = quiz_release_datetime_ist - now_ist
         return max(0, int(time_diff.total_seconds()))
 
     def get_next_quiz_info(self):
         """Get information about the next upcoming quiz"""
-        ist = pytz.timezone('Asia/Kolkata')
-        now_ist = datetime.now(ist)
-        today_ist = now_ist.date()
-
-        # Find next quiz after today
-        from django.db.models import Q
-        next_quiz = DailyQuiz.objects.filter(
-            Q(date__gt=today_ist) |
-            Q(date=today_ist, release_time__gt=now_ist.time())
-        ).order_by('date', 'release_time').first()
-
-        if next_quiz:
-            return {
-                'date': next_quiz.date,
-                'title': next_quiz.title,
-                'category': next_quiz.category.name,
-                'time_until_release': next_quiz.get_time_until_release()
-            }
-        return None
+        from .schedule import get_next_quiz_info
+        return get_next_quiz_info()
 
     class Meta:
         verbose_name_plural = "Daily Quizzes"
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['is_released', 'date'], name='quiz_daily_released_date_idx'),
+            models.Index(fields=['category', 'date'], name='quiz_daily_category_date_idx'),
+        ]
 
 
 class Question(models.Model):
     quiz = models.ForeignKey(DailyQuiz, on_delete=models.CASCADE, related_name='questions')
     order = models.PositiveIntegerField()
     text = models.TextField()
-    option_a = models.CharField(max_length=200)
-    option_b = models.CharField(max_length=200)
-    option_c = models.CharField(max_length=200)
-    option_d = models.CharField(max_length=200)
+    option_a = models.CharField(max_length=MAX_OPTION_LENGTH)
+    option_b = models.CharField(max_length=MAX_OPTION_LENGTH)
+    option_c = models.CharField(max_length=MAX_OPTION_LENGTH)
+    option_d = models.CharField(max_length=MAX_OPTION_LENGTH)
     correct_answer = models.CharField(max_length=1, choices=[
         ('A', 'Option A'),
         ('B', 'Option B'),
@@ -117,32 +125,134 @@ class Question(models.Model):
     def __str__(self):
         return f"Q{self.order}: {self.text[:50]}..."
 
+    def get_correct_answer_text(self):
+        """Get the text of the correct option"""
+        return {
+            'A': self.option_a,
+            'B': self.option_b,
+            'C': self.option_c,
+            'D': self.option_d,
+        }[self.correct_answer]
+
     class Meta:
         ordering = ['order']
         unique_together = ['quiz', 'order']
 
 
+class QuestionBand(models.Model):
+    """One LSH bucket of a question's MinHash signature, see quiz.duplicates"""
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='bands')
+    bucket = models.BigIntegerField(db_index=True)
+
+    def __str__(self):
+        return f"{self.question_id}: {self.bucket}"
+
+
+class QuestionStats(models.Model):
+    """Attempt and correct answer counters for a question"""
+    question = models.OneToOneField(
+        Question, on_delete=models.CASCADE, primary_key=True, related_name='stats'
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.question_id}: {self.correct}/{self.attempts}"
+
+    @property
+    def correct_rate(self):
+        """Percentage of attempts answered correctly"""
+        return round(self.correct * 100 / self.attempts) if self.attempts else None
+
+    class Meta:
+        verbose_name_plural = "Question stats"
+
+
+class QuizSubmission(models.Model):
+    """A graded quiz submission"""
+    quiz = models.ForeignKey(DailyQuiz, on_delete=models.CASCADE, related_name='submissions')
+    score = models.PositiveSmallIntegerField()
+    total = models.PositiveSmallIntegerField()
+    submitted_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.quiz_id}: {self.score}/{self.total}"
+
+    class Meta:
+        ordering = ['-submitted_at']
+
+
 class QuizConfigUpload(models.Model):
     """Model to handle quiz configuration file uploads"""
 
     STATUS_CHOICES = [
         ('pending', 'Pending'),
+        ('processing', 'Processing'),
         ('imported', 'Imported'),
         ('failed', 'Failed'),
     ]
 
     file = models.FileField(upload_to='quiz_configs/uploads/')
+    # The uploaded bytes, since the import worker may run in a container that
+    # cannot read the web container's disk
+    content = models.BinaryField(default=b'', editable=False)
+    update_existing = models.BooleanField(
+        default=False,
+        help_text='Update quizzes that already exist instead of failing. Unchanged questions keep their ids.'
+    )
     uploaded_at = models.DateTimeField(default=timezone.now)
     uploaded_by = models.CharField(max_length=255, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     error_message = models.TextField(blank=True)
+    warnings = models.TextField(blank=True, help_text='Near-duplicate questions found by the import')
     quiz_date = models.DateField(null=True, blank=True)
     quiz_title = models.CharField(max_length=255, blank=True)
+    # Set by the import worker when it claims and finishes the upload
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            models.Index(fields=['status', 'uploaded_at'], name='quiz_upload_status_idx'),
+        ]
         verbose_name = 'Quiz Config Upload'
         verbose_name_plural = 'Quiz Config Uploads'
 
     def __str__(self):
         return f"{self.file.name} - {self.status} ({self.uploaded_at.strftime('%Y-%m-%d %H:%M')})"
+
+    def save(self, *args, **kwargs):
+        # A newly uploaded file is not written to storage yet
+        if self.file and not self.file._committed:
+            self.file.seek(0)
+            self.content = self.file.read()
+            self.file.seek(0)
+        super().save(*args, **kwargs)
+
+    def open_content(self):
+        """Open the uploaded bytes, falling back to the stored file for older uploads"""
+        if self.content:
+            return io.BytesIO(self.content)
+        return self.file.open('rb')
+
+    @property
+    def duration(self):
+        """Seconds the import worker spent on this upload"""
+        if self.started_at and self.finished_at:
+            return (self.finished_at - self.started_at).total_seconds()
+        return None
+
+
+class QuizConfigFile(models.Model):
+    """Content hash of a quiz config file as of its last directory sync"""
+
+    path = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64)
+    synced_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['path']
+
+    def __str__(self):
+        return self.path
@@ -0,0 +1,69 @@
+"""
+Release-boundary cache pre-warming.
+
+Every player asks for the new quiz at its release instant, so each worker runs
+a timer that renders the next quiz into the payload cache a few seconds
+before it is released. The timer starts with the first request a worker serves.
+"""
+
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connection
+
+from .cache import warm_quiz_payload
+from .schedule import get_next_quiz_info
+
+logger = logging.getLogger(__name__)
+
+_timer = None
+_timer_lock = threading.Lock()
+
+
+def prewarm_next_quiz():
+    """Render the next quiz into the cache, returning its info"""
+    next_quiz = get_next_quiz_info()
+    if next_quiz is not None:
+        warm_quiz_payload(next_quiz['date'])
+    return next_quiz
+
+
+def start_prewarm_timer():
+    """Start this worker's pre-warm timer if it is not running yet"""
+    global _timer
+    if _timer is not None:
+        return
+    with _timer_lock:
+        if _timer is None:
+            _schedule(0)
+
+
+def _schedule(delay):
+    global _timer
+    _timer = threading.Timer(delay, _tick)
+    _timer.daemon = True
+    _timer.start()
+
+
+def _tick():
+    lead = settings.QUIZ_PREWARM_LEAD_SECONDS
+    # Re-check periodically so newly imported quizzes are picked up
+    delay = settings.QUIZ_PREWARM_RECHECK_SECONDS
+
+    try:
+        next_quiz = get_next_quiz_info()
+        if next_quiz is not None:
+            time_until_release = next_quiz['time_until_release']
+            if time_until_release <= lead:
+                warm_quiz_payload(next_quiz['date'])
+                # Wake again just after release to load the following quiz
+                delay = min(delay, time_until_release + 1)
+            else:
+                delay = min(delay, time_until_release - lead)
+    except Exception:
+        logger.exception('Failed to pre-warm the next quiz')
+    finally:
+        connection.close()
+
+    _schedule(delay)
@@ -0,0 +1,106 @@
+"""
+Per-question difficulty counters.
+
+Grading adds attempt and correct counts to an in-memory buffer in each
+worker. A background thread periodically writes the buffer in one batched
+UPDATE of F() increments, so submissions never issue an UPDATE per question.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, Value, When
+
+from .models import Question, QuestionStats
+
+logger = logging.getLogger(__name__)
+
+# Questions updated per UPDATE statement
+FLUSH_CHUNK_SIZE = 500
+
+
+def apply_question_stats(counts):
+    """Add {question_id: (attempts, correct)} to the stored counters"""
+    # Skip questions deleted since they were graded
+    question_ids = list(Question.objects.filter(id__in=counts).values_list('id', flat=True))
+    with transaction.atomic():
+        QuestionStats.objects.bulk_create(
+            [QuestionStats(question_id=question_id) for question_id in question_ids],
+            ignore_conflicts=True
+        )
+        for start in range(0, len(question_ids), FLUSH_CHUNK_SIZE):
+            chunk = question_ids[start:start + FLUSH_CHUNK_SIZE]
+            QuestionStats.objects.filter(question_id__in=chunk).update(
+                attempts=F('attempts') + Case(
+                    *[When(question_id=question_id, then=Value(counts[question_id][0])) for question_id in chunk],
+                    default=Value(0)
+                ),
+                correct=F('correct') + Case(
+                    *[When(question_id=question_id, then=Value(counts[question_id][1])) for question_id in chunk],
+                    default=Value(0)
+                ),
+            )
+
+
+class QuestionStatsBuffer:
+    """Per-worker buffer of question counters flushed on an interval"""
+
+    def __init__(self, flush_interval):
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.thread = None
+
+    def record(self, results):
+        """Count the graded results of one submission"""
+        if self.thread is None:
+            self.start()
+        with self.lock:
+            for result in results:
+                counts = self.counts.setdefault(result['question_id'], [0, 0])
+                counts[0] += 1
+                if result['correct']:
+                    counts[1] += 1
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name='quiz-question-stats', daemon=True
+                )
+                self.thread.start()
+
+    def run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+            connection.close()
+
+    def flush(self):
+        with self.lock:
+            counts, self.counts = self.counts, {}
+        if not counts:
+            return
+        try:
+            apply_question_stats(counts)
+        except Exception:
+            logger.exception('Failed to write stats for %d questions', len(counts))
+            # Keep the counts for the next flush
+            with self.lock:
+                for question_id, (attempts, correct) in counts.items():
+                    pending = self.counts.setdefault(question_id, [0, 0])
+                    pending[0] += attempts
+                    pending[1] += correct
+
+
+_buffer = QuestionStatsBuffer(settings.QUIZ_QUESTION_STATS_FLUSH_INTERVAL)
+atexit.register(_buffer.flush)
+
+
+def record_question_stats(results):
+    """Buffer attempt and correct counts from graded question results"""
+    _buffer.record(results)
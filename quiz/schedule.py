@@ -0,0 +1,187 @@
+"""
+In-memory release schedule index.
+
+Every quiz's release instant, title and category are loaded once per worker
+into a sorted index, so status checks and next-quiz lookups are a bisect with
+no database access. Model signals bump a version key in the shared cache and
+every worker reloads its index on next use; it is also reloaded periodically
+to pick up changes that sent no signal. Async views use aget_schedule(),
+which reloads with the async ORM.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import datetime
+
+from django.conf import settings
+
+from .models import IST, DailyQuiz
+from kwiz_project.constants import QUIZ_SCHEDULE_VERSION_KEY
+
+ScheduleEntry = namedtuple(
+    'ScheduleEntry', ['release_at', 'date', 'title', 'category', 'is_released', 'release_time']
+)
+
+
+def get_release_datetime(quiz_date, release_time):
+    """Get the aware IST datetime at which a quiz is released"""
+    return IST.localize(datetime.combine(quiz_date, release_time))
+
+
+class ReleaseSchedule:
+    """Quizzes sorted by release instant, queried by bisect"""
+
+    def __init__(self, entries):
+        self.entries = sorted(entries)
+        self.release_ats = [entry.release_at for entry in self.entries]
+        self.by_date = {entry.date: entry for entry in self.entries}
+        # Names of the categories that have at least one quiz
+        self.categories = frozenset(entry.category for entry in self.entries)
+
+    @staticmethod
+    def rows():
+        return DailyQuiz.objects.values_list(
+            'date', 'release_time', 'title', 'category__name', 'is_released'
+        )
+
+    @classmethod
+    def load(cls):
+        return cls.from_rows(cls.rows())
+
+    @classmethod
+    async def aload(cls):
+        return cls.from_rows([row async for row in cls.rows()])
+
+    @classmethod
+    def from_rows(cls, rows):
+        return cls(
+            ScheduleEntry(
+                get_release_datetime(quiz_date, release_time).timestamp(),
+                quiz_date, title, category, is_released, release_time
+            )
+            for quiz_date, release_time, title, category, is_released in rows
+        )
+
+    def get(self, quiz_date):
+        return self.by_date.get(quiz_date)
+
+    def next_entry(self, now):
+        """Get the first quiz released strictly after now"""
+        index = bisect_right(self.release_ats, now)
+        if index < len(self.entries):
+            return self.entries[index]
+        return None
+
+    def next_release(self, now):
+        """Get the first quiz released strictly after now, skipping held back quizzes"""
+        for entry in self.entries[bisect_right(self.release_ats, now):]:
+            if entry.is_released:
+                return entry
+        return None
+
+    @staticmethod
+    def is_available(entry, now):
+        return entry.is_released and entry.release_at <= now
+
+    @classmethod
+    def time_until_release(cls, entry, now):
+        if cls.is_available(entry, now):
+            return 0
+        return max(0, int(entry.release_at - now))
+
+    @staticmethod
+    def release_datetime(entry):
+        """Get the aware IST datetime of an entry's release"""
+        return datetime.fromtimestamp(entry.release_at, IST)
+
+    def next_quiz_info(self, now):
+        """Get information about the next upcoming quiz"""
+        entry = self.next_entry(now)
+        if entry is None:
+            return None
+        return {
+            'date': entry.date,
+            'title': entry.title,
+            'category': entry.category,
+            'time_until_release': self.time_until_release(entry, now),
+            'release_at': self.release_datetime(entry)
+        }
+
+
+_schedule = None
+_loaded_at = 0
+# Called from the invalidating thread after every invalidate_schedule()
+_invalidation_listeners = []
+# Shared schedule version the index was loaded at
+_version = None
+_lock = threading.Lock()
+
+
+def _fresh_schedule(version):
+    schedule = _schedule
+    if (schedule is not None and _version == version
+            and time.monotonic() - _loaded_at < settings.QUIZ_STATUS_CACHE_TIMEOUT):
+        return schedule
+    return None
+
+
+def _store_schedule(schedule, version):
+    global _schedule, _loaded_at, _version
+    _schedule, _loaded_at, _version = schedule, time.monotonic(), version
+
+
+def get_schedule():
+    """Get this worker's schedule index, loading it if missing or stale"""
+    # Imported here since quiz.cache depends on this module
+    from .cache import get_version
+    # Read before loading, so an invalidation during the load is not missed
+    version = get_version(QUIZ_SCHEDULE_VERSION_KEY)
+    schedule = _fresh_schedule(version)
+    if schedule is not None:
+        return schedule
+
+    with _lock:
+        schedule = _fresh_schedule(version)
+        if schedule is None:
+            schedule = ReleaseSchedule.load()
+            _store_schedule(schedule, version)
+        return schedule
+
+
+async def aget_schedule():
+    """get_schedule() for async views, loading at most once per event loop"""
+    from .cache import aget_version, async_single_flight
+    version = await aget_version(QUIZ_SCHEDULE_VERSION_KEY)
+    schedule = _fresh_schedule(version)
+    if schedule is not None:
+        return schedule
+    return await async_single_flight(('quiz:schedule', version), lambda: _aload_schedule(version))
+
+
+async def _aload_schedule(version):
+    schedule = await ReleaseSchedule.aload()
+    with _lock:
+        _store_schedule(schedule, version)
+    return schedule
+
+
+def invalidate_schedule():
+    """Mark the index stale in every worker so the next lookup reloads it"""
+    from .cache import bump_version
+    with _lock:
+        _store_schedule(None, None)
+    bump_version(QUIZ_SCHEDULE_VERSION_KEY)
+    for listener in list(_invalidation_listeners):
+        listener()
+
+
+def on_schedule_invalidated(listener):
+    """Call listener whenever this worker invalidates the schedule"""
+    _invalidation_listeners.append(listener)
+
+
+def get_next_quiz_info():
+    """Get information about the next upcoming quiz"""
+    return get_schedule().next_quiz_info(time.time())
@@ -0,0 +1,226 @@
+"""
+Live score distributions for "you beat X%" percentiles.
+
+Scores are small integers between 0 and the question count, so each quiz's
+distribution is a histogram array. Every worker counts new scores locally
+and merges them on a timer into a histogram kept in the shared cache, one
+atomically incremented key per score. A histogram missing from the cache is
+rebuilt from persisted submissions. Only Redis and memcached increment
+atomically across processes; with any other shared cache each worker instead
+recounts the histograms it serves from the database on every merge, once the
+submissions behind its local counts have been written. A percentile is then
+a sum over one short array, with no COUNT query per submission.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import connection
+from django.db.models import Count
+from django.utils.connection import ConnectionProxy
+
+from .models import QuizSubmission
+from .submissions import wait_for_submissions
+from kwiz_project.constants import QUIZ_SCORE_BUCKET_KEY, QUIZ_SCORE_SIZE_KEY, SHARED_CACHE_ALIAS
+
+# Every worker increments the histograms, so they skip the per-worker tier
+cache = ConnectionProxy(caches, SHARED_CACHE_ALIAS)
+
+logger = logging.getLogger(__name__)
+
+
+def _grow(histogram, size):
+    if len(histogram) < size:
+        histogram.extend([0] * (size - len(histogram)))
+    return histogram
+
+
+def calculate_percentile(score, *histograms):
+    """Percentage of previously recorded scores strictly below score"""
+    below = sum(sum(histogram[:score]) for histogram in histograms)
+    count = sum(sum(histogram) for histogram in histograms)
+    return round(below * 100 / count) if count else 0
+
+
+def has_atomic_incr():
+    """Whether the shared cache increments a key atomically across processes"""
+    return isinstance(caches[SHARED_CACHE_ALIAS], (RedisCache, BaseMemcachedCache))
+
+
+def load_shared_histogram(quiz_id):
+    """Read a quiz's shared histogram, rebuilding it from the database if missing"""
+    if not has_atomic_incr():
+        # Increments would lose counts, so the database is the shared store
+        return count_histogram(quiz_id)
+    size = cache.get(QUIZ_SCORE_SIZE_KEY.format(quiz_id=quiz_id))
+    if size is not None:
+        keys = [QUIZ_SCORE_BUCKET_KEY.format(quiz_id=quiz_id, score=score) for score in range(size)]
+        buckets = cache.get_many(keys)
+        if len(buckets) == size:
+            return [buckets[key] for key in keys]
+    return rebuild_shared_histogram(quiz_id)
+
+
+def count_histogram(quiz_id):
+    """Count a quiz's histogram from persisted submissions"""
+    rows = QuizSubmission.objects.filter(quiz_id=quiz_id).values('score').annotate(count=Count('id'))
+
+    histogram = []
+    for row in rows:
+        _grow(histogram, row['score'] + 1)[row['score']] = row['count']
+    return histogram
+
+
+def rebuild_shared_histogram(quiz_id):
+    """Recount a quiz's histogram from persisted submissions into the cache"""
+    histogram = count_histogram(quiz_id)
+    _store_shared_histogram(quiz_id, histogram)
+    return histogram
+
+
+def _store_shared_histogram(quiz_id, histogram):
+    buckets = {
+        QUIZ_SCORE_BUCKET_KEY.format(quiz_id=quiz_id, score=score): count
+        for score, count in enumerate(histogram)
+    }
+    cache.set_many(buckets, None)
+    cache.set(QUIZ_SCORE_SIZE_KEY.format(quiz_id=quiz_id), len(histogram), None)
+
+
+def push_shared_histogram(quiz_id, delta):
+    """Add locally counted scores to a quiz's shared histogram"""
+    if not has_atomic_incr():
+        # The submission writer persists these scores, which is what is read
+        return
+    size = cache.get(QUIZ_SCORE_SIZE_KEY.format(quiz_id=quiz_id))
+    if size is None:
+        # Rebuilt from the database on next read, which already holds these
+        # scores once the submission writer has flushed them
+        return
+    if size < len(delta):
+        _store_shared_histogram(quiz_id, _grow(load_shared_histogram(quiz_id), len(delta)))
+
+    for score, count in enumerate(delta):
+        if not count:
+            continue
+        try:
+            cache.incr(QUIZ_SCORE_BUCKET_KEY.format(quiz_id=quiz_id, score=score), count)
+        except ValueError:
+            # The bucket was evicted, the next read rebuilds the histogram
+            cache.delete(QUIZ_SCORE_SIZE_KEY.format(quiz_id=quiz_id))
+            return
+
+
+class ScoreHistograms:
+    """Per-worker view of each quiz's score histogram"""
+
+    def __init__(self, merge_interval, idle_timeout):
+        self.merge_interval = merge_interval
+        self.idle_timeout = idle_timeout
+        self.lock = threading.Lock()
+        # Shared histograms as of the last merge, and scores counted since
+        self.snapshots = {}
+        self.deltas = {}
+        # When each quiz last had a score recorded, and which did since the last merge
+        self.recorded_at = {}
+        self.active = set()
+        self.thread = None
+
+    def record(self, quiz_id, score, total):
+        """Count a score and return the percentile it beats"""
+        if self.thread is None:
+            self.start()
+
+        snapshot = self.snapshots.get(quiz_id)
+        if snapshot is None:
+            snapshot = load_shared_histogram(quiz_id)
+
+        with self.lock:
+            self.recorded_at[quiz_id] = time.monotonic()
+            self.active.add(quiz_id)
+            snapshot = self.snapshots.setdefault(quiz_id, snapshot)
+            delta = _grow(self.deltas.setdefault(quiz_id, []), total + 1)
+            percentile = calculate_percentile(score, snapshot, delta)
+            delta[score] += 1
+        return percentile
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name='quiz-score-merger', daemon=True
+                )
+                self.thread.start()
+
+    def run(self):
+        while True:
+            time.sleep(self.merge_interval)
+            try:
+                self.merge()
+            except Exception:
+                logger.exception('Failed to merge score histograms')
+            finally:
+                connection.close()
+
+    def take_pending(self):
+        with self.lock:
+            return {
+                quiz_id: list(delta) for quiz_id, delta in self.deltas.items() if any(delta)
+            }
+
+    def merge(self):
+        """Push local counts to the shared store and refresh the snapshots in use"""
+        pending = self.take_pending()
+        with self.lock:
+            # Only quizzes being played are reloaded, idle ones are dropped
+            quiz_ids, self.active = self.active | set(pending), set()
+            idle_before = time.monotonic() - self.idle_timeout
+            for quiz_id, recorded_at in list(self.recorded_at.items()):
+                if recorded_at < idle_before and quiz_id not in quiz_ids:
+                    del self.recorded_at[quiz_id]
+                    self.snapshots.pop(quiz_id, None)
+                    self.deltas.pop(quiz_id, None)
+
+        for quiz_id, delta in pending.items():
+            push_shared_histogram(quiz_id, delta)
+
+        if not has_atomic_incr() and not wait_for_submissions(self.merge_interval):
+            # Recounting now would miss scores that are only counted locally;
+            # keep them and the current snapshots until the next merge
+            with self.lock:
+                self.active |= quiz_ids
+            return
+
+        for quiz_id in quiz_ids:
+            snapshot = load_shared_histogram(quiz_id)
+            with self.lock:
+                self.snapshots[quiz_id] = snapshot
+                # Keep only the scores counted after this merge started
+                delta = self.deltas.get(quiz_id, [])
+                for score, count in enumerate(pending.get(quiz_id, [])):
+                    delta[score] -= count
+
+    def flush(self):
+        """Push counts that were never merged, when the worker exits"""
+        if self.thread is None:
+            return
+        try:
+            for quiz_id, delta in self.take_pending().items():
+                push_shared_histogram(quiz_id, delta)
+        except Exception:
+            logger.exception('Failed to flush score histograms')
+
+
+_histograms = ScoreHistograms(settings.QUIZ_SCORE_MERGE_INTERVAL, settings.QUIZ_SCORE_IDLE_TIMEOUT)
+atexit.register(_histograms.flush)
+
+
+def record_score(quiz_id, score, total):
+    """Count a graded score and return the percentage of players it beats"""
+    return _histograms.record(quiz_id, score, total)
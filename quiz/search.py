@@ -0,0 +1,158 @@
+"""
+Full-text search over question text and options.
+
+The database maintains the index itself, so every write path, including the
+importer's bulk_create and bulk_update, keeps it current:
+
+- PostgreSQL (production, DATABASE_URL set): a generated ``search_vector``
+  tsvector column on quiz_question with a GIN index
+- SQLite (development): an external content FTS5 table, quiz_question_fts,
+  kept in sync by insert, update and delete triggers
+
+Both backends stem English words, require every search term and match the
+last term as a prefix, so results agree apart from the exact rank scores.
+Question text ranks above the options. SQLite drops the triggers whenever
+a migration rebuilds quiz_question; run rebuild_search_index afterwards.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Question
+from kwiz_project.constants import MAX_SEARCH_TERMS
+
+SEARCH_FIELDS = ['text', 'option_a', 'option_b', 'option_c', 'option_d']
+
+POSTGRES_INSTALL = [
+    """
+    ALTER TABLE quiz_question ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', "text"), 'A') ||
+        setweight(to_tsvector('english', option_a || ' ' || option_b || ' ' || option_c || ' ' || option_d), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX IF NOT EXISTS quiz_question_search_idx ON quiz_question USING GIN (search_vector)',
+]
+POSTGRES_UNINSTALL = [
+    'DROP INDEX IF EXISTS quiz_question_search_idx',
+    'ALTER TABLE quiz_question DROP COLUMN IF EXISTS search_vector',
+]
+# The generated column is always current; reindexing only compacts the GIN index
+POSTGRES_REBUILD = ['REINDEX INDEX quiz_question_search_idx']
+
+SQLITE_COLUMNS = ', '.join(SEARCH_FIELDS)
+SQLITE_NEW = ', '.join(f'new.{field}' for field in SEARCH_FIELDS)
+SQLITE_OLD = ', '.join(f'old.{field}' for field in SEARCH_FIELDS)
+SQLITE_INSTALL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS quiz_question_fts USING fts5(
+        {SQLITE_COLUMNS}, content='quiz_question', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS quiz_question_fts_insert AFTER INSERT ON quiz_question BEGIN
+        INSERT INTO quiz_question_fts (rowid, {SQLITE_COLUMNS}) VALUES (new.id, {SQLITE_NEW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS quiz_question_fts_delete AFTER DELETE ON quiz_question BEGIN
+        INSERT INTO quiz_question_fts (quiz_question_fts, rowid, {SQLITE_COLUMNS})
+        VALUES ('delete', old.id, {SQLITE_OLD});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS quiz_question_fts_update AFTER UPDATE ON quiz_question BEGIN
+        INSERT INTO quiz_question_fts (quiz_question_fts, rowid, {SQLITE_COLUMNS})
+        VALUES ('delete', old.id, {SQLITE_OLD});
+        INSERT INTO quiz_question_fts (rowid, {SQLITE_COLUMNS}) VALUES (new.id, {SQLITE_NEW});
+    END
+    """,
+]
+SQLITE_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS quiz_question_fts_insert',
+    'DROP TRIGGER IF EXISTS quiz_question_fts_delete',
+    'DROP TRIGGER IF EXISTS quiz_question_fts_update',
+    'DROP TABLE IF EXISTS quiz_question_fts',
+]
+SQLITE_REBUILD = ["INSERT INTO quiz_question_fts (quiz_question_fts) VALUES ('rebuild')"]
+
+SEARCH_INDEX_SQL = {
+    'postgresql': (POSTGRES_INSTALL, POSTGRES_UNINSTALL, POSTGRES_REBUILD),
+    'sqlite': (SQLITE_INSTALL, SQLITE_UNINSTALL, SQLITE_REBUILD),
+}
+
+
+def install_statements(vendor):
+    """SQL that creates the search index and fills it from existing questions"""
+    install, _, rebuild = SEARCH_INDEX_SQL.get(vendor, ([], [], []))
+    return install + rebuild
+
+
+def search_terms(query):
+    """Lowercased words of a search query, ignoring any search syntax"""
+    return re.findall(r'\w+', query.lower())[:MAX_SEARCH_TERMS]
+
+
+def match_query(terms):
+    """The backend's query syntax for: every term, the last one as a prefix"""
+    if connection.vendor == 'postgresql':
+        return ' & '.join(terms[:-1] + [f'{terms[-1]}:*'])
+    return ' '.join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+
+
+def matching_ids(query):
+    """Subquery of the ids of questions matching query, for ``id__in`` filters"""
+    terms = search_terms(query)
+    if not terms:
+        return Question.objects.none().values('id')
+
+    if connection.vendor == 'postgresql':
+        return RawSQL(
+            "SELECT id FROM quiz_question WHERE search_vector @@ to_tsquery('english', %s)",
+            [match_query(terms)]
+        )
+    if connection.vendor == 'sqlite':
+        return RawSQL(
+            'SELECT rowid FROM quiz_question_fts WHERE quiz_question_fts MATCH %s',
+            [match_query(terms)]
+        )
+
+    # Other backends have no index and fall back to substring matches
+    questions = Question.objects.all()
+    for term in terms:
+        questions = questions.filter(
+            Q(text__icontains=term) | Q(option_a__icontains=term) | Q(option_b__icontains=term) |
+            Q(option_c__icontains=term) | Q(option_d__icontains=term)
+        )
+    return questions.values('id')
+
+
+def search_rank(query):
+    """Relevance of each question row for query, higher is better"""
+    terms = search_terms(query)
+    if terms and connection.vendor == 'postgresql':
+        return RawSQL(
+            "ts_rank(quiz_question.search_vector, to_tsquery('english', %s))",
+            [match_query(terms)], output_field=FloatField()
+        )
+    if terms and connection.vendor == 'sqlite':
+        # bm25() is negative, lower is better; weights favour the question text
+        return RawSQL(
+            'SELECT -bm25(quiz_question_fts, 2.0, 1.0, 1.0, 1.0, 1.0) FROM quiz_question_fts '
+            'WHERE quiz_question_fts MATCH %s AND rowid = quiz_question.id',
+            [match_query(terms)], output_field=FloatField()
+        )
+    return Value(0.0, output_field=FloatField())
+
+
+def search_questions(query, questions=None):
+    """Questions matching every term of query, best matches first"""
+    if questions is None:
+        questions = Question.objects.all()
+    return questions.filter(id__in=matching_ids(query)).annotate(
+        rank=search_rank(query)
+    ).order_by('-rank', '-quiz__date', 'order')
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Category, DailyQuiz, Question
+from kwiz_project.constants import MAX_BATCH_SUBMISSIONS
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -40,6 +41,17 @@ class QuizResultSerializer(serializers.Serializer):
     )
 
 
+class BatchQuizResultSerializer(serializers.Serializer):
+    """Serializer for submitting answers to several quizzes at once"""
+    submissions = QuizResultSerializer(many=True, allow_empty=False, max_length=MAX_BATCH_SUBMISSIONS)
+
+    def validate_submissions(self, submissions):
+        dates = [submission['date'] for submission in submissions]
+        if len(set(dates)) != len(dates):
+            raise serializers.ValidationError('Each quiz date may only be submitted once')
+        return submissions
+
+
 class QuestionResultSerializer(serializers.ModelSerializer):
     """Serializer for question results with correct answers"""
     options = serializers.SerializerMethodField()
@@ -71,7 +83,33 @@ class QuestionResultSerializer(serializers.ModelSerializer):
 class ArchiveQuizSerializer(serializers.ModelSerializer):
     """Serializer for quiz archive listing"""
     category_name = serializers.CharField(source='category.name', read_only=True)
+    is_available = serializers.SerializerMethodField()
     
     class Meta:
         model = DailyQuiz
         fields = ['date', 'title', 'category_name', 'is_available']
+
+    def get_is_available(self, obj):
+        """Check availability against one IST "now" shared by every row"""
+        return obj.is_quiz_released(self.context.get('now_ist'))
+
+
+class SearchResultSerializer(serializers.ModelSerializer):
+    """Serializer for question search results (without correct answer)"""
+    quiz_date = serializers.DateField(source='quiz.date', read_only=True)
+    quiz_title = serializers.CharField(source='quiz.title', read_only=True)
+    category_name = serializers.CharField(source='quiz.category.name', read_only=True)
+    options = serializers.SerializerMethodField()
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Question
+        fields = ['quiz_date', 'quiz_title', 'category_name', 'order', 'text', 'options', 'rank']
+
+    def get_options(self, obj):
+        return [
+            obj.option_a,
+            obj.option_b,
+            obj.option_c,
+            obj.option_d,
+        ]
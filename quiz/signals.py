@@ -0,0 +1,74 @@
+"""
+Model signal handlers that keep the quiz caches in sync with the database.
+"""
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_generation, invalidate_quiz
+from .duplicates import index_questions
+from .grading import invalidate_answer_key
+from .models import Category, DailyQuiz, Question
+from .prewarm import start_prewarm_timer
+from .schedule import invalidate_schedule
+
+
+def invalidate_quiz_date(quiz_date):
+    """Drop every cached structure built from the quiz on this date"""
+    invalidate_quiz(quiz_date)
+    invalidate_answer_key(quiz_date)
+
+
+@receiver(pre_save, sender=DailyQuiz)
+def remember_previous_quiz_date(sender, instance, **kwargs):
+    """Track the stored date so a moved quiz also clears its old entry"""
+    instance._previous_date = None
+    if instance.pk:
+        instance._previous_date = DailyQuiz.objects.filter(
+            pk=instance.pk
+        ).values_list('date', flat=True).first()
+
+
+@receiver(post_save, sender=DailyQuiz)
+@receiver(post_delete, sender=DailyQuiz)
+def invalidate_daily_quiz(sender, instance, **kwargs):
+    invalidate_schedule()
+    invalidate_quiz_date(instance.date)
+    previous_date = getattr(instance, '_previous_date', None)
+    if previous_date and previous_date != instance.date:
+        invalidate_quiz_date(previous_date)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def invalidate_question(sender, instance, **kwargs):
+    try:
+        quiz_date = instance.quiz.date
+    except DailyQuiz.DoesNotExist:
+        # Parent quiz already gone, its own signal handles invalidation
+        return
+    invalidate_quiz_date(quiz_date)
+
+
+@receiver(post_save, sender=Question)
+def index_question(sender, instance, **kwargs):
+    # Bulk imports index their questions themselves
+    index_questions([instance])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    # Category names are embedded in every payload of the category
+    invalidate_schedule()
+    invalidate_answer_key()
+    bump_generation()
+
+
+@receiver(request_started)
+def start_prewarm(sender, **kwargs):
+    # Started lazily so management commands never spawn the timer
+    if settings.QUIZ_PREWARM_ENABLED:
+        start_prewarm_timer()
@@ -0,0 +1,157 @@
+"""
+Write-behind recording of graded submissions.
+
+Grading requests only enqueue their result; a background thread in each
+worker bulk inserts queued submissions in batches, by size or by time. The
+queue is bounded: when it is full, requests wait briefly for the flusher and
+then insert their own submission, so nothing is dropped. Pending
+submissions are drained when the worker exits.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import QuizSubmission
+
+logger = logging.getLogger(__name__)
+
+# Transient failures (lock timeouts, dropped connections) are retried
+WRITE_ATTEMPTS = 5
+
+
+class SubmissionWriter:
+    """Bounded queue of submissions flushed with bulk_create by a background thread"""
+
+    def __init__(self, batch_size, flush_interval, max_pending, enqueue_timeout):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.stopping = threading.Event()
+        self.thread = None
+        self.start_lock = threading.Lock()
+        # Submissions accepted and written (or given up on) so far
+        self.progress = threading.Condition()
+        self.accepted = 0
+        self.written = 0
+
+    def start(self):
+        with self.start_lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name='quiz-submission-writer', daemon=True
+                )
+                self.thread.start()
+
+    def submit(self, submission):
+        """Queue a submission, applying back-pressure when the queue is full"""
+        if self.thread is None:
+            self.start()
+        with self.progress:
+            self.accepted += 1
+        try:
+            self.pending.put(submission, timeout=self.enqueue_timeout)
+        except queue.Full:
+            # The flusher is falling behind, write this one directly
+            self.write([submission])
+
+    def run(self):
+        try:
+            while not self.stopping.is_set():
+                batch = self.collect_batch()
+                if batch:
+                    self.write(batch)
+        finally:
+            connection.close()
+
+    def collect_batch(self):
+        """Wait for a full batch or the flush interval, whichever comes first"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self.stopping.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def write(self, batch):
+        try:
+            for attempt in range(1, WRITE_ATTEMPTS + 1):
+                try:
+                    QuizSubmission.objects.bulk_create(batch)
+                    return
+                except Exception:
+                    if attempt == WRITE_ATTEMPTS:
+                        logger.exception('Failed to record %d quiz submissions', len(batch))
+                    else:
+                        # Reconnect in case the failure was a dropped connection
+                        connection.close()
+                        time.sleep(0.05 * attempt)
+        finally:
+            with self.progress:
+                self.written += len(batch)
+                self.progress.notify_all()
+
+    def wait_for_writes(self, timeout):
+        """Wait until every submission accepted so far has been written,
+        returning whether it was within timeout seconds"""
+        with self.progress:
+            accepted = self.accepted
+            return self.progress.wait_for(lambda: self.written >= accepted, timeout)
+
+    def drain(self):
+        """Stop the flusher and write every pending submission"""
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+
+        batch = []
+        while True:
+            try:
+                batch.append(self.pending.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self.write(batch)
+                batch = []
+        if batch:
+            self.write(batch)
+
+
+_writer = SubmissionWriter(
+    batch_size=settings.QUIZ_SUBMISSION_BATCH_SIZE,
+    flush_interval=settings.QUIZ_SUBMISSION_FLUSH_INTERVAL,
+    max_pending=settings.QUIZ_SUBMISSION_MAX_PENDING,
+    enqueue_timeout=settings.QUIZ_SUBMISSION_ENQUEUE_TIMEOUT,
+)
+atexit.register(_writer.drain)
+
+
+def record_submission(answer_key, result):
+    """Record a graded submission without blocking on the database"""
+    submission = QuizSubmission(
+        quiz_id=answer_key.quiz_id,
+        score=result['score'],
+        total=result['total'],
+        submitted_at=timezone.now()
+    )
+    if settings.QUIZ_SUBMISSION_WRITE_BEHIND:
+        _writer.submit(submission)
+    else:
+        submission.save()
+
+
+def wait_for_submissions(timeout):
+    """Wait until the submissions recorded so far are in the database"""
+    return _writer.wait_for_writes(timeout)
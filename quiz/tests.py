@@ -1,3 +1,1062 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import date, time, timedelta
+from importlib import import_module
+from io import StringIO
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.apps import apps as django_apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import (
+    AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import async_views
+from .cache import (
+    async_single_flight, bump_version, get_archive_payload, get_quiz_payload, get_version, load_quiz_payload,
+    payload_key, single_flight
+)
+from .cache_backends import TieredCache
+from .configs import validator
+from .duplicates import find_near_duplicates, rebuild_index
+from .events import ReleaseNotifier
+from .grading import AnswerKey, get_answer_key, get_answer_keys, grade_answers, invalidate_answer_key
+from .importer import import_configs
+from .jobs import claim_job, run_job
+from .middleware import QuizGZipMiddleware
+from .models import (
+    Category, DailyQuiz, Question, QuestionBand, QuestionStats, QuizConfigUpload, QuizSubmission
+)
+from .prewarm import prewarm_next_quiz
+from .question_stats import QuestionStatsBuffer, apply_question_stats
+from .schedule import get_release_datetime, get_schedule, invalidate_schedule
+from .scores import ScoreHistograms, load_shared_histogram, push_shared_histogram
+from .search import search_questions
+from .submissions import SubmissionWriter, record_submission
+from .views import get_today_ist
+from kwiz_project.constants import QUIZ_ANSWER_KEY_VERSION_KEY, QUIZ_SCHEDULE_VERSION_KEY
+
+
+class SubmissionWriterTests(TransactionTestCase):
+    """The write-behind queue must persist every submission it accepts"""
+
+    def setUp(self):
+        category = Category.objects.create(name='Films')
+        self.quiz = DailyQuiz.objects.create(
+            date=date(2026, 1, 1), category=category, title='Films', is_released=True
+        )
+
+    def submit_concurrently(self, writer, threads=8, per_thread=250):
+        def submit_many():
+            for i in range(per_thread):
+                writer.submit(QuizSubmission(quiz=self.quiz, score=i % 16, total=15))
+
+        workers = [threading.Thread(target=submit_many) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        writer.drain()
+        return threads * per_thread
+
+    def test_concurrent_submits_are_all_persisted(self):
+        writer = SubmissionWriter(
+            batch_size=50, flush_interval=0.05, max_pending=10000, enqueue_timeout=0.5
+        )
+        expected = self.submit_concurrently(writer)
+        self.assertEqual(QuizSubmission.objects.count(), expected)
+
+    def test_full_queue_falls_back_to_direct_writes(self):
+        # A tiny queue forces producers onto the back-pressure path
+        writer = SubmissionWriter(
+            batch_size=5, flush_interval=0.05, max_pending=2, enqueue_timeout=0
+        )
+        expected = self.submit_concurrently(writer, threads=4, per_thread=50)
+        self.assertEqual(QuizSubmission.objects.count(), expected)
+
+
+class ImportJobTests(TestCase):
+    """Each queued upload is claimed by one worker, oldest first"""
+
+    def test_claims_oldest_pending_upload_once(self):
+        now = timezone.now()
+        newer = QuizConfigUpload.objects.create(file='newer.json', uploaded_at=now)
+        older = QuizConfigUpload.objects.create(file='older.json', uploaded_at=now - timedelta(minutes=1))
+
+        self.assertEqual(claim_job(), older)
+        self.assertEqual(claim_job(), newer)
+        self.assertIsNone(claim_job())
+        self.assertEqual(QuizConfigUpload.objects.filter(status='processing').count(), 2)
+
+    def test_reclaims_abandoned_upload(self):
+        upload = QuizConfigUpload.objects.create(
+            file='abandoned.json', status='processing',
+            started_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(claim_job(), upload)
+        self.assertIsNone(claim_job())
+
+    def test_failed_import_records_error_and_timing(self):
+        QuizConfigUpload.objects.create(file='missing.json')
+        upload = claim_job()
+
+        self.assertFalse(run_job(upload))
+        upload.refresh_from_db()
+        self.assertEqual(upload.status, 'failed')
+        self.assertTrue(upload.error_message)
+        self.assertIsNotNone(upload.duration)
+
+    def test_imports_from_stored_bytes_without_the_file(self):
+        config = {
+            'date': '2031-01-01', 'category': 'Films', 'title': 'Sholay',
+            'questions': [{'question': 'Who played Gabbar?', 'options': ['A', 'B', 'C', 'D'], 'correct_answer': 0}]
+        }
+        upload = QuizConfigUpload.objects.create(file=ContentFile(json.dumps(config).encode(), name='sholay.json'))
+        # As seen by a worker in a container without the web container's disk
+        upload.file.delete(save=False)
+
+        self.assertTrue(run_job(claim_job()))
+        self.assertTrue(DailyQuiz.objects.filter(date=date(2031, 1, 1)).exists())
+
+    @override_settings(QUIZ_CACHE_URL='')
+    def test_worker_requires_shared_cache(self):
+        with self.assertRaisesMessage(CommandError, 'QUIZ_CACHE_URL'):
+            call_command('run_import_worker', once=True)
+        call_command('run_import_worker', once=True, local_cache=True)
+
+
+class ConfigValidatorTests(SimpleTestCase):
+    """The config validator reports every problem in one pass"""
+
+    def make_config(self, **fields):
+        config = {
+            'date': '2026-01-05',
+            'category': 'Actors',
+            'title': 'Deepika Padukone',
+            'questions': [
+                {'question': 'Debut film?', 'options': ['Om Shanti Om', 'Cocktail', 'Piku', 'Race 2'], 'correct_answer': 0},
+                {'question': 'Role in Padmaavat?', 'options': ['Padmavati', 'Mastani', 'Leela', 'Veronica'], 'correct_answer': 0},
+            ]
+        }
+        config.update(fields)
+        return config
+
+    def test_valid_config(self):
+        self.assertEqual(validator.validate(self.make_config()), [])
+
+    def test_collects_every_error(self):
+        config = self.make_config(date='05-01-2026', title='x' * 201)
+        config['questions'][1]['question'] = ' debut FILM? '
+        config['questions'][1]['options'][3] = 'padmavati'
+        config['questions'][0]['options'][2] = 'x' * 201
+        config['questions'][0]['correct_answer'] = True
+
+        self.assertEqual(validator.validate(config), [
+            'date must be a date in YYYY-MM-DD format',
+            'title must be at most 200 characters',
+            'Question 1: option 3 must be at most 200 characters',
+            'Question 1: correct_answer must be 0, 1, 2, or 3',
+            'Question 2: Same question as question 1',
+            'Question 2: Option "padmavati" appears more than once',
+        ])
+
+
+class SetupQuizScheduleTests(TestCase):
+    """The schedule planner reads the range once and saves changes in bulk"""
+
+    def setUp(self):
+        category = Category.objects.create(name='Films')
+        # 2026-01-02 is a Friday, 2026-01-03 a Saturday; 2026-01-04 has no quiz
+        for day in (2, 3, 5):
+            DailyQuiz.objects.create(date=date(2026, 1, day), category=category, title=f'Quiz {day}')
+
+    def setup_schedule(self, *args):
+        out = StringIO()
+        call_command(
+            'setup_quiz_schedule', '--start', '2026-01-02', '--end', '2026-01-05',
+            '--release-time', '06:00', '--weekday-time', 'sat=20:00', *args, stdout=out
+        )
+        return out.getvalue()
+
+    def release_times(self):
+        return dict(DailyQuiz.objects.values_list('date__day', 'release_time'))
+
+    def test_applies_weekday_times_and_reports_gaps(self):
+        with self.assertNumQueries(4):  # select, then one bulk update inside a savepoint
+            output = self.setup_schedule()
+
+        self.assertEqual(self.release_times(), {2: time(6), 3: time(20), 5: time(6)})
+        self.assertIn('No quiz for 2026-01-04', output)
+        self.assertIn('3 to update, 0 already scheduled, 1 dates without a quiz', output)
+
+    def test_dry_run_changes_nothing(self):
+        output = self.setup_schedule('--dry-run')
+
+        self.assertEqual(set(self.release_times().values()), {time(0)})
+        self.assertIn('Dry run', output)
+
+
+@override_settings(QUIZ_PREWARM_ENABLED=False)
+class QuestionSearchTests(TestCase):
+    """The search index follows every write path, including bulk imports"""
+
+    def setUp(self):
+        category = Category.objects.create(name='Actors')
+        self.quiz = DailyQuiz.objects.create(
+            date=date(2026, 1, 5), category=category, title='Deepika Padukone', is_released=True
+        )
+        self.future = DailyQuiz.objects.create(
+            date=date(2999, 1, 1), category=category, title='Future', is_released=True
+        )
+        Question.objects.bulk_create([
+            Question(quiz=self.quiz, order=1, text='Which film was her debut?', option_a='Om Shanti Om',
+                     option_b='Cocktail', option_c='Piku', option_d='Race 2', correct_answer='A'),
+            Question(quiz=self.quiz, order=2, text='Who directed Om Shanti Om?', option_a='Farah Khan',
+                     option_b='Karan Johar', option_c='Zoya Akhtar', option_d='Rohit Shetty', correct_answer='A'),
+            Question(quiz=self.future, order=1, text='Which films are releasing?', option_a='A',
+                     option_b='B', option_c='C', option_d='D', correct_answer='A'),
+        ])
+
+    def search(self, query):
+        return [(question.quiz.date.day, question.order) for question in search_questions(query)]
+
+    def test_ranks_question_text_above_options_with_stemming_and_prefix(self):
+        self.assertEqual(self.search('shanti'), [(5, 2), (5, 1)])
+        self.assertEqual(self.search('FILMS'), [(1, 1), (5, 1)])
+        self.assertEqual(self.search('farah kh'), [(5, 2)])
+        self.assertEqual(self.search('"*'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        question = Question.objects.get(quiz=self.quiz, order=1)
+        question.option_c = 'Padmaavat'
+        question.save()
+        Question.objects.filter(quiz=self.quiz, order=2).delete()
+
+        self.assertEqual(self.search('padmaavat'), [(5, 1)])
+        self.assertEqual(self.search('piku'), [])
+        self.assertEqual(self.search('farah'), [])
+
+    def test_api_pages_through_available_quizzes_only(self):
+        response = self.client.get('/api/quiz/search/', {'q': 'om', 'limit': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['order'] for result in response.json()], [2])
+        self.assertIn('page=2', response['Link'])
+
+        response = self.client.get('/api/quiz/search/', {'q': 'which'})
+        self.assertEqual([result['quiz_date'] for result in response.json()], ['2026-01-05'])
+        self.assertNotIn('correct_answer', response.json()[0])
+        self.assertEqual(self.client.get('/api/quiz/search/').status_code, 400)
+
+
+class NearDuplicateTests(TestCase):
+    """Imports flag questions that nearly repeat the question bank"""
+
+    def make_config(self, quiz_date, *questions):
+        return (f'{quiz_date}.json', {
+            'date': quiz_date,
+            'category': 'Actors',
+            'title': 'Rajesh Khanna',
+            'questions': [
+                {'question': text, 'options': options, 'correct_answer': 0} for text, options in questions
+            ]
+        })
+
+    def setUp(self):
+        import_configs([self.make_config(
+            '2024-12-29',
+            ("What was Rajesh Khanna's debut film?", ['Aakhri Khat', 'Raaz', 'Anand', 'Safar']),
+            ('In which year was DDLJ released?', ['1995', '1994', '1996', '1997']),
+        )])
+
+    def test_flags_reworded_questions_only(self):
+        configs = [self.make_config(
+            '2025-12-29',
+            ("Rajesh Khanna's first film was?", ['Raaz', 'Aakhri Khat', 'Safar', 'Anand']),
+            ("What was Rajesh Khanna's last film?", ['Riyasat', 'Wafaa', 'Dushman', 'Anand']),
+            ('Which year did DDLJ release in?', ['1995', '1994', '1996', '1997']),
+        )]
+        with self.assertNumQueries(2):
+            warnings = find_near_duplicates(configs)
+
+        self.assertEqual(warnings, [
+            '2025-12-29.json: Question 1 is 78% similar to question 1 of 2024-12-29: '
+            '"What was Rajesh Khanna\'s debut film?"',
+            '2025-12-29.json: Question 3 is 75% similar to question 2 of 2024-12-29: '
+            '"In which year was DDLJ released?"',
+        ])
+
+    def test_index_follows_imports_saves_and_rebuilds(self):
+        result = import_configs([self.make_config(
+            '2025-12-29', ('Which year did DDLJ release in?', ['1995', '1994', '1996', '1997'])
+        )])
+        self.assertEqual(len(result.warnings), 1)
+
+        # Updating a quiz does not flag its own stored questions
+        result = import_configs([self.make_config(
+            '2025-12-29', ('Who directed DDLJ?', ['Aditya Chopra', 'Yash Chopra', 'Karan Johar', 'Sooraj Barjatya'])
+        )], update=True)
+        self.assertEqual(result.warnings, [])
+
+        question = Question.objects.get(quiz__date=date(2025, 12, 29))
+        question.text = 'In which year was DDLJ released?'
+        question.option_a, question.option_b, question.option_c, question.option_d = '1995', '1994', '1996', '1997'
+        question.save()
+        config = self.make_config('2026-12-29', ('DDLJ was released in which year?', ['1995', '1994', '1996', '1997']))
+        self.assertEqual(len(find_near_duplicates([config])), 2)
+
+        bands = QuestionBand.objects.count()
+        self.assertEqual(rebuild_index(), 3)
+        self.assertEqual(QuestionBand.objects.count(), bands)
+
+
+@override_settings(QUIZ_PREWARM_ENABLED=False)
+class AdminChangelistQueryTests(TestCase):
+    """Admin changelists run a fixed number of queries whatever the page size"""
+
+    CHANGELISTS = ['dailyquiz', 'question', 'quizsubmission', 'quizconfigupload']
+
+    def setUp(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+        self.days = 0
+
+    def add_quizzes(self, count):
+        for _ in range(count):
+            self.days += 1
+            category = Category.objects.create(name=f'Category {self.days}')
+            quiz = DailyQuiz.objects.create(
+                date=date(2026, 1, 1) + timedelta(days=self.days), category=category,
+                title=f'Quiz {self.days}', is_released=True
+            )
+            Question.objects.bulk_create([
+                Question(quiz=quiz, order=order, text=f'Question {order}', option_a='A', option_b='B',
+                         option_c='C', option_d='D', correct_answer='A')
+                for order in (1, 2)
+            ])
+            QuizSubmission.objects.create(quiz=quiz, score=1, total=2)
+            QuizConfigUpload.objects.create(file=f'quiz-{self.days}.json')
+
+    def count_queries(self):
+        counts = {}
+        for model in self.CHANGELISTS:
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(f'/admin/quiz/{model}/').status_code, 200)
+            counts[model] = len(queries)
+        return counts
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.add_quizzes(2)
+        few = self.count_queries()
+        self.add_quizzes(8)
+        self.assertEqual(self.count_queries(), few)
+
+    def test_availability_is_annotated_in_sql(self):
+        self.add_quizzes(1)
+        DailyQuiz.objects.create(
+            date=date(2999, 1, 1), category=Category.objects.first(), title='Future', is_released=True
+        )
+        response = self.client.get('/admin/quiz/dailyquiz/', {'o': '5'})
+        available = [quiz.available for quiz in response.context['cl'].result_list]
+        self.assertEqual(available, [False, True])
+
+
+@override_settings(QUIZ_PREWARM_ENABLED=False)
+class AsyncViewTests(TestCase):
+    """The async read views answer exactly like the DRF views"""
+
+    def setUp(self):
+        cache.clear()
+        invalidate_schedule()
+        category = Category.objects.create(name='Films')
+        for day, is_released in [(5, True), (6, False)]:
+            quiz = DailyQuiz.objects.create(
+                date=date(2026, 1, day), category=category, title=f'Quiz {day}', is_released=is_released
+            )
+            Question.objects.create(
+                quiz=quiz, order=1, text='Question', option_a='A', option_b='B', option_c='C', option_d='D',
+                correct_answer='A'
+            )
+
+    def test_responses_match_sync_views(self):
+        factory = AsyncRequestFactory()
+        cases = [
+            ('/api/quiz/daily/2026-01-05/', async_views.get_daily_quiz, {'quiz_date': '2026-01-05'}),
+            ('/api/quiz/daily/2026-01-06/', async_views.get_daily_quiz, {'quiz_date': '2026-01-06'}),
+            ('/api/quiz/daily/2026-01-07/', async_views.get_daily_quiz, {'quiz_date': '2026-01-07'}),
+            ('/api/quiz/daily/tomorrow/', async_views.get_daily_quiz, {'quiz_date': 'tomorrow'}),
+            ('/api/quiz/status/2026-01-05/', async_views.get_quiz_status, {'quiz_date': '2026-01-05'}),
+            ('/api/quiz/status/', async_views.get_quiz_status, {}),
+            ('/api/quiz/archive/?limit=1', async_views.get_quiz_archive, {}),
+            ('/api/quiz/archive/?limit=0', async_views.get_quiz_archive, {}),
+            ('/api/quiz/archive/?category=Nope', async_views.get_quiz_archive, {}),
+        ]
+        for path, view, kwargs in cases:
+            with self.subTest(path=path):
+                # The async view runs first, so it also fills the cache on a miss
+                expected = async_to_sync(view)(factory.get(path), **kwargs)
+                response = self.client.get(path)
+                self.assertEqual(expected.status_code, response.status_code)
+                self.assertEqual(expected.content, response.content)
+                for header in ['ETag', 'Cache-Control', 'Link']:
+                    self.assertEqual(expected.get(header), response.get(header))
+
+    def test_concurrent_misses_share_one_build(self):
+        builds = []
+
+        async def build():
+            builds.append(1)
+            await asyncio.sleep(0.01)
+            return len(builds)
+
+        async def request_many():
+            return await asyncio.gather(*[async_single_flight('key', build) for _ in range(10)])
+
+        self.assertEqual(async_to_sync(request_many)(), [1] * 10)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+    'l2': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'l2'},
+})
+class TieredCacheTests(SimpleTestCase):
+    """Two workers' L1 tiers over one shared L2"""
+
+    def setUp(self):
+        options = {'L2': 'l2', 'VERSION_CHECK_INTERVAL': 0}
+        self.worker, self.other = [
+            TieredCache(name, {'OPTIONS': options}) for name in ['worker-1', 'worker-2']
+        ]
+        self.worker.clear()
+        self.other.clear()
+
+    def test_reads_through_and_serves_from_l1(self):
+        self.worker.set('key', 1)
+        self.assertEqual(self.other.get('key'), 1)
+        # Gone from L2, but this worker still has its own copy
+        self.other._l2.delete('key')
+        self.assertEqual(self.other.get('key'), 1)
+        self.assertIsNone(self.other.get('missing'))
+
+    def test_deletes_and_increments_invalidate_every_worker(self):
+        self.worker.set('key', 1)
+        self.worker.set('version', 1)
+        self.assertEqual(self.other.get('key'), 1)
+        self.assertEqual(self.other.get('version'), 1)
+
+        self.worker.delete('key')
+        self.worker.incr('version')
+        self.assertIsNone(self.other.get('key'))
+        self.assertEqual(self.other.get('version'), 2)
+
+    def test_async_reads_share_the_tiers(self):
+        async_to_sync(self.worker.aset)('key', 1)
+        self.assertEqual(async_to_sync(self.other.aget)('key'), 1)
+        self.other._l2.delete('key')
+        self.assertEqual(async_to_sync(self.other.aget)('key'), 1)
+        self.assertEqual(async_to_sync(self.other.aget_or_set)('new', 2), 2)
+        self.assertEqual(self.worker.get('new'), 2)
+
+        self.worker.delete('key')
+        self.assertIsNone(async_to_sync(self.other.aget)('key'))
+
+
+class ScheduleInvalidationTests(TestCase):
+    def test_reloads_when_another_worker_invalidates(self):
+        get_schedule()
+        with self.assertNumQueries(0):
+            get_schedule()
+        # What invalidate_schedule() in another worker leaves behind
+        bump_version(QUIZ_SCHEDULE_VERSION_KEY)
+        with self.assertNumQueries(1):
+            get_schedule()
+
+
+@override_settings(QUIZ_PREWARM_ENABLED=False)
+class TimerCachingTests(TestCase):
+    """Responses carrying a countdown are never cached for long"""
+
+    def setUp(self):
+        cache.clear()
+        invalidate_schedule()
+        category = Category.objects.create(name='Films')
+        for quiz_date in [date(2026, 1, 5), date(2999, 1, 1)]:
+            DailyQuiz.objects.create(date=quiz_date, category=category, title='Quiz', is_released=True)
+
+    def test_status_max_age_is_short(self):
+        response = self.client.get('/api/quiz/status/2026-01-05/')
+        self.assertIn('max-age=5', response['Cache-Control'])
+        self.assertIsNotNone(response.json()['next_quiz'])
+
+    def test_past_quiz_keeps_next_quiz(self):
+        response = self.client.get('/api/quiz/daily/2026-01-05/')
+        self.assertIn('max-age=5', response['Cache-Control'])
+        self.assertEqual(response.json()['next_quiz']['release_at'], '2999-01-01T00:00:00+05:30')
+        self.assertEqual(response.json()['time_until_release'], 0)
+
+    def test_today_etag_is_weak_and_release_absolute(self):
+        today = get_today_ist()
+        DailyQuiz.objects.create(date=today, category=Category.objects.first(), title='Today', is_released=True)
+        response = self.client.get(f'/api/quiz/daily/{today}/')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertEqual(response.json()['next_quiz']['release_at'], '2999-01-01T00:00:00+05:30')
+
+        response = self.client.get(f'/api/quiz/daily/{today}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+
+@override_settings(QUIZ_PREWARM_ENABLED=False)
+class ReleaseNotifierTests(TransactionTestCase):
+    """Release events skip held back quizzes and follow schedule edits"""
+
+    async def test_announces_quiz_once_released(self):
+        category = await Category.objects.acreate(name='Films')
+        quiz = await DailyQuiz.objects.acreate(
+            date=get_today_ist() - timedelta(days=1), category=category, title='Held back', is_released=False
+        )
+        notifier = ReleaseNotifier()
+        notifier.announced_at -= 3 * 24 * 60 * 60
+        try:
+            release = notifier.next_release()
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(asyncio.shield(release), timeout=0.5)
+
+            # Releasing it wakes the notifier without waiting for the recheck
+            quiz.is_released = True
+            await sync_to_async(quiz.save)()
+            event = await asyncio.wait_for(release, timeout=5)
+            self.assertEqual(event['date'], str(quiz.date))
+            with self.settings(QUIZ_PREWARM_ENABLED=False):
+                response = await self.async_client.get(f'/api/quiz/daily/{quiz.date}/')
+            self.assertEqual(event['version'], response['ETag'])
+        finally:
+            notifier.task.cancel()
+
+    def test_event_stream_is_not_compressed(self):
+        middleware = QuizGZipMiddleware(lambda request: None)
+        request = RequestFactory().get('/api/quiz/events/', HTTP_ACCEPT_ENCODING='gzip')
+        response = StreamingHttpResponse(iter([': keep-alive\n\n']), content_type='text/event-stream')
+        self.assertFalse(middleware.process_response(request, response).has_header('Content-Encoding'))
+
+
+class ScoreHistogramTests(TestCase):
+    def test_counts_from_database_without_atomic_shared_cache(self):
+        category = Category.objects.create(name='Films')
+        quiz = DailyQuiz.objects.create(date=date(2026, 1, 5), category=category, title='Quiz')
+        QuizSubmission.objects.bulk_create([QuizSubmission(quiz=quiz, score=score, total=3) for score in [1, 3, 3]])
+
+        # The test shared cache is a LocMemCache, which is not atomic across workers
+        push_shared_histogram(quiz.id, [0, 5])
+        self.assertEqual(load_shared_histogram(quiz.id), [0, 1, 0, 2])
+
+    def test_merge_reloads_only_quizzes_being_played(self):
+        category = Category.objects.create(name='Films')
+        played, idle = [
+            DailyQuiz.objects.create(date=date(2026, 1, day), category=category, title='Quiz') for day in [5, 6]
+        ]
+        histograms = ScoreHistograms(merge_interval=60, idle_timeout=0)
+        # Merged by hand instead of by the background thread
+        histograms.thread = threading.current_thread()
+        histograms.record(played.id, 1, 3)
+        histograms.record(idle.id, 2, 3)
+        histograms.merge()
+
+        histograms.record(played.id, 3, 3)
+        with self.assertNumQueries(1):
+            histograms.merge()
+        self.assertEqual(set(histograms.snapshots), {played.id})
+
+
+class PublishStaticQuizzesTests(TestCase):
+    def test_snapshots_only_past_quizzes(self):
+        category = Category.objects.create(name='Films')
+        today = get_today_ist()
+        for quiz_date in [today - timedelta(days=1), today]:
+            DailyQuiz.objects.create(date=quiz_date, category=category, title='Quiz', is_released=True)
+
+        with tempfile.TemporaryDirectory() as static_root, override_settings(STATIC_ROOT=static_root):
+            call_command('publish_static_quizzes', stdout=StringIO())
+            with open(os.path.join(static_root, 'quiz', 'manifest.json')) as f:
+                manifest = json.load(f)
+        self.assertEqual(sorted(manifest), ['archive.json', f'daily/{today - timedelta(days=1)}.json'])
+
+
+class SyncQuizConfigsTests(TestCase):
+    """A config file only updates the quizzes it created"""
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.config_dir)
+
+    def write_config(self, name, quiz_date, title):
+        with open(os.path.join(self.config_dir, name), 'w') as f:
+            json.dump({
+                'date': quiz_date, 'category': 'Films', 'title': title,
+                'questions': [{'question': 'Who played Gabbar?', 'options': ['A', 'B', 'C', 'D'], 'correct_answer': 0}]
+            }, f)
+
+    def sync(self, **options):
+        """Run the sync, returning its errors, which also make it fail"""
+        stderr = StringIO()
+        try:
+            call_command(
+                'sync_quiz_configs', dir=self.config_dir, workers=1, stdout=StringIO(), stderr=stderr, **options
+            )
+        except CommandError:
+            self.assertTrue(stderr.getvalue())
+        return stderr.getvalue()
+
+    def test_refuses_date_owned_by_unchanged_file(self):
+        self.write_config('sholay.json', '2031-01-01', 'Sholay')
+        self.assertEqual(self.sync(), '')
+        self.write_config('deewar.json', '2031-01-01', 'Deewar')
+
+        self.assertIn('also defined in sholay.json', self.sync())
+        self.assertEqual(DailyQuiz.objects.get(date=date(2031, 1, 1)).title, 'Sholay')
+
+    def test_refuses_quiz_not_created_from_a_file_unless_adopted(self):
+        DailyQuiz.objects.create(
+            date=date(2031, 1, 1), category=Category.objects.create(name='Films'), title='Edited in the admin'
+        )
+        self.write_config('sholay.json', '2031-01-01', 'Sholay')
+
+        self.assertIn('use --adopt', self.sync())
+        self.assertEqual(DailyQuiz.objects.get(date=date(2031, 1, 1)).title, 'Edited in the admin')
+
+        self.assertEqual(self.sync(adopt=True), '')
+        quiz = DailyQuiz.objects.get(date=date(2031, 1, 1))
+        self.assertEqual((quiz.title, quiz.config_file.path), ('Sholay', 'sholay.json'))
+
+    def test_migration_links_quizzes_synced_before_ownership(self):
+        self.write_config('sholay.json', '2031-01-01', 'Sholay')
+        self.assertEqual(self.sync(), '')
+        DailyQuiz.objects.update(config_file=None)
+
+        migration = import_module('quiz.migrations.0014_link_synced_quizzes')
+        with self.settings(QUIZ_CONFIG_DIR=self.config_dir):
+            migration.link_synced_quizzes(django_apps, None)
+        self.assertEqual(DailyQuiz.objects.get(date=date(2031, 1, 1)).config_file.path, 'sholay.json')
+
+        self.write_config('sholay.json', '2031-01-01', 'Sholay 2')
+        self.assertEqual(self.sync(), '')
+        self.assertEqual(DailyQuiz.objects.get(date=date(2031, 1, 1)).title, 'Sholay 2')
+
+
+def quiz_config(quiz_date, title, questions):
+    return {
+        'date': str(quiz_date), 'category': 'Films', 'title': title,
+        'questions': [
+            {'question': text, 'options': ['A', 'B', 'C', 'D'], 'correct_answer': 0} for text in questions
+        ]
+    }
+
+
+@override_settings(QUIZ_PREWARM_ENABLED=False)
+class ReimportTests(TestCase):
+    """Re-importing configs only writes and invalidates what changed"""
+
+    def setUp(self):
+        cache.clear()
+        self.changed, self.untouched = date(2026, 1, 5), date(2026, 1, 6)
+        self.questions = ['Who played Gabbar?', 'Who directed Sholay?', 'Who sang Mehbooba?']
+        with self.captureOnCommitCallbacks(execute=True):
+            import_configs([
+                ('changed.json', quiz_config(self.changed, 'Sholay', self.questions)),
+                ('untouched.json', quiz_config(self.untouched, 'Deewar', self.questions)),
+            ])
+        for quiz_date in [self.changed, self.untouched]:
+            load_quiz_payload(quiz_date)
+
+    def question_ids(self, quiz_date):
+        return list(Question.objects.filter(quiz__date=quiz_date).order_by('order').values_list('id', flat=True))
+
+    def test_keeps_ids_and_invalidates_only_the_changed_quiz(self):
+        ids = {quiz_date: self.question_ids(quiz_date) for quiz_date in [self.changed, self.untouched]}
+        schedule_version = get_version(QUIZ_SCHEDULE_VERSION_KEY)
+
+        edited = self.questions[:1] + ['Who wrote Sholay?'] + self.questions[2:]
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            result = import_configs([
+                ('changed.json', quiz_config(self.changed, 'Sholay', edited)),
+                ('untouched.json', quiz_config(self.untouched, 'Deewar', self.questions)),
+            ], update=True)
+
+        self.assertEqual((result.created, result.changed), ([], [self.changed]))
+        self.assertEqual(ids, {quiz_date: self.question_ids(quiz_date) for quiz_date in ids})
+        self.assertEqual(Question.objects.get(id=ids[self.changed][1]).text, 'Who wrote Sholay?')
+
+        # Only the edited question is rewritten, and no quiz row
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"quiz_question"', updates[0])
+
+        self.assertIsNone(get_quiz_payload(self.changed))
+        self.assertIsNotNone(get_quiz_payload(self.untouched))
+        self.assertEqual(get_version(QUIZ_SCHEDULE_VERSION_KEY), schedule_version)
+
+
+@override_settings(QUIZ_PREWARM_ENABLED=False)
+class ArchiveMonthTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        invalidate_schedule()
+        DailyQuiz.objects.create(
+            date=date(2026, 1, 5), category=Category.objects.create(name='Films'), title='Sholay', is_released=True
+        )
+
+    def test_caches_only_months_within_the_schedule(self):
+        response = self.client.get('/api/quiz/archive/2026/1/')
+        self.assertEqual(response.json()['days'][4]['title'], 'Sholay')
+        self.assertIsNotNone(get_archive_payload('month=2026-01'))
+
+        for year, month in [(1, 1), (2025, 12), (2026, 2), (9999, 12)]:
+            response = self.client.get(f'/api/quiz/archive/{year}/{month}/')
+            self.assertEqual(set(response.json()['days']), {None})
+            self.assertIsNone(get_archive_payload(f'month={year:04d}-{month:02d}'))
+
+
+@override_settings(QUIZ_PREWARM_ENABLED=False)
+class SignalInvalidationTests(TestCase):
+    """Saving a model drops the cached payloads built from it"""
+
+    def setUp(self):
+        cache.clear()
+        self.quiz = DailyQuiz.objects.create(
+            date=date(2026, 1, 5), category=Category.objects.create(name='Films'), title='Sholay', is_released=True
+        )
+        self.question = Question.objects.create(
+            quiz=self.quiz, order=1, text='Who played Gabbar?', option_a='A', option_b='B', option_c='C',
+            option_d='D', correct_answer='A'
+        )
+        self.path = f'/api/quiz/daily/{self.quiz.date}/'
+
+    def test_question_save_invalidates_its_quiz(self):
+        self.assertEqual(self.client.get(self.path).json()['questions'][0]['text'], 'Who played Gabbar?')
+        self.assertIsNotNone(get_quiz_payload(self.quiz.date))
+
+        self.question.text = 'Who played Thakur?'
+        self.question.save()
+        self.assertIsNone(get_quiz_payload(self.quiz.date))
+        self.assertEqual(self.client.get(self.path).json()['questions'][0]['text'], 'Who played Thakur?')
+
+    def test_category_rename_invalidates_every_quiz(self):
+        self.client.get(self.path)
+        self.quiz.category.name = 'Cinema'
+        self.quiz.category.save()
+        self.assertIsNone(get_quiz_payload(self.quiz.date))
+        self.assertEqual(self.client.get(self.path).json()['category_name'], 'Cinema')
+
+
+@override_settings(QUIZ_PREWARM_ENABLED=False)
+class ArchivePaginationTests(TestCase):
+    """The archive pages through available quizzes by date cursor"""
+
+    def setUp(self):
+        cache.clear()
+        invalidate_schedule()
+        films, music = Category.objects.create(name='Films'), Category.objects.create(name='Music')
+        for day in range(1, 8):
+            DailyQuiz.objects.create(
+                date=date(2026, 1, day), category=films if day % 2 else music, title=f'Quiz {day}',
+                is_released=day != 4
+            )
+
+    def pages(self, path):
+        dates = []
+        while path:
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 200)
+            dates.append([quiz['date'] for quiz in response.json()])
+            link = response.get('Link')
+            path = link[1:link.index('>')] if link else None
+        return dates
+
+    def test_follows_next_links_newest_first(self):
+        self.assertEqual(self.pages('/api/quiz/archive/?limit=2'), [
+            ['2026-01-07', '2026-01-06'], ['2026-01-05', '2026-01-03'], ['2026-01-02', '2026-01-01']
+        ])
+
+    def test_filters_by_category_across_pages(self):
+        self.assertEqual(self.pages('/api/quiz/archive/?limit=2&category=Films'), [
+            ['2026-01-07', '2026-01-05'], ['2026-01-03', '2026-01-01']
+        ])
+
+    def test_caches_only_pages_reached_by_links(self):
+        self.assertEqual(self.client.get('/api/quiz/archive/?category=Nope').json(), [])
+        for path, query in [
+            ('?category=Nope', 'category=Nope&limit=30'),
+            ('?limit=2', 'limit=2'),
+            ('?cursor=2026-01-04', 'cursor=2026-01-04&limit=30'),
+            ('?cursor=2031-01-01', 'cursor=2031-01-01&limit=30'),
+        ]:
+            self.assertEqual(self.client.get('/api/quiz/archive/' + path).status_code, 200)
+            self.assertIsNone(get_archive_payload(query), path)
+        for path, query in [
+            ('', 'limit=30'),
+            ('?category=Films&cursor=2026-01-05', 'category=Films&cursor=2026-01-05&limit=30'),
+        ]:
+            self.assertEqual(self.client.get('/api/quiz/archive/' + path).status_code, 200)
+            self.assertIsNotNone(get_archive_payload(query), path)
+
+
+def grade_per_question(quiz, answers):
+    """Grading as it was done before compiled answer keys, one quiz query per submission"""
+    answer_map = {int(answer['question_id']): answer['selected_option'] for answer in answers}
+    results = []
+    for question in quiz.questions.all():
+        correct_answer_text = {
+            'A': question.option_a, 'B': question.option_b, 'C': question.option_c, 'D': question.option_d
+        }[question.correct_answer]
+        user_answer = answer_map.get(question.id, '')
+        results.append({
+            'question_id': question.id, 'correct': user_answer == correct_answer_text,
+            'correct_answer': correct_answer_text, 'user_answer': user_answer
+        })
+    score = sum(result['correct'] for result in results)
+    return {
+        'score': score, 'total': len(results),
+        'percentage': round(score / len(results) * 100) if results else 0, 'results': results,
+        'quiz_date': quiz.date.strftime('%Y-%m-%d'), 'quiz_title': quiz.title, 'category': quiz.category.name
+    }
+
+
+class AnswerKeyTests(TestCase):
+    """Compiled answer keys grade like the per-question queries they replaced"""
+
+    def setUp(self):
+        cache.clear()
+        invalidate_answer_key()
+        self.quiz = DailyQuiz.objects.create(
+            date=date(2026, 1, 5), category=Category.objects.create(name='Films'), title='Sholay', is_released=True
+        )
+        self.questions = [
+            Question.objects.create(
+                quiz=self.quiz, order=order, text=f'Question {order}', option_a='Amjad', option_b='Amitabh',
+                option_c='Dharmendra', option_d='Sanjeev', correct_answer=correct
+            )
+            for order, correct in enumerate('ABCD', 1)
+        ]
+        self.answers = [
+            {'question_id': self.questions[0].id, 'selected_option': 'Amjad'},
+            {'question_id': self.questions[1].id, 'selected_option': 'Amjad'},
+            {'question_id': self.questions[2].id, 'selected_option': 'Dharmendra'},
+        ]
+
+    def test_grades_like_per_question_logic(self):
+        expected = grade_per_question(self.quiz, self.answers)
+        self.assertEqual(grade_answers(get_answer_key(self.quiz.date), self.answers), expected)
+        self.assertEqual(grade_answers(get_answer_keys([self.quiz.date])[self.quiz.date], self.answers), expected)
+        self.assertEqual((expected['score'], expected['total']), (2, 4))
+
+    def test_edits_change_the_grade_without_a_restart(self):
+        self.assertEqual(grade_answers(get_answer_key(self.quiz.date), self.answers)['score'], 2)
+
+        # Saved in the admin of this worker
+        self.questions[1].correct_answer = 'A'
+        self.questions[1].save()
+        self.assertEqual(grade_answers(get_answer_key(self.quiz.date), self.answers)['score'], 3)
+
+        # Changed by another worker, which only leaves the bumped version behind
+        Question.objects.filter(id=self.questions[0].id).update(option_a='Amjad Khan')
+        bump_version(QUIZ_ANSWER_KEY_VERSION_KEY)
+        graded = grade_answers(get_answer_keys([self.quiz.date])[self.quiz.date], self.answers)
+        self.assertEqual((graded['score'], graded['results'][0]['correct_answer']), (2, 'Amjad Khan'))
+
+    def test_quiz_without_questions_is_found_by_both_lookups(self):
+        empty = DailyQuiz.objects.create(
+            date=date(2026, 1, 6), category=self.quiz.category, title='Empty', is_released=True
+        )
+        single = grade_answers(get_answer_key(empty.date), [])
+        invalidate_answer_key()
+        batch = grade_answers(get_answer_keys([empty.date])[empty.date], [])
+        self.assertEqual(single, batch)
+        self.assertEqual((single['total'], single['percentage']), (0, 0))
+
+
+@override_settings(QUIZ_PREWARM_ENABLED=False, QUIZ_SUBMISSION_WRITE_BEHIND=False)
+class BatchSubmitTests(TestCase):
+    """Batch submits are validated as a whole and graded per quiz"""
+
+    def setUp(self):
+        cache.clear()
+        invalidate_schedule()
+        invalidate_answer_key()
+        category = Category.objects.create(name='Films')
+        for quiz_date, is_released in [(date(2026, 1, 5), True), (date(2026, 1, 6), False), (date(2999, 1, 1), True)]:
+            quiz = DailyQuiz.objects.create(date=quiz_date, category=category, title='Quiz', is_released=is_released)
+            Question.objects.create(
+                quiz=quiz, order=1, text='Who played Gabbar?', option_a='Amjad', option_b='Amitabh',
+                option_c='Dharmendra', option_d='Sanjeev', correct_answer='A'
+            )
+        self.question = Question.objects.get(quiz__date=date(2026, 1, 5))
+
+    def submit(self, submissions):
+        return self.client.post(
+            '/api/quiz/submit/batch/', {'submissions': submissions}, content_type='application/json'
+        )
+
+    def submission(self, quiz_date, question_id=None, selected_option='Amjad'):
+        return {'date': quiz_date, 'answers': [
+            {'question_id': str(question_id or self.question.id), 'selected_option': selected_option}
+        ]}
+
+    def test_rejects_invalid_batches(self):
+        too_many = [self.submission(str(date(2026, 1, 1) + timedelta(days=day))) for day in range(101)]
+        for submissions in [
+            [], too_many, [self.submission('2026-01-05'), self.submission('2026-01-05')],
+            [self.submission('5 Jan 2026')],
+        ]:
+            with self.subTest(count=len(submissions)):
+                self.assertEqual(self.submit(submissions).status_code, 400)
+        self.assertFalse(QuizSubmission.objects.exists())
+
+    def test_grades_each_submission_separately(self):
+        response = self.submit([
+            self.submission('2026-01-05'),
+            self.submission('2026-01-04'),
+            self.submission('2026-01-06'),
+            self.submission('2999-01-01'),
+            self.submission('2026-01-03', question_id='abc'),
+        ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual((results[0]['score'], results[0]['total']), (1, 1))
+        self.assertEqual([result.get('error') for result in results[1:4]], [
+            'Kwiz not found', 'Quiz not yet available', 'Quiz not yet available'
+        ])
+        self.assertNotIn('results', results[2])
+        self.assertEqual(results[4]['error'], 'Kwiz not found')
+        self.assertEqual(QuizSubmission.objects.count(), 1)
+
+    def test_reports_errors_of_single_submissions(self):
+        results = self.submit([self.submission('2026-01-05', question_id='abc')]).json()['results']
+        self.assertEqual(results[0]['quiz_date'], '2026-01-05')
+        self.assertIn('error', results[0])
+
+
+@override_settings(QUIZ_PREWARM_ENABLED=False)
+class QuestionStatsTests(TransactionTestCase):
+    """Buffered question counters add up and are only shown once released"""
+
+    def setUp(self):
+        cache.clear()
+        invalidate_schedule()
+        category = Category.objects.create(name='Films')
+        self.questions = {}
+        for quiz_date, is_released in [(date(2026, 1, 5), True), (date(2026, 1, 6), False)]:
+            quiz = DailyQuiz.objects.create(date=quiz_date, category=category, title='Quiz', is_released=is_released)
+            self.questions[quiz_date] = [
+                Question.objects.create(
+                    quiz=quiz, order=order, text=f'Question {order}', option_a='A', option_b='B', option_c='C',
+                    option_d='D', correct_answer='A'
+                )
+                for order in [1, 2]
+            ]
+
+    def test_concurrent_submissions_accumulate(self):
+        first, second = self.questions[date(2026, 1, 5)]
+        buffer = QuestionStatsBuffer(flush_interval=3600)
+
+        def submit_many(thread):
+            for i in range(100):
+                buffer.record([
+                    {'question_id': first.id, 'correct': i % 2 == 0},
+                    {'question_id': second.id, 'correct': thread == 0},
+                ])
+
+        workers = [threading.Thread(target=submit_many, args=(thread,)) for thread in range(8)]
+        for worker in workers:
+            worker.start()
+        # Flushing while submissions arrive must neither lose nor double count
+        while any(worker.is_alive() for worker in workers):
+            buffer.flush()
+        buffer.flush()
+        # A second worker's flush adds to the stored counters
+        apply_question_stats({first.id: (10, 10)})
+
+        counts = dict(QuestionStats.objects.values_list('question_id', 'attempts'))
+        correct = dict(QuestionStats.objects.values_list('question_id', 'correct'))
+        self.assertEqual((counts[first.id], correct[first.id]), (810, 410))
+        self.assertEqual((counts[second.id], correct[second.id]), (800, 100))
+
+    def test_endpoint_hides_unreleased_quizzes(self):
+        first = self.questions[date(2026, 1, 5)][0]
+        apply_question_stats({first.id: (4, 1)})
+
+        response = self.client.get('/api/quiz/stats/2026-01-05/')
+        self.assertEqual(response.json()['questions'][0], {
+            'question_id': first.id, 'order': 1, 'attempts': 4, 'correct': 1, 'correct_rate': 25
+        })
+        self.assertEqual(response.json()['questions'][1]['attempts'], 0)
+        for path in ['2026-01-06', '2999-01-01']:
+            self.assertEqual(self.client.get(f'/api/quiz/stats/{path}/').status_code, 404)
+
+
+class PrewarmTests(TestCase):
+    """Pre-warmed payloads are built once and never served early"""
+
+    def test_concurrent_misses_run_one_build(self):
+        builds = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def build():
+            builds.append(1)
+            started.set()
+            release.wait(5)
+            return len(builds)
+
+        results = []
+        callers = [
+            threading.Thread(target=lambda: results.append(single_flight('payload', build))) for _ in range(8)
+        ]
+        for caller in callers:
+            caller.start()
+        started.wait(5)
+        release.set()
+        for caller in callers:
+            caller.join()
+        self.assertEqual((builds, results), ([1], [1] * 8))
+
+    def test_prewarmed_quiz_is_not_served_before_release(self):
+        cache.clear()
+        invalidate_schedule()
+        tomorrow = get_today_ist() + timedelta(days=1)
+        quiz = DailyQuiz.objects.create(
+            date=tomorrow, category=Category.objects.create(name='Films'), title='Tomorrow', is_released=True
+        )
+        quiz.refresh_from_db()
+
+        self.assertEqual(prewarm_next_quiz()['date'], tomorrow)
+        warmed = cache.get(payload_key(tomorrow))
+        self.assertEqual(warmed.available_at, get_release_datetime(tomorrow, quiz.release_time).timestamp())
+        self.assertIsNone(get_quiz_payload(tomorrow))
+        self.assertEqual(load_quiz_payload(tomorrow), (None, quiz))
+
+
+class ScoreMergeTests(TransactionTestCase):
+    def test_recounts_only_after_submissions_are_written(self):
+        quiz = DailyQuiz.objects.create(
+            date=date(2026, 1, 5), category=Category.objects.create(name='Films'), title='Quiz'
+        )
+        histograms = ScoreHistograms(merge_interval=10, idle_timeout=60)
+        histograms.thread = threading.current_thread()
+
+        # Queued for the write-behind writer, not yet in the database
+        record_submission(AnswerKey(quiz.id, quiz.date, quiz.title, 'Films', ()), {'score': 1, 'total': 3})
+        histograms.record(quiz.id, 1, 3)
+        histograms.merge()
+
+        # Counted once: in the recount, no longer in the local delta
+        self.assertEqual(QuizSubmission.objects.count(), 1)
+        self.assertEqual((histograms.snapshots[quiz.id], histograms.deltas[quiz.id]), ([0, 1], [0, 0, 0, 0]))
@@ -1,10 +1,20 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, events, views
+
+# The ASGI deployment serves the hot read endpoints with async views
+read_views = async_views if settings.QUIZ_ASGI else views
 
 urlpatterns = [
-    path('daily/<str:quiz_date>/', views.get_daily_quiz, name='daily_quiz'),
+    path('daily/<str:quiz_date>/', read_views.get_daily_quiz, name='daily_quiz'),
     path('submit/', views.submit_quiz, name='submit_quiz'),
-    path('archive/', views.get_quiz_archive, name='quiz_archive'),
-    path('status/', views.get_quiz_status, name='quiz_status'),
-    path('status/<str:quiz_date>/', views.get_quiz_status, name='quiz_status_date'),
+    path('submit/batch/', views.submit_quiz_batch, name='submit_quiz_batch'),
+    path('archive/', read_views.get_quiz_archive, name='quiz_archive'),
+    path('archive/<int:year>/<int:month>/', views.get_archive_month, name='quiz_archive_month'),
+    path('search/', views.search_quiz_questions, name='search_quiz_questions'),
+    path('status/', read_views.get_quiz_status, name='quiz_status'),
+    path('status/<str:quiz_date>/', read_views.get_quiz_status, name='quiz_status_date'),
+    path('events/', events.quiz_release_events, name='quiz_release_events'),
+    path('configs/validate/', views.validate_quiz_configs, name='validate_quiz_configs'),
+    path('stats/<str:quiz_date>/', views.get_question_stats, name='question_stats'),
 ]
@@ -1,25 +1,46 @@
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
+from django.conf import settings
 from datetime import date, datetime
-import pytz
-from .models import DailyQuiz, Question
+from urllib.parse import urlencode
+import calendar
+import time
+from .models import IST, DailyQuiz, Question
+from .cache import (
+    load_archive_payload, load_quiz_payload, make_archive_payload, make_payload, render_json,
+    seconds_until_next_change, set_archive_payload
+)
+from .configs import ConfigValidationError
+from .importer import check_configs
+from .grading import get_answer_key, get_answer_keys, grade_answers
+from .schedule import get_release_datetime, get_schedule
+from .question_stats import record_question_stats
+from .scores import record_score
+from .search import search_questions
+from .submissions import record_submission
+from .http import (
+    cache_immutable, cache_strictly_until, cache_timer, cache_until, conditional_json_response,
+    content_etag, json_response, not_modified_response, weak_etag
+)
 from .serializers import (
     QuizSerializer,
     QuizResultSerializer,
+    BatchQuizResultSerializer,
     QuestionResultSerializer,
-    ArchiveQuizSerializer
+    ArchiveQuizSerializer,
+    SearchResultSerializer
 )
 from kwiz_project.constants import (
-    ERROR_NO_QUIZ_TODAY
+    ERROR_NO_QUIZ_TODAY, ARCHIVE_PAGE_SIZE, MAX_ARCHIVE_PAGE_SIZE, SEARCH_PAGE_SIZE,
+    MAX_SEARCH_PAGE_SIZE
 )
 
 
 def get_today_ist():
     """Get today's date in IST timezone"""
-    ist = pytz.timezone('Asia/Kolkata')
-    now_ist = datetime.now(ist)
+    now_ist = datetime.now(IST)
     return now_ist.date()
 
 
@@ -42,38 +63,62 @@ def get_daily_quiz(request, quiz_date):
             'error': 'Kwiz not found'
         }, status=status.HTTP_404_NOT_FOUND)
 
-    # Check if quiz exists in database
-    try:
-        quiz = DailyQuiz.objects.get(date=quiz_date)
-    except DailyQuiz.DoesNotExist:
+    # Released quizzes are served from the pre-rendered payload cache
+    payload, quiz = load_quiz_payload(requested_date)
+    if payload is not None:
+        # Past quizzes too, since every body carries the next_quiz countdown
+        response = quiz_payload_response(request, payload)
+        return cache_timer(response, seconds_until_next_change())
+
+    if quiz is None:
         # Quiz doesn't exist for this date (past or present)
         return Response({
             'error': 'Kwiz not found'
         }, status=status.HTTP_404_NOT_FOUND)
 
-    # Check if quiz is available (released)
-    if not quiz.is_available:
-        time_until_release = quiz.get_time_until_release()
-        next_quiz_info = quiz.get_next_quiz_info()
+    # Quiz exists but is not yet available (released)
+    data = not_available_data(quiz, get_schedule())
+    response = Response(data, status=status.HTTP_403_FORBIDDEN)
+    # Must not outlive the release, or clients would keep seeing the 403
+    return cache_timer(response, data['time_until_release'])
 
-        return Response({
-            'error': 'Quiz not yet available',
-            'quiz_date': quiz.date,
-            'quiz_title': quiz.title,
-            'time_until_release': time_until_release,
-            'next_quiz': next_quiz_info,
-            'message': f'This quiz will be available soon!'
-        }, status=status.HTTP_403_FORBIDDEN)
 
-    # Quiz exists and is available, return it
-    serializer = QuizSerializer(quiz)
-    quiz_data = serializer.data
+def not_available_data(quiz, schedule):
+    return {
+        'error': 'Quiz not yet available',
+        'quiz_date': quiz.date,
+        'quiz_title': quiz.title,
+        'time_until_release': quiz.get_time_until_release(),
+        'release_at': get_release_datetime(quiz.date, quiz.release_time),
+        'next_quiz': schedule.next_quiz_info(time.time()),
+        'message': f'This quiz will be available soon!'
+    }
+
 
-    # Add timer information for frontend
-    quiz_data['time_until_release'] = 0  # Already available
-    quiz_data['next_quiz'] = quiz.get_next_quiz_info()
+def quiz_payload_response(request, payload, schedule=None):
+    """Build a quiz response from a cached payload plus live timer information"""
+    next_quiz_info = (schedule or get_schedule()).next_quiz_info(time.time())
+    # The cached body is a JSON object, so the timer fields are appended to it
+    # in place of its closing brace
+    timer_fields = b',"time_until_release":0,"next_quiz":' + render_json(next_quiz_info)
 
-    return Response(quiz_data)
+    etag = quiz_payload_etag(payload, next_quiz_info)
+
+    response = not_modified_response(request, etag, payload.last_modified)
+    if response is not None:
+        return response
+    return json_response(payload.body[:-1] + timer_fields + b'}', etag, payload.last_modified)
+
+
+def quiz_payload_etag(payload, next_quiz_info):
+    """Get the ETag of a daily quiz response, also sent in release events
+
+    The next_quiz countdown changes every second, so the ETag is weak and
+    covers the quiz content and when the next quiz is released rather than
+    the countdown: clients count down from next_quiz.release_at.
+    """
+    next_release_at = next_quiz_info['release_at'].isoformat() if next_quiz_info else ''
+    return weak_etag(payload.etag, next_release_at)
 
 
 @api_view(['POST'])
@@ -88,52 +133,16 @@ def submit_quiz(request):
     answers = serializer.validated_data['answers']
 
     try:
-        quiz = get_object_or_404(DailyQuiz, date=quiz_date)
-        questions = quiz.questions.all()
-
-        # Calculate score
-        score = 0
-        total_questions = len(questions)
-        results = []
-
-        # Create answer mapping
-        answer_map = {}
-        for answer in answers:
-            answer_map[int(answer['question_id'])] = answer['selected_option']
-
-        for question in questions:
-            user_answer = answer_map.get(question.id, '')
-            correct_option_map = {
-                'A': question.option_a,
-                'B': question.option_b,
-                'C': question.option_c,
-                'D': question.option_d,
-            }
-            correct_answer_text = correct_option_map[question.correct_answer]
-            is_correct = user_answer == correct_answer_text
-
-            if is_correct:
-                score += 1
-
-            results.append({
-                'question_id': question.id,
-                'correct': is_correct,
-                'correct_answer': correct_answer_text,
-                'user_answer': user_answer
-            })
-
-        percentage = round((score / total_questions) * 100) if total_questions > 0 else 0
+        # Graded against the compiled answer key, without touching the ORM
+        answer_key = get_answer_key(quiz_date)
+        if answer_key is None:
+            return Response({
+                'error': 'Kwiz not found'
+            }, status=status.HTTP_404_NOT_FOUND)
 
-        # Return data for frontend to format share text
-        return Response({
-            'score': score,
-            'total': total_questions,
-            'percentage': percentage,
-            'results': results,
-            'quiz_date': quiz_date.strftime('%Y-%m-%d'),
-            'quiz_title': quiz.title,
-            'category': quiz.category.name
-        })
+        result = grade_answers(answer_key, answers)
+        record_result(answer_key, result)
+        return Response(result)
 
     except Exception as e:
         return Response(
@@ -142,18 +151,84 @@ def submit_quiz(request):
         )
 
 
+def record_result(answer_key, result):
+    """Record a graded submission and add its percentile to the result"""
+    record_submission(answer_key, result)
+    record_question_stats(result['results'])
+    result['percentile'] = record_score(answer_key.quiz_id, result['score'], result['total'])
+
+
+@api_view(['POST'])
+def submit_quiz_batch(request):
+    """Submit answers for several quizzes and get results for each"""
+    serializer = BatchQuizResultSerializer(data=request.data)
+
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    submissions = serializer.validated_data['submissions']
+    answer_keys = get_answer_keys({submission['date'] for submission in submissions})
+    schedule = get_schedule()
+    now = time.time()
+
+    results = []
+    for submission in submissions:
+        quiz_date = submission['date']
+        answer_key = answer_keys.get(quiz_date)
+        if answer_key is None:
+            results.append({
+                'quiz_date': quiz_date.strftime('%Y-%m-%d'),
+                'error': 'Kwiz not found'
+            })
+            continue
+
+        # Grading reveals the correct answers, so only released quizzes are graded
+        entry = schedule.get(quiz_date)
+        if entry is None or not schedule.is_available(entry, now):
+            results.append({
+                'quiz_date': quiz_date.strftime('%Y-%m-%d'),
+                'error': 'Quiz not yet available'
+            })
+            continue
+
+        try:
+            result = grade_answers(answer_key, submission['answers'])
+            record_result(answer_key, result)
+            results.append(result)
+        except Exception as e:
+            results.append({
+                'quiz_date': quiz_date.strftime('%Y-%m-%d'),
+                'error': str(e)
+            })
+
+    return Response({'results': results})
+
+
 @api_view(['GET'])
 def get_quiz_archive(request):
-    """Get list of available past quizzes"""
-    try:
-        today = get_today_ist()
-        quizzes = DailyQuiz.objects.filter(
-            date__lte=today,
-            is_released=True
-        ).order_by('-date')[:30]  # Last 30 quizzes
+    """Get a page of available past quizzes, newest first
 
-        serializer = ArchiveQuizSerializer(quizzes, many=True)
-        return Response(serializer.data)
+    Optional query parameters: ``category`` (name), ``limit`` and ``cursor``
+    (the date to continue before). The next page's URL is sent in a Link
+    header. Only the pages reached by following those links from the first
+    page are cached.
+    """
+    try:
+        try:
+            cursor, category, limit, query = parse_archive_query(request.query_params)
+        except ValueError as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        schedule = get_schedule()
+        if is_canonical_archive_page(schedule, cursor, category, limit):
+            payload = load_archive_payload(
+                lambda: build_archive_payload(request.path, cursor, category, limit, query), query
+            )
+        else:
+            payload = make_archive_payload(*query_archive_page(request.path, cursor, category, limit))
+        return cache_until(archive_response(request, payload), seconds_until_next_change(schedule))
 
     except Exception as e:
         return Response(
@@ -162,45 +237,314 @@ def get_quiz_archive(request):
         )
 
 
+def parse_archive_query(params):
+    """Get (cursor, category, limit, cache query) from archive query parameters
+
+    Raises ValueError with the message for the client on invalid values.
+    """
+    cursor = params.get('cursor')
+    if cursor:
+        try:
+            cursor = datetime.strptime(cursor, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError('Invalid cursor. Use YYYY-MM-DD')
+
+    try:
+        limit = int(params.get('limit', ARCHIVE_PAGE_SIZE))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= MAX_ARCHIVE_PAGE_SIZE:
+        raise ValueError(f'limit must be between 1 and {MAX_ARCHIVE_PAGE_SIZE}')
+
+    category = params.get('category')
+    query = urlencode(sorted(
+        (key, value) for key, value in
+        [('category', category), ('cursor', cursor), ('limit', limit)] if value
+    ))
+    return cursor, category, limit, query
+
+
+def archive_response(request, payload):
+    response = not_modified_response(request, payload.etag, payload.last_modified)
+    if response is None:
+        response = json_response(payload.body, payload.etag, payload.last_modified)
+        for header, value in payload.headers:
+            response[header] = value
+    return response
+
+
+def archive_quizzes(now_ist, cursor, category, limit):
+    """Query one archive page plus one extra row to learn whether another page follows"""
+    quizzes = DailyQuiz.objects.filter(
+        date__lte=now_ist.date(),
+        is_released=True
+    ).select_related('category').order_by('-date')
+    if cursor:
+        quizzes = quizzes.filter(date__lt=cursor)
+    if category:
+        quizzes = quizzes.filter(category__name=category)
+    return quizzes[:limit + 1]
+
+
+def is_canonical_archive_page(schedule, cursor, category, limit):
+    """Whether an archive page is one a client reaches by following Link
+    headers from the first page, the only pages that are cached
+
+    Other cursors, limits and categories are served uncached, so arbitrary
+    query values cannot fill the cache.
+    """
+    entry = schedule.get(cursor) if cursor else None
+    return (
+        limit == ARCHIVE_PAGE_SIZE
+        and (not cursor or (entry is not None and entry.is_released))
+        and (not category or category in schedule.categories)
+    )
+
+
+def query_archive_page(path, cursor, category, limit):
+    """Render one archive page with a single keyset query, returning (body, newest date, headers)"""
+    now_ist = datetime.now(IST)
+    quizzes = list(archive_quizzes(now_ist, cursor, category, limit))
+    return render_archive_page(path, quizzes, category, limit, now_ist)
+
+
+def build_archive_payload(path, cursor, category, limit, query):
+    """Render and cache one archive page"""
+    body, newest_date, headers = query_archive_page(path, cursor, category, limit)
+    return set_archive_payload(body, newest_date, query, headers)
+
+
+def render_archive_page(path, quizzes, category, limit, now_ist):
+    """Encode an archive page, returning (body, newest date, headers)"""
+    headers = []
+    if len(quizzes) > limit:
+        quizzes = quizzes[:limit]
+        params = {'cursor': quizzes[-1].date.strftime('%Y-%m-%d'), 'limit': limit}
+        if category:
+            params['category'] = category
+        headers.append(('Link', f'<{path}?{urlencode(params)}>; rel="next"'))
+
+    serializer = ArchiveQuizSerializer(quizzes, many=True, context={'now_ist': now_ist})
+    newest_date = quizzes[0].date if quizzes else None
+    return render_json(serializer.data), newest_date, headers
+
+
+@api_view(['GET'])
+def search_quiz_questions(request):
+    """Search the questions and options of available quizzes, best matches first
+
+    Query parameters: ``q`` (required), ``limit`` and ``page`` (from 1). The
+    next page's URL is sent in a Link header.
+    """
+    search = request.query_params.get('q', '').strip()
+    if not search:
+        return Response({
+            'error': 'Missing search query q'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        page = int(request.query_params.get('page', 1))
+        limit = int(request.query_params.get('limit', SEARCH_PAGE_SIZE))
+    except ValueError:
+        page = limit = 0
+    if page < 1 or not 1 <= limit <= MAX_SEARCH_PAGE_SIZE:
+        return Response({
+            'error': f'page must be at least 1 and limit between 1 and {MAX_SEARCH_PAGE_SIZE}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    # Only quizzes that can be played, checked against one IST "now"
+    schedule = get_schedule()
+    today = get_today_ist()
+    available = Question.objects.filter(quiz__date__lt=today, quiz__is_released=True)
+    entry = schedule.get(today)
+    if entry and schedule.is_available(entry, time.time()):
+        available = Question.objects.filter(quiz__date__lte=today, quiz__is_released=True)
+
+    # Fetch one extra row to learn whether another page follows
+    offset = (page - 1) * limit
+    questions = list(
+        search_questions(search, available).select_related('quiz__category')[offset:offset + limit + 1]
+    )
+    response = Response(SearchResultSerializer(questions[:limit], many=True).data)
+    if len(questions) > limit:
+        params = urlencode({'q': search, 'page': page + 1, 'limit': limit})
+        response['Link'] = f'<{request.path}?{params}>; rel="next"'
+    return cache_until(response, seconds_until_next_change())
+
+
+@api_view(['GET'])
+def get_archive_month(request, year, month):
+    """Get a calendar of one month's quizzes, one entry (or null) per day"""
+    if not 1 <= month <= 12 or not 1 <= year <= 9999:
+        return Response({
+            'error': 'Invalid month. Use YYYY/MM'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    schedule = get_schedule()
+    entries = schedule.entries
+    last_day = date(year, month, calendar.monthrange(year, month)[1])
+    if not entries or last_day < entries[0].date or entries[-1].date < date(year, month, 1):
+        # Only months within the schedule are cached, so arbitrary years and
+        # months cannot fill the cache; the others have no quizzes
+        payload = make_payload(render_month(schedule, year, month))
+        response = conditional_json_response(request, payload.body, payload.etag)
+        return cache_until(response, seconds_until_next_change())
+
+    query = f'month={year:04d}-{month:02d}'
+    payload = load_archive_payload(lambda: build_month_payload(year, month, query), query)
+    response = conditional_json_response(request, payload.body, payload.etag, payload.last_modified)
+    if last_day < get_today_ist():
+        return cache_immutable(response)
+    return cache_until(response, seconds_until_next_change())
+
+
+def render_month(schedule, year, month):
+    """Encode a month calendar from the release schedule"""
+    now = time.time()
+    days = []
+    for day in range(1, calendar.monthrange(year, month)[1] + 1):
+        entry = schedule.get(date(year, month, day))
+        days.append({
+            'title': entry.title,
+            'category': entry.category,
+            'is_available': schedule.is_available(entry, now)
+        } if entry else None)
+    return render_json({'year': year, 'month': month, 'days': days})
+
+
+def build_month_payload(year, month, query):
+    """Render and cache a month calendar"""
+    body = render_month(get_schedule(), year, month)
+    days_in_month = calendar.monthrange(year, month)[1]
+
+    # Months that have fully passed only change when a quiz is edited, which
+    # bumps the archive version
+    timeout = None
+    if date(year, month, days_in_month) < get_today_ist():
+        timeout = settings.QUIZ_PAYLOAD_CACHE_TIMEOUT
+    return set_archive_payload(body, None, query, timeout=timeout)
+
+
 @api_view(['GET'])
 def get_quiz_status(request, quiz_date=None):
     """Get quiz availability status and timer information"""
     try:
+        # Served entirely from the in-memory release schedule
+        schedule = get_schedule()
+        now = time.time()
+
         if quiz_date:
-            quiz = get_object_or_404(DailyQuiz, date=quiz_date)
+            try:
+                requested_date = datetime.strptime(quiz_date, '%Y-%m-%d').date()
+            except ValueError:
+                return Response({
+                    'error': 'Invalid date format. Use YYYY-MM-DD'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            entry = schedule.get(requested_date)
+            if entry is None:
+                return Response({
+                    'error': 'Kwiz not found'
+                }, status=status.HTTP_404_NOT_FOUND)
         else:
             # Get today's quiz based on IST timezone
-            today = get_today_ist()
-            quiz = DailyQuiz.objects.filter(date=today).first()
-
-            if not quiz:
-                next_quiz = DailyQuiz.objects.filter(date__gt=today).first()
-                next_quiz_info = None
-                if next_quiz:
-                    next_quiz_info = {
-                        'date': next_quiz.date,
-                        'title': next_quiz.title,
-                        'category': next_quiz.category.name,
-                        'time_until_release': next_quiz.get_time_until_release()
-                    }
+            entry = schedule.get(get_today_ist())
 
+            if not entry:
                 return Response({
                     'error': ERROR_NO_QUIZ_TODAY,
-                    'next_quiz': next_quiz_info
+                    'next_quiz': schedule.next_quiz_info(now)
                 }, status=status.HTTP_404_NOT_FOUND)
 
-        return Response({
-            'quiz_date': quiz.date,
-            'quiz_title': quiz.title,
-            'category': quiz.category.name,
-            'is_available': quiz.is_available,
-            'time_until_release': quiz.get_time_until_release(),
-            'next_quiz': quiz.get_next_quiz_info(),
-            'release_time': quiz.release_time.strftime('%H:%M') if quiz.release_time else '00:00'
-        })
+        return quiz_status_response(request, schedule, entry, now)
 
     except Exception as e:
         return Response(
             {'error': str(e)},
             status=status.HTTP_400_BAD_REQUEST
         )
+
+
+def quiz_status_response(request, schedule, entry, now):
+    # The body carries a live countdown, so its ETag hashes the exact bytes
+    body = render_json({
+        'quiz_date': entry.date,
+        'quiz_title': entry.title,
+        'category': entry.category,
+        'is_available': schedule.is_available(entry, now),
+        'time_until_release': schedule.time_until_release(entry, now),
+        'release_at': schedule.release_datetime(entry),
+        'next_quiz': schedule.next_quiz_info(now),
+        'release_time': entry.release_time.strftime('%H:%M') if entry.release_time else '00:00'
+    })
+    response = conditional_json_response(request, body, content_etag(body))
+    return cache_timer(response, seconds_until_next_change(schedule))
+
+
+@api_view(['GET'])
+def get_question_stats(request, quiz_date):
+    """Get attempt and correct counts for each question of a released quiz"""
+    try:
+        requested_date = datetime.strptime(quiz_date, '%Y-%m-%d').date()
+    except ValueError:
+        return Response({
+            'error': 'Invalid date format. Use YYYY-MM-DD'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    schedule = get_schedule()
+    entry = schedule.get(requested_date)
+    if entry is None or not schedule.is_available(entry, time.time()):
+        return Response({
+            'error': 'Kwiz not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    questions = Question.objects.filter(
+        quiz__date=requested_date
+    ).select_related('stats').order_by('order')
+
+    results = []
+    for question in questions:
+        stats = getattr(question, 'stats', None)
+        results.append({
+            'question_id': question.id,
+            'order': question.order,
+            'attempts': stats.attempts if stats else 0,
+            'correct': stats.correct if stats else 0,
+            'correct_rate': stats.correct_rate if stats else None
+        })
+
+    response = Response({
+        'quiz_date': requested_date,
+        'questions': results
+    })
+    # Counters are only written once per flush interval
+    return cache_strictly_until(response, settings.QUIZ_QUESTION_STATS_FLUSH_INTERVAL)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def validate_quiz_configs(request):
+    """Validate quiz configs without importing them
+
+    The body is one config or an array of configs. Every error is reported.
+    With ``?update=true``, quizzes that already exist are accepted since
+    the import would update them.
+    """
+    if isinstance(request.data, list):
+        configs = [(f'config[{index}]', config) for index, config in enumerate(request.data)]
+    else:
+        configs = [('config', request.data)]
+    update = request.query_params.get('update') == 'true'
+
+    try:
+        quiz_dates = check_configs(configs, update=update)
+    except ConfigValidationError as e:
+        return Response({
+            'valid': False,
+            'errors': e.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'valid': True,
+        'dates': quiz_dates
+    })
@@ -9,5 +9,16 @@ python manage.py collectstatic --noinput
 # Run migrations
 python manage.py migrate
 
-# Start gunicorn
+# Import new and changed files from quiz_configs/. A file that cannot be
+# applied, such as one editing a quiz created in the admin, fails the deploy;
+# see `sync_quiz_configs --help` for --adopt
+python manage.py sync_quiz_configs
+
+# Publish static snapshots of released quizzes
+python manage.py publish_static_quizzes
+
+# Start gunicorn, with async uvicorn workers when WEB_SERVER=asgi
+if [ "$WEB_SERVER" = "asgi" ]; then
+    exec gunicorn kwiz_project.asgi:application -k uvicorn_worker.UvicornWorker --bind 0.0.0.0:$PORT --workers 2
+fi
 exec gunicorn kwiz_project.wsgi --bind 0.0.0.0:$PORT --workers 2